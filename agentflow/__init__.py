@@ -1,2 +1,7 @@
 __version__ = "0.1.0"
-from .memory import Memory
\ No newline at end of file
+
+def __getattr__(name):
+    if name == "Memory":
+        from .memory import Memory
+        return Memory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,39 @@
 import typer
 import os
-import yaml
-import asyncio
-import multiprocessing
-from rich.console import Console
-from agentflow.core.agent import Agent
-from agentflow.core.swarm import Swarm, Fabric
-from agentflow.skills import load_skill
-from agentflow.memory import Memory
-from agentflow.skills.marketplace import SkillMarketplace
-from agentflow.task_aware.watcher import run_watcher
-from agentflow.core.llm import LLM
+from typing import Optional
+
+# Command dependencies are imported inside each command so `agentflow --help`
+# and quick scripted calls only pay for typer.
 
 app = typer.Typer()
-console = Console()
+
+_console = None
+
+def console():
+    """Shared rich console, created on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+@app.callback()
+def main(
+    trace: Optional[bool] = typer.Option(
+        None, "--trace/--no-trace", help="Record spans for `agentflow stats` (default: on unless AGENTFLOW_TRACE=off)"
+    ),
+):
+    """AgentFlow: local agents that watch your workflow."""
+    from agentflow.core.tracing import DEFAULT_TRACE_PATH
+    # Set in the environment so background watcher processes trace to the same file
+    configured = os.environ.get("AGENTFLOW_TRACE", "")
+    disabled = configured.lower() in ("off", "0", "false")
+    if trace is None:
+        os.environ.setdefault("AGENTFLOW_TRACE", DEFAULT_TRACE_PATH)
+    elif not trace:
+        os.environ["AGENTFLOW_TRACE"] = "off"
+    elif disabled or not configured:
+        os.environ["AGENTFLOW_TRACE"] = DEFAULT_TRACE_PATH  # An explicit --trace keeps a custom AGENTFLOW_TRACE path
 
 def get_project_root():
     return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -22,15 +42,27 @@ def get_project_dir():
     return os.path.join(get_project_root(), "agentflow_project")
 
 @app.command()
-def init():
+def init(
+    headless: bool = typer.Option(False, "--headless", help="Watch without interactive suggestions"),
+    notifier: str = typer.Option("tk", "--notifier", help="Where suggestions go: tk, log or headless"),
+):
     """Initialize AgentFlow ecosystem, create user profile, and start watching."""
+    import asyncio
+    import multiprocessing
+    import yaml
+    from agentflow.core import http
+    from agentflow.core.llm import LLM
+    from agentflow.memory import Memory
+    from agentflow.task_aware.pipeline import file_type_census
+    from agentflow.task_aware.watcher import run_watcher
+
     project_dir = get_project_dir()
     os.makedirs(project_dir, exist_ok=True)
     with open(os.path.join(project_dir, "requirements.txt"), "w") as f:
         f.write("agentflow==0.1.0\n")
     with open(os.path.join(project_dir, "sample_config.yaml"), "w") as f:
         yaml.dump({"name": "sample", "skills": ["codegen"], "llm": "ollama"}, f)
-    console.print(f"[bold green]Initialized project in {project_dir}[/bold green]")
+    console().print(f"[bold green]Initialized project in {project_dir}[/bold green]")
 
     # Profile creation
     memory = Memory()
@@ -38,61 +70,200 @@ def init():
     profile = {}
 
     # Option 1: Natural language profile creation
-    console.print("[bold blue]Building your profile with natural language...[/bold blue]")
+    console().print("[bold blue]Building your profile with natural language...[/bold blue]")
     profile["workflow"] = typer.prompt("What’s your primary workflow? (e.g., coding, writing, data analysis)")
     profile["needs"] = typer.prompt("What do you need help with? (e.g., automation, debugging, summarizing)")
     profile["access"] = typer.prompt("Any specific access requirements? (e.g., local-only, specific dirs)")
 
     # Option 2: Deep search (complementary)
-    console.print("[bold blue]Performing a deep search of your environment...[/bold blue]")
-    file_types = {}
-    for root, _, files in os.walk(os.getcwd()):
-        for file in files:
-            ext = os.path.splitext(file)[1]
-            file_types[ext] = file_types.get(ext, 0) + 1
+    console().print("[bold blue]Performing a deep search of your environment...[/bold blue]")
+    # A running watcher keeps this census current, so only walk the tree without one
+    pid = memory.retrieve("watcher_pid")
+    watcher_running = bool(pid and os.path.exists(f"/proc/{pid}"))
+    census_key = f"file_type_census_{os.path.abspath(os.getcwd())}"
+    file_types = memory.retrieve_json(census_key) if watcher_running else None
+    if file_types is None:
+        file_types = file_type_census(os.getcwd())
+        memory.store_json(census_key, file_types)
     profile["file_types"] = file_types
-    console.print(f"[bold blue]Detected file types: {file_types}[/bold blue]")
+    console().print(f"[bold blue]Detected file types: {file_types}[/bold blue]")
 
     # Enhance profile with LLM reasoning
     prompt = f"Analyze this user profile: {profile}. Suggest workflows and skills."
+    async def analyze():
+        try:
+            return await llm.generate(prompt)
+        finally:
+            await http.close()
+
     try:
-        analysis = asyncio.run(llm.generate(prompt))
-        console.print(f"[bold blue]Profile Analysis:[/bold blue] {analysis}")
+        analysis = asyncio.run(analyze())
+        console().print(f"[bold blue]Profile Analysis:[/bold blue] {analysis}")
     except Exception as e:
-        console.print(f"[bold red]Error analyzing profile: {e}[/bold red]")
+        console().print(f"[bold red]Error analyzing profile: {e}[/bold red]")
 
     # Store profile
     memory.store_json("user_profile", profile)
-    console.print("[bold green]Profile created and saved![/bold green]")
+    console().print("[bold green]Profile created and saved![/bold green]")
 
     # Start background watcher
-    pid = memory.retrieve("watcher_pid")
-    if pid and os.path.exists(f"/proc/{pid}"):
-        console.print("[bold yellow]Watcher already running.[/bold yellow]")
+    if watcher_running:
+        console().print("[bold yellow]Watcher already running.[/bold yellow]")
     else:
-        watcher_process = multiprocessing.Process(target=run_watcher, args=(os.getcwd(), 3600))
+        watcher_process = multiprocessing.Process(target=run_watcher, args=(os.getcwd(), 3600, headless, notifier))
         watcher_process.start()
         memory.store("watcher_pid", str(watcher_process.pid))
-        console.print(f"[bold green]Started watcher (PID: {watcher_process.pid})[/bold green]")
+        console().print(f"[bold green]Started watcher (PID: {watcher_process.pid})[/bold green]")
 
 @app.command()
 def list_skills():
     """List available skills."""
-    marketplace = SkillMarketplace()
-    skills = marketplace.list_skills()
-    console.print("[bold blue]Available Skills:[/bold blue]")
-    for skill in skills:
-        console.print(f"- {skill}")
+    from agentflow.skills.registry import SKILLS_DIR, get_registry
+    skills = get_registry().skills()
+    console().print("[bold blue]Available Skills:[/bold blue]")
+    for name in sorted(skills):
+        meta = skills[name]
+        source = "" if os.path.dirname(meta["path"]) == SKILLS_DIR else " [dim](marketplace)[/dim]"
+        console().print(f"- {name}{source}" + (f": {meta['description']}" if meta.get("description") else ""))
 
 @app.command()
-def deploy(swarm_name: str, task: str = typer.Option(..., "--task")):
-    """Deploy a swarm locally with suggested skills."""
+def deploy(
+    swarm_name: str,
+    task: str = typer.Option(..., "--task"),
+    batch_llm: bool = typer.Option(False, "--batch-llm", help="Micro-batch and deduplicate LLM calls made in this process"),
+):
+    """Deploy a swarm with suggested skills (on the `agentflow serve` daemon when one is running)."""
+    import asyncio
+    from agentflow.core.deploy import deploy as run_deploy
+    from agentflow.memory import Memory
+
+    if batch_llm:
+        from agentflow.core.llm import configure_batching
+        configure_batching()
+
     memory = Memory()
     profile = memory.retrieve_json("user_profile") or {}
-    console.print(f"[bold blue]Deploying {swarm_name} for task: {task}[/bold blue]")
-    swarm = Swarm(name=swarm_name, skills=["codegen"])  # Dynamic skills TBD
-    swarm.run(task)
-    console.print(f"[bold green]{swarm_name} deployed![/bold green]")
+    console().print(f"[bold blue]Deploying {swarm_name} for task: {task}[/bold blue]")
+    result = asyncio.run(run_deploy(swarm_name, task, memory))
+    console().print(result)
+    console().print(f"[bold green]{swarm_name} deployed![/bold green]")
+
+@app.command()
+def batch(
+    input_path: str = typer.Argument(..., help="JSONL file with one query per line"),
+    out: str = typer.Option(..., "--out", help="JSONL file for the results"),
+    field: str = typer.Option("query", "--field", help="Record field holding the query"),
+    id_field: str = typer.Option("id", "--id-field", help="Record field holding the id (default: line number)"),
+    skills: str = typer.Option(None, "--skills", help="Comma-separated skills (default: all built-in skills)"),
+    concurrency: int = typer.Option(16, "--concurrency", help="Queries run at once"),
+    as_completed: bool = typer.Option(False, "--as-completed", help="Write results as they finish instead of in input order"),
+    job: str = typer.Option(None, "--job", help="Checkpoint id (default: derived from the input path)"),
+    restart: bool = typer.Option(False, "--restart", help="Ignore checkpoints from earlier runs of this job"),
+):
+    """Run every query in a JSONL file, resuming where an interrupted run stopped."""
+    import asyncio
+    import json
+    from agentflow.core import http
+    from agentflow.core.agent import Agent
+    from agentflow.core.batch import job_id, read_jsonl
+    from agentflow.memory import Memory
+    from agentflow.skills import load_skill
+    from agentflow.skills.registry import builtin_skills
+
+    names = [name.strip() for name in skills.split(",")] if skills else sorted(builtin_skills())
+    agent = Agent(skills=[load_skill(name) for name in names], name="batch_agent", max_concurrency=concurrency)
+    memory = Memory(batched=True)
+    job = job or job_id(input_path)
+    resuming = not restart and memory.retrieve(f"batch_{job}") is not None  # Earlier results are kept
+
+    async def run() -> int:
+        written = 0
+        try:
+            with open(out, "a" if resuming else "w", encoding="utf-8") as f:
+                results = agent.run_batch(
+                    read_jsonl(input_path, field, id_field), concurrency=concurrency,
+                    ordered=not as_completed, memory=memory, job=job, restart=restart
+                )
+                async for item_id, query, result in results:
+                    f.write(json.dumps({"id": item_id, "query": query, "result": result}) + "\n")
+                    written += 1
+                    if written % 1000 == 0:
+                        f.flush()
+                        console().print(f"[dim]{written} results written[/dim]")
+        finally:
+            await http.close()
+        return written
+
+    console().print(f"[bold blue]{'Resuming' if resuming else 'Starting'} batch job {job}[/bold blue]")
+    written = asyncio.run(run())
+    memory.close()
+    console().print(f"[bold green]Wrote {written} results to {out}[/bold green]")
+
+@app.command()
+def serve(
+    socket: str = typer.Option(None, "--socket", help="Unix socket path (default: ~/.agentflow/agentflow.sock)"),
+    port: int = typer.Option(None, "--port", help="Also listen for HTTP on 127.0.0.1:PORT; requests need the bearer token written to ~/.agentflow/serve.token"),
+    concurrency: int = typer.Option(8, "--concurrency", help="Requests run at once"),
+    queue: int = typer.Option(64, "--queue", help="Requests allowed to wait before new ones get 503"),
+    status: bool = typer.Option(False, "--status", help="Show the running daemon's health and exit"),
+    stop: bool = typer.Option(False, "--stop", help="Gracefully stop the running daemon and exit"),
+    batch_llm: bool = typer.Option(False, "--batch-llm", help="Micro-batch and deduplicate LLM calls across requests"),
+):
+    """Run a long-lived daemon that keeps agents, skills and connections warm for deploy and the watcher."""
+    import asyncio
+    import json
+    from agentflow.core.server import AgentServer, ping, request_shutdown
+
+    if status:
+        health = asyncio.run(ping(socket))
+        console().print(json.dumps(health, indent=2) if health else "[bold yellow]No server running.[/bold yellow]")
+        return
+    if stop:
+        stopped = asyncio.run(request_shutdown(socket))
+        console().print("[bold green]Server stopping.[/bold green]" if stopped else "[bold yellow]No server running.[/bold yellow]")
+        return
+    if batch_llm:
+        from agentflow.core.llm import configure_batching
+        configure_batching()
+    server = AgentServer(path=socket, port=port, max_concurrency=concurrency, max_queue=queue)
+    try:
+        asyncio.run(server.serve_forever())
+    except RuntimeError as e:
+        console().print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(1)
+
+@app.command()
+def stats(
+    trace_file: str = typer.Option(None, "--file", help="JSONL trace to read (default: ~/.agentflow/trace.jsonl)"),
+    prometheus: bool = typer.Option(False, "--prometheus", help="Print Prometheus text format instead of a table"),
+):
+    """Show where time goes: latency and errors per span from recorded traces."""
+    from agentflow.core.tracing import DEFAULT_TRACE_PATH, load_jsonl, render_prometheus
+    configured = os.environ.get("AGENTFLOW_TRACE", "")
+    path = trace_file or (configured if configured.lower() not in ("", "off", "0", "false") else DEFAULT_TRACE_PATH)
+    metrics = load_jsonl(path)
+    if prometheus:
+        typer.echo(render_prometheus(metrics), nl=False)
+        return
+    rows = metrics.summary()
+    if not rows:
+        console().print(f"[bold yellow]No spans recorded in {path}[/bold yellow]")
+        return
+    from rich.table import Table
+    table = Table(title=f"Spans from {path}")
+    for column in ("Span", "Count", "Errors", "Mean ms", "p50 ms", "p95 ms", "Phases (mean ms)"):
+        table.add_column(column, justify="left" if column in ("Span", "Phases (mean ms)") else "right")
+    for row in rows:
+        table.add_row(
+            row["span"],
+            str(row["count"]),
+            str(row["errors"]),
+            f"{row['mean'] * 1000:.1f}",
+            f"{row['p50'] * 1000:.1f}",
+            f"{row['p95'] * 1000:.1f}",
+            ", ".join(f"{phase} {seconds * 1000:.1f}" for phase, seconds in sorted(row["phases"].items())),
+        )
+    console().print(table)
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -1,3 +1,10 @@
-from .agent import Agent
-from .llm import LLM
-from .planner import Planner
\ No newline at end of file
+import importlib
+
+_EXPORTS = {"Agent": ".agent", "LLM": ".llm", "Plan": ".planner", "Planner": ".planner"}
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
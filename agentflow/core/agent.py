@@ -1,23 +1,64 @@
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Union
 import asyncio
 from agentflow.skills import Skill
+from .batch import BatchRunner
+from .cache import get_cache
 from .llm import LLM
-from .planner import Planner  # Correct import
+from .planner import Plan, Planner  # Correct import
+from .tracing import get_tracer
+from agentflow.memory import Memory
 
 class Agent:
     def __init__(
         self,
         skills: List[Skill],
         llm: str = "ollama",
-        name: str = "default_agent"
+        name: str = "default_agent",
+        max_concurrency: int = 4,
+        skill_timeout: Optional[float] = 60.0,
+        batching: Optional[bool] = None
     ):
         self.name = name
         self.skills = {skill.name: skill for skill in skills}
-        self.llm = LLM(provider=llm)
+        self.llm = LLM(provider=llm, cache=get_cache(), batching=batching)
         self.planner = Planner(self.llm)
+        self.skill_timeout = skill_timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)  # Caps concurrent skills per agent
     
     async def run(self, query: str) -> str:
         if not self.skills:
             return "No skills available"
-        plan = await self.planner.generate_plan(query, list(self.skills.keys()))
-        return await self.planner.execute_plan(self, query, plan)
\ No newline at end of file
+        with get_tracer().span("agent.run", agent=self.name):
+            plan = await self.planner.generate_plan(query, list(self.skills.keys()))
+            return await self.planner.execute_plan(self, query, plan)
+
+    async def run_stream(self, query: str) -> AsyncIterator[str]:
+        """Yield each plan step as the LLM produces it, then each skill result as it finishes."""
+        if not self.skills:
+            yield "No skills available"
+            return
+        steps = {}
+        async for skill_name, deps in self.planner.stream_plan(query, list(self.skills.keys())):
+            steps[skill_name] = deps
+            yield f"Plan: {skill_name}" + (f" (after {', '.join(deps)})" if deps else "")
+        async for _, line in self.planner.iter_plan(self, query, Plan(steps)):
+            yield line
+
+    async def run_batch(
+        self,
+        queries: Iterable[Union[str, Tuple[str, str]]],
+        concurrency: int = 16,
+        ordered: bool = True,
+        memory: Optional[Memory] = None,
+        job: Optional[str] = None,
+        restart: bool = False
+    ) -> AsyncIterator[Tuple[str, str, str]]:
+        """Run many queries (strings or ``(id, query)`` pairs), yielding ``(id, query, result)``.
+
+        Input is consumed lazily with bounded work in flight, duplicate queries
+        share one plan, and with ``memory`` (ideally batched) and ``job`` the
+        run can be resumed where it stopped. See ``BatchRunner``.
+        """
+        runner = BatchRunner(self, concurrency=concurrency, ordered=ordered, memory=memory, job=job, restart=restart)
+        async for item in runner.run(queries):
+            yield item
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Iterator, Optional, Tuple, Union
+from agentflow.core.planner import Plan
+from agentflow.core.tracing import get_tracer
+from agentflow.memory import Memory
+
+if TYPE_CHECKING:
+    from agentflow.core.agent import Agent
+
+Item = Tuple[str, str]  # (id, query)
+
+def read_jsonl(path: str, field: str = "query", id_field: str = "id") -> Iterator[Item]:
+    """Lazily yield ``(id, query)`` from a JSONL file; ids default to the line number."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield str(line_no), record
+                continue
+            if field not in record:
+                raise ValueError(f"{path}:{line_no}: missing field {field!r}")
+            yield str(record.get(id_field, line_no)), str(record[field])
+
+def job_id(path: str) -> str:
+    """Default checkpoint id for an input file."""
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+
+def _items(queries: Iterable[Union[str, Item]]) -> Iterator[Item]:
+    for i, query in enumerate(queries):
+        yield (str(i), query) if isinstance(query, str) else (str(query[0]), query[1])
+
+class BatchRunner:
+    """Runs a stream of queries through one agent with bounded work in flight.
+
+    At most ``concurrency`` queries run at once and at most ``window`` are
+    admitted but not yet emitted, so memory stays constant however long the
+    input is. Results come out in input order (``ordered``) or as they
+    complete. Identical queries share one plan from a bounded LRU; a plan that
+    fails is evicted so later duplicates plan again. With a ``memory`` and
+    ``job``, each successfully emitted id is checkpointed (batched, so
+    at-least-once) and skipped when the job is run again, while failed ids
+    are retried; ``restart`` forgets earlier progress. A run that emits
+    every item without an error deletes the job's checkpoints.
+    """
+
+    def __init__(
+        self,
+        agent: "Agent",
+        concurrency: int = 16,
+        ordered: bool = True,
+        window: Optional[int] = None,
+        memory: Optional[Memory] = None,
+        job: Optional[str] = None,
+        restart: bool = False,
+        plan_cache_size: int = 10000
+    ):
+        self.agent = agent
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.window = window or concurrency * 4
+        self.memory = memory
+        self.job = job
+        self.plan_cache_size = plan_cache_size
+        self.stats = {"submitted": 0, "skipped": 0, "completed": 0, "errors": 0, "plans": 0, "shared_plans": 0}
+        self._plans: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._generation = 0
+        if memory is not None and job is not None:
+            meta = memory.retrieve_json(self._meta_key)
+            if meta is None or restart:
+                if meta is not None:
+                    memory.delete_prefix(f"{self._meta_key}_")  # Earlier generations' checkpoints
+                meta = {"generation": meta["generation"] + 1 if meta else 0}
+                memory.store_json(self._meta_key, meta)
+            self._generation = meta["generation"]
+
+    @property
+    def _meta_key(self) -> str:
+        return f"batch_{self.job}"
+
+    def _done_key(self, item_id: str) -> str:
+        return f"batch_{self.job}_{self._generation}_{item_id}"
+
+    @property
+    def checkpointing(self) -> bool:
+        return self.memory is not None and self.job is not None
+
+    def _pending(self, items: Iterator[Item], chunk: int = 500) -> Iterator[Item]:
+        """Drop items already checkpointed, looking them up one chunk at a time."""
+        if not self.checkpointing:
+            yield from items
+            return
+        while True:
+            batch = list(itertools.islice(items, chunk))
+            if not batch:
+                return
+            done = self.memory.retrieve_many(self._done_key(item_id) for item_id, _ in batch)
+            for item_id, query in batch:
+                if done[self._done_key(item_id)] is None:
+                    yield item_id, query
+                else:
+                    self.stats["skipped"] += 1
+
+    def _plan(self, query: str) -> "asyncio.Future":
+        future = self._plans.get(query)
+        if future is not None:
+            self._plans.move_to_end(query)
+            self.stats["shared_plans"] += 1
+            return future
+        self.stats["plans"] += 1
+        future = asyncio.ensure_future(self.agent.planner.generate_plan(query, list(self.agent.skills)))
+        future.add_done_callback(lambda done: self._evict_failed(query, done))
+        self._plans[query] = future
+        while len(self._plans) > self.plan_cache_size:
+            self._plans.popitem(last=False)
+        return future
+
+    def _evict_failed(self, query: str, future: "asyncio.Future"):
+        if (future.cancelled() or future.exception() is not None) and self._plans.get(query) is future:
+            del self._plans[query]
+
+    async def _run_one(self, item: Item) -> Tuple[str, str, str, bool]:
+        item_id, query = item
+        ok = True
+        async with self._semaphore:
+            try:
+                with get_tracer().span("agent.run", agent=self.agent.name, mode="batch"):
+                    plan: Plan = await asyncio.shield(self._plan(query))
+                    result = await self.agent.planner.execute_plan(self.agent, query, plan)
+            except Exception as e:
+                self.stats["errors"] += 1
+                result = f"Batch error: {str(e)}"
+                ok = False
+        self.stats["completed"] += 1
+        return item_id, query, result, ok
+
+    def _checkpoint(self, item_id: str, ok: bool):
+        if self.checkpointing and ok:  # Failed items stay pending so a resumed run retries them
+            self.memory.store(self._done_key(item_id), "1")
+
+    def _finish(self):
+        """Forget a job whose every item succeeded; its checkpoints are no longer needed."""
+        if self.checkpointing and not self.stats["errors"]:
+            self.memory.delete_prefix(f"{self._meta_key}_")
+            self.memory.delete(self._meta_key)
+
+    async def run(self, queries: Iterable[Union[str, Item]]) -> AsyncIterator[Tuple[str, str, str]]:
+        """Yield ``(id, query, result)``; a successful item is checkpointed once the consumer asks for the next one."""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        items = self._pending(_items(queries))
+        running: "deque[asyncio.Task]" = deque()
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(running) < self.window:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    self.stats["submitted"] += 1
+                    running.append(asyncio.ensure_future(self._run_one(item)))
+                if not running:
+                    self._finish()
+                    return
+                if self.ordered:
+                    task = running.popleft()
+                    result = await task
+                else:
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    task = done.pop()
+                    running.remove(task)
+                    result = task.result()
+                item_id, query, text, ok = result
+                yield item_id, query, text
+                self._checkpoint(item_id, ok)
+        finally:
+            for task in running:
+                task.cancel()
+            if self.checkpointing:
+                self.memory.flush()
@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from agentflow.memory import Memory
+
+class ResponseCache:
+    """Content-addressed cache for LLM responses.
+
+    Entries live in an in-memory LRU bounded by entry count and total characters.
+    When a ``Memory`` is given, entries are also written through to an
+    ``llm_cache`` table in its SQLite file so they survive restarts; a
+    persistent hit is promoted back into the LRU. Every ``prune_every`` writes
+    the persistent tier deletes expired entries and then the least recently
+    used ones beyond ``max_persistent_entries``. ``aget``/``aset`` run the
+    SQLite work on a dedicated thread so async callers never block the event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_chars: Optional[int] = 16 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+        memory: Optional[Memory] = None,
+        max_persistent_entries: Optional[int] = 100000,
+        prune_every: int = 256,
+    ):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.ttl = ttl
+        self.memory = memory
+        self.max_persistent_entries = max_persistent_entries
+        self.prune_every = prune_every
+        self._writes = 0
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._chars = 0
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.pruned = 0
+        self.conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if memory is not None:
+            self.conn = sqlite3.connect(memory.db_path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT, expires REAL, used REAL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires ON llm_cache (expires)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_used ON llm_cache (used)")
+            # Entries written by older versions as JSON rows of the key/value table
+            self.conn.execute("DELETE FROM memory WHERE key LIKE 'llm\\_cache\\_%' ESCAPE '\\'")
+            self.conn.commit()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """Hash the JSON-serialisable request parts (endpoint, model, prompt, options...)."""
+        payload = json.dumps(parts, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get_memory(key)
+        if value is None and self.conn is not None:
+            value = self._promote(key, self._load(key))
+        if value is None:
+            self.misses += 1
+        return value
+
+    def set(self, key: str, value: str):
+        expires = self._set_memory(key, value)
+        if self.conn is not None:
+            self._store(key, value, expires, self._due())
+
+    async def aget(self, key: str) -> Optional[str]:
+        """``get`` that reads the persistent tier off the event loop."""
+        value = self._get_memory(key)
+        if value is None and self.conn is not None:
+            value = self._promote(key, await self._run(self._load, key))
+        if value is None:
+            self.misses += 1
+        return value
+
+    async def aset(self, key: str, value: str):
+        """``set`` that writes (and prunes) the persistent tier off the event loop."""
+        expires = self._set_memory(key, value)
+        if self.conn is not None:
+            await self._run(self._store, key, value, expires, self._due())
+
+    def prune(self) -> int:
+        """Delete expired and surplus persistent entries; returns how many were removed."""
+        if self.conn is None:
+            return 0
+        with self._lock:
+            removed = self.conn.execute("DELETE FROM llm_cache WHERE expires <= ?", (time.time(),)).rowcount
+            if self.max_persistent_entries is not None:
+                removed += self.conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_persistent_entries,)
+                ).rowcount
+            self.conn.commit()
+        self.pruned += removed
+        return removed
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def _set_memory(self, key: str, value: str) -> Optional[float]:
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        self._insert(key, value, expires)
+        return expires
+
+    def _promote(self, key: str, stored: Optional[Tuple[str, Optional[float]]]) -> Optional[str]:
+        if stored is None:
+            return None
+        self._insert(key, *stored)
+        self.hits += 1
+        self.persistent_hits += 1
+        return stored[0]
+
+    def _due(self) -> bool:
+        self._writes += 1
+        return self._writes % self.prune_every == 0
+
+    def _load(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value, expires FROM llm_cache WHERE key = ? AND (expires IS NULL OR expires > ?)", (key, now)
+            ).fetchone()
+            if row is not None:
+                self.conn.execute("UPDATE llm_cache SET used = ? WHERE key = ?", (now, key))
+                self.conn.commit()
+        return row
+
+    def _store(self, key: str, value: str, expires: Optional[float], prune: bool):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires, used) VALUES (?, ?, ?, ?)",
+                (key, value, expires, time.time())
+            )
+            self.conn.commit()
+        if prune:
+            self.prune()
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agentflow-cache")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _insert(self, key: str, value: str, expires: Optional[float]):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires)
+        self._chars += len(value)
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_chars is not None and self._chars > self.max_chars)
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self._chars -= len(value)
+
+    def clear(self):
+        """Drop the in-memory tier (persistent entries expire by TTL)."""
+        self._entries.clear()
+        self._chars = 0
+
+    def close(self):
+        """Close the persistent tier."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "chars": self._chars,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "pruned": self.pruned,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+_cache: Optional[ResponseCache] = None
+
+def get_cache() -> ResponseCache:
+    """Return the process-wide response cache."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+def configure(**options) -> ResponseCache:
+    """Replace the process-wide cache, e.g. ``configure(memory=Memory())`` to persist it."""
+    global _cache
+    _cache = ResponseCache(**options)
+    return _cache
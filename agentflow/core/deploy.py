@@ -0,0 +1,37 @@
+import os
+from typing import Dict, List, Optional, Tuple
+from agentflow.core.agent import Agent
+from agentflow.core.swarm import Swarm
+from agentflow.memory import Memory
+from agentflow.skills import load_skill
+
+_swarms: Dict[Tuple[str, Tuple[str, ...], int], Swarm] = {}
+
+def get_swarm(swarm_name: str, memory: Memory, skills: Optional[List[str]] = None) -> Swarm:
+    """Return the swarm for ``swarm_name`` and its skills, building it (and loading skills) only once per process."""
+    skills = tuple(skills or ["codegen"])
+    key = (swarm_name, skills, id(memory))
+    if key not in _swarms:
+        agent = Agent(skills=[load_skill(name) for name in skills], name=swarm_name)
+        _swarms[key] = Swarm([agent], memory)
+    return _swarms[key]
+
+async def deploy(
+    swarm_name: str,
+    task: str,
+    memory: Memory,
+    skills: Optional[List[str]] = None,
+    use_server: bool = True
+) -> str:
+    """Run ``task`` on a swarm named ``swarm_name``.
+
+    When an ``agentflow serve`` daemon is listening the task is sent to it, so
+    skills, connection pools and caches are already warm; otherwise it runs in
+    the current process.
+    """
+    if use_server and not any(os.path.isfile(name) for name in skills or []):
+        from agentflow.core.server import send_deploy  # The daemon only runs registered skills, never files
+        result = await send_deploy(swarm_name, task, skills)
+        if result is not None:
+            return result
+    return await get_swarm(swarm_name, memory, skills).run(task)
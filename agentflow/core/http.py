@@ -0,0 +1,149 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+import aiohttp
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Methods that are safe to send twice; anything else is retried only when the caller says so
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+def _timing_trace() -> aiohttp.TraceConfig:
+    """Record connection-pool wait and connect time into a dict passed as ``trace_request_ctx``."""
+    trace = aiohttp.TraceConfig()
+
+    def mark(event):
+        async def callback(session, ctx, params):
+            if isinstance(ctx.trace_request_ctx, dict):
+                ctx.trace_request_ctx[event] = time.perf_counter()
+        return callback
+
+    trace.on_connection_queued_start.append(mark("pool_start"))
+    trace.on_connection_queued_end.append(mark("pool_end"))
+    trace.on_connection_create_start.append(mark("connect_start"))
+    trace.on_connection_create_end.append(mark("connect_end"))
+    trace.on_request_start.append(mark("request_start"))
+    trace.on_request_end.append(mark("headers"))
+    return trace
+
+def timing_phases(timings: dict) -> dict:
+    """Turn marks recorded by the timing trace into ``pool`` and ``connect`` seconds."""
+    phases = {}
+    if "pool_end" in timings and "pool_start" in timings:
+        phases["pool"] = timings["pool_end"] - timings["pool_start"]
+    if "connect_end" in timings and "connect_start" in timings:
+        phases["connect"] = timings["connect_end"] - timings["connect_start"]
+    return phases
+
+class HTTPClient:
+    """Pooled HTTP client shared by the LLM and every network skill."""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 16,
+        keepalive_timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 300.0,
+        total_timeout: Optional[float] = None,
+        retries: int = 2,
+        backoff: float = 0.25,
+        max_backoff: float = 4.0,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout, connect=connect_timeout, sock_read=read_timeout
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # aiohttp sessions are bound to the loop that created them, so keep one per loop
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    def session(self) -> aiohttp.ClientSession:
+        """Return the pooled session for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            for stale in [l for l in self._sessions if l.is_closed()]:
+                del self._sessions[stale]
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, trace_configs=[_timing_trace()])
+            self._sessions[loop] = session
+        return session
+
+    def _delay(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        retries: Optional[int] = None,
+        idempotent: Optional[bool] = None,
+        **kwargs
+    ):
+        """Send a request through the pool, retrying connection errors, timeouts and 429/5xx.
+
+        Only idempotent requests are retried: methods in ``IDEMPOTENT_METHODS``
+        by default, or any request passed ``idempotent=True`` (e.g. a POST that
+        only reads, like a model generation).
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempts = ((self.retries if retries is None else retries) if idempotent else 0) + 1
+        session = self.session()
+        for attempt in range(attempts):
+            last = attempt + 1 >= attempts
+            try:
+                resp = await session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last:
+                    raise
+            else:
+                if resp.status in RETRY_STATUSES and not last:
+                    resp.release()
+                else:
+                    try:
+                        yield resp
+                    finally:
+                        resp.release()
+                    return
+            await asyncio.sleep(self._delay(attempt))
+
+    async def close(self):
+        """Close the session owned by the running loop."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+
+_client: Optional[HTTPClient] = None
+
+def get_client() -> HTTPClient:
+    """Return the process-wide HTTP client."""
+    global _client
+    if _client is None:
+        _client = HTTPClient()
+    return _client
+
+def configure(**options) -> HTTPClient:
+    """Replace the process-wide client with one built from the given options."""
+    global _client
+    _client = HTTPClient(**options)
+    return _client
+
+async def close():
+    """Close the process-wide client's session for the running loop."""
+    if _client is not None:
+        await _client.close()
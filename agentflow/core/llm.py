@@ -1,36 +1,351 @@
 import aiohttp
 import asyncio
+import hashlib
 import json
+import math
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from .cache import ResponseCache
+from .http import HTTPClient, get_client, timing_phases
+from .prompt import context_window
+from .tracing import get_tracer
+
+DEFAULT_NUM_PREDICT = 100
+
+def parse_stream_line(line: bytes) -> Tuple[str, bool]:
+    """Parse one newline-delimited chunk from Ollama (JSON) or llama.cpp (SSE "data:" JSON).
+
+    Returns the token text and whether the server marked the stream as finished.
+    """
+    line = line.strip()
+    if line.startswith(b"data:"):
+        line = line[5:].strip()
+    if not line:
+        return "", False
+    if line == b"[DONE]":
+        return "", True
+    data = json.loads(line)
+    if "error" in data:
+        raise RuntimeError(data["error"])
+    token = data.get("response") or data.get("content") or ""
+    return token, bool(data.get("done") or data.get("stop"))
+
+def hash_embedding(text: str, dim: int = 256) -> List[float]:
+    """Deterministic bag-of-words embedding used when no embedding server is configured."""
+    vector = [0.0] * dim
+    for word in re.findall(r"\w+", text.lower()):
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dim
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+class _BatchState:
+    """Per-event-loop queues and limits of a MicroBatcher (asyncio primitives are loop-bound)."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_in_flight: int, max_pending: int):
+        self.loop = loop
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.admission = asyncio.Semaphore(max_pending)
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.queue: List[Tuple[str, Callable[[], Awaitable[str]], asyncio.Future]] = []
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.tasks = set()
+
+class MicroBatcher:
+    """Coordinates concurrent generate calls to one backend.
+
+    Requests arriving within ``window`` seconds of each other are released
+    together (or as soon as ``max_batch`` are waiting) so the server's parallel
+    slots fill at once, and at most ``max_in_flight`` are on the wire at a
+    time. Identical requests already queued or in flight share one result
+    (single-flight), and once ``max_pending`` distinct requests are queued or
+    running, new callers wait for room instead of piling onto the server.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch: int = 8, max_in_flight: int = 4, max_pending: int = 64):
+        self.window = window
+        self.max_batch = max_batch
+        self.max_in_flight = max_in_flight
+        self.max_pending = max_pending
+        self.requests = 0
+        self.deduplicated = 0
+        self.batches = 0
+        self.backpressured = 0
+        self._states: Dict[asyncio.AbstractEventLoop, _BatchState] = {}
+
+    def _state(self) -> _BatchState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            for stale in [l for l in self._states if l.is_closed()]:
+                del self._states[stale]
+            state = self._states[loop] = _BatchState(loop, self.max_in_flight, self.max_pending)
+        return state
+
+    async def submit(self, key: str, send: Callable[[], Awaitable[str]]) -> str:
+        """Run ``send`` for ``key`` through the batcher, or join the identical request already pending."""
+        state = self._state()
+        self.requests += 1
+        future = state.inflight.get(key)
+        if future is None:
+            if state.admission.locked():
+                self.backpressured += 1
+            await state.admission.acquire()
+            future = state.inflight.get(key)  # An identical request may have been admitted meanwhile
+            if future is None:
+                future = state.loop.create_future()
+                state.inflight[key] = future
+                state.queue.append((key, send, future))
+                if len(state.queue) >= self.max_batch:
+                    self._flush(state)
+                elif state.handle is None:
+                    state.handle = state.loop.call_later(self.window, self._flush, state)
+            else:
+                state.admission.release()
+                self.deduplicated += 1
+        else:
+            self.deduplicated += 1
+        # Shielded so one caller giving up does not cancel the request for the others
+        return await asyncio.shield(future)
+
+    def _flush(self, state: _BatchState):
+        if state.handle is not None:
+            state.handle.cancel()
+            state.handle = None
+        batch, state.queue = state.queue, []
+        if batch:
+            self.batches += 1
+        for key, send, future in batch:
+            task = state.loop.create_task(self._dispatch(state, key, send, future))
+            state.tasks.add(task)
+            task.add_done_callback(state.tasks.discard)
+
+    async def _dispatch(self, state: _BatchState, key: str, send: Callable[[], Awaitable[str]], future: asyncio.Future):
+        try:
+            async with state.slots:
+                result = await send()
+            if not future.done():
+                future.set_result(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            state.inflight.pop(key, None)
+            state.admission.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold an in-flight slot for a request that cannot be shared, such as a stream."""
+        state = self._state()
+        self.requests += 1
+        if state.admission.locked():
+            self.backpressured += 1
+        async with state.admission, state.slots:
+            yield
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "deduplicated": self.deduplicated,
+            "batches": self.batches,
+            "backpressured": self.backpressured,
+            "in_flight": sum(len(state.inflight) for state in self._states.values()),
+        }
+
+_batchers: Dict[str, MicroBatcher] = {}
+_batcher_options: Dict[str, float] = {}
+_batching_enabled = False  # Applies to every LLM created with batching=None
+
+def get_batcher(base_url: str) -> MicroBatcher:
+    """Return the process-wide batcher for a backend, so every LLM talking to it shares its limits."""
+    if base_url not in _batchers:
+        _batchers[base_url] = MicroBatcher(**_batcher_options)
+    return _batchers[base_url]
+
+def configure_batching(enabled: bool = True, **options):
+    """Turn batching on (or off) for every LLM without an explicit ``batching``, existing ones included.
+
+    ``options`` (``window``, ``max_batch``, ``max_in_flight``, ``max_pending``)
+    apply to batchers created from now on.
+    """
+    global _batching_enabled
+    _batching_enabled = enabled
+    _batcher_options.clear()
+    _batcher_options.update(options)
+    _batchers.clear()
 
 class LLM:
-    def __init__(self, provider: str = "ollama"):
+    def __init__(
+        self,
+        provider: str = "ollama",
+        model: str = "llama3",
+        http: Optional[HTTPClient] = None,
+        cache: Optional[ResponseCache] = None,
+        embed_model: Optional[str] = None,
+        batching: Optional[bool] = None
+    ):
         self.provider = provider
+        self.model = model
+        self.embed_model = embed_model or model
+        self._http = http
+        self.cache = cache
         self.base_url = {
             "ollama": "http://localhost:11434",
             "llama.cpp": "http://localhost:8080",
             "openai": "https://api.openai.com/v1"
         }.get(provider, "none")
+        self.batching = batching
+        self._batcher: Optional[MicroBatcher] = None
+
+    @property
+    def batcher(self) -> Optional[MicroBatcher]:
+        """The batcher requests go through, looked up per call so ``configure_batching`` reaches this LLM."""
+        if self._batcher is not None:
+            return self._batcher
+        enabled = _batching_enabled if self.batching is None else self.batching
+        return get_batcher(self.base_url) if enabled and self.base_url != "none" else None
+
+    @batcher.setter
+    def batcher(self, batcher: Optional[MicroBatcher]):
+        self._batcher = batcher
 
-    async def generate(self, prompt: str) -> str:
+    @property
+    def http(self) -> HTTPClient:
+        """The pooled client this LLM sends requests through (process-wide by default)."""
+        return self._http or get_client()
+
+    @asynccontextmanager
+    async def _slot(self):
+        if self.batcher is None:
+            yield
+        else:
+            async with self.batcher.slot():
+                yield
+
+    def _options(self, prompt: str, num_predict: Optional[int]) -> dict:
+        options = {"num_predict": num_predict or DEFAULT_NUM_PREDICT}
+        num_ctx = context_window(prompt, options["num_predict"], self.model)
+        if num_ctx:  # Ollama silently truncates prompts longer than its default window
+            options["num_ctx"] = num_ctx
+        return options
+
+    async def generate(self, prompt: str, num_predict: Optional[int] = None) -> str:
+        """Complete ``prompt``, generating at most ``num_predict`` tokens (100 by default)."""
         if self.base_url == "none":
             return "No LLM configured"
+        options = self._options(prompt, num_predict)
+        key = ResponseCache.key(self.base_url, self.model, prompt, options)
+        with get_tracer().span("llm.generate", model=self.model) as span:
+            if self.cache:
+                looked_up = time.perf_counter()
+                cached = await self.cache.aget(key)
+                if cached is not None:
+                    span.phase("cache", time.perf_counter() - looked_up)
+                    return cached
+            batcher = self.batcher
+            if batcher is None:
+                return await self._generate(prompt, options, key, span)
+            enqueued = time.perf_counter()
+
+            async def send() -> str:
+                span.phase("queue", time.perf_counter() - enqueued)
+                return await self._generate(prompt, options, key, span)
+
+            return await batcher.submit(key, send)
+
+    async def _generate(self, prompt: str, options: dict, key: str, span=None) -> str:
+        timings = {}
+        sent = time.perf_counter()
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.base_url}/api/generate"
-                json_data = {
-                    "model": "llama3",
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {"num_predict": 100}
-                }
-                async with session.post(url, json=json_data) as resp:
-                    if resp.status == 404:
-                        return "LLM server not found or model unavailable."
-                    if resp.status != 200:
-                        return f"LLM error: HTTP {resp.status}"
-                    data = await resp.json()
-                    return data.get("response", "").strip()
+            url = f"{self.base_url}/api/generate"
+            json_data = {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False,
+                "options": options
+            }
+            async with self.http.request("POST", url, json=json_data, idempotent=True, trace_request_ctx=timings) as resp:
+                if resp.status == 404:
+                    return "LLM server not found or model unavailable."
+                if resp.status != 200:
+                    return f"LLM error: HTTP {resp.status}"
+                data = await resp.json()
+                response = data.get("response", "").strip()
+                if self.cache:
+                    await self.cache.aset(key, response)
+                return response
         except aiohttp.ClientConnectionError:
             return "LLM server unreachable."
+        except asyncio.TimeoutError:
+            return "LLM request timed out."
+        except Exception as e:
+            return f"LLM error: {str(e)}"
+        finally:
+            if span is not None:
+                phases = timing_phases(timings)
+                for phase, seconds in phases.items():
+                    span.phase(phase, seconds)
+                # Everything after the connection is ready: upload, prompt evaluation and generation
+                span.phase("generation", time.perf_counter() - sent - sum(phases.values()))
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed text through the provider's embeddings endpoint, or locally when none is configured."""
+        if self.base_url == "none":
+            return hash_embedding(text)
+        url = f"{self.base_url}/api/embeddings"
+        async with self.http.request("POST", url, json={"model": self.embed_model, "prompt": text}, idempotent=True) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"Embedding error: HTTP {resp.status}")
+            data = await resp.json()
+            return data["embedding"]
+
+    async def stream(self, prompt: str, num_predict: Optional[int] = None) -> AsyncIterator[str]:
+        """Yield response tokens as the server generates them (a cache hit arrives as one chunk)."""
+        if self.base_url == "none":
+            yield "No LLM configured"
+            return
+        options = self._options(prompt, num_predict)
+        key = self.cache.key(self.base_url, self.model, prompt, options) if self.cache else None
+        if key:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                yield cached
+                return
+        try:
+            url = f"{self.base_url}/api/generate"
+            json_data = {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "options": options
+            }
+            async with self._slot(), self.http.request("POST", url, json=json_data, idempotent=True) as resp:
+                if resp.status == 404:
+                    yield "LLM server not found or model unavailable."
+                    return
+                if resp.status != 200:
+                    yield f"LLM error: HTTP {resp.status}"
+                    return
+                tokens = []
+                finished = False
+                async for line in resp.content:
+                    token, finished = parse_stream_line(line)
+                    if token:
+                        tokens.append(token)
+                        yield token
+                    if finished:
+                        break
+                if key and finished:
+                    await self.cache.aset(key, "".join(tokens).strip())
+        except aiohttp.ClientConnectionError:
+            yield "LLM server unreachable."
+        except asyncio.TimeoutError:
+            yield "LLM request timed out."
         except Exception as e:
-            return f"LLM error: {str(e)}"
\ No newline at end of file
+            yield f"LLM error: {str(e)}"
@@ -1,28 +1,164 @@
-from typing import List, Dict
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
 import asyncio
+import re
 from agentflow.core.llm import LLM  # Fixed import
+from agentflow.core.prompt import PromptBuilder
+from agentflow.core.tracing import get_tracer
+
+PLAN_TOKENS = 64  # A plan is a short list of skill names
+
+class Plan:
+    """Dependency graph of skills: each step maps to the steps whose output it waits on."""
+
+    def __init__(self, steps: Optional[Dict[str, List[str]]] = None):
+        self.steps = dict(steps or {})
+
+    @classmethod
+    def from_list(cls, skills: List[str]) -> "Plan":
+        """Build a plan of independent steps."""
+        return cls({skill: [] for skill in skills})
+
+    @classmethod
+    def parse(cls, text: str, available_skills: List[str]) -> "Plan":
+        """Parse ``"a, b -> c"``: skills in a comma group are independent, ``->`` makes the next group depend on the previous one."""
+        steps = {}
+        previous = []
+        for group in text.split("->"):
+            names = [name.strip() for name in group.split(",") if name.strip() in available_skills]
+            for name in names:
+                steps.setdefault(name, list(previous))
+            if names:
+                previous = names
+        return cls(steps)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate steps in dependency order."""
+        done = []
+        remaining = dict(self.steps)
+        while remaining:
+            ready = [name for name, deps in remaining.items() if all(d in done or d not in self.steps for d in deps)]
+            if not ready:
+                raise ValueError(f"Plan has a dependency cycle: {list(remaining)}")
+            for name in ready:
+                del remaining[name]
+                done.append(name)
+        return iter(done)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __repr__(self) -> str:
+        return f"Plan({self.steps})"
 
 class Planner:
     def __init__(self, llm: LLM):
         self.llm = llm
 
-    async def generate_plan(self, query: str, available_skills: List[str]) -> List[str]:
+    def _prompt(self, query: str, available_skills: List[str]) -> str:
+        return PromptBuilder(self.llm.model, num_predict=PLAN_TOKENS).render(
+            "Given the query '{query}' and available skills {skills}, suggest the skills to execute. "
+            "Separate skills that can run at the same time with commas, and use '->' before skills that need the previous skills' output.",
+            query=query,
+            skills=available_skills
+        )
+
+    async def generate_plan(self, query: str, available_skills: List[str]) -> Plan:
         """Generate a plan based on the query and available skills."""
-        prompt = f"Given the query '{query}' and available skills {available_skills}, suggest a sequence of skills to execute."
+        prompt = self._prompt(query, available_skills)
+        with get_tracer().span("planner.generate_plan"):
+            try:
+                plan = await self.llm.generate(prompt, num_predict=PLAN_TOKENS)
+                return Plan.parse(plan, available_skills)
+            except Exception as e:
+                return Plan.from_list(["local_search"])  # Fallback to a default skill
+
+    async def stream_plan(self, query: str, available_skills: List[str]) -> AsyncIterator[Tuple[str, List[str]]]:
+        """Yield ``(skill, dependencies)`` as soon as each skill name in the streamed plan is complete."""
+        text = ""
+        emitted = set()
+        async for token in self.llm.stream(self._prompt(query, available_skills), num_predict=PLAN_TOKENS):
+            text += token
+            delimiters = list(re.finditer(r",|->", text))
+            if not delimiters:
+                continue
+            for name, deps in Plan.parse(text[:delimiters[-1].end()], available_skills).steps.items():
+                if name not in emitted:
+                    emitted.add(name)
+                    yield name, deps
+        for name, deps in Plan.parse(text, available_skills).steps.items():
+            if name not in emitted:
+                yield name, deps
+
+    async def _run_step(self, agent: "Agent", skill_name: str, input_data: str) -> str:
+        skill = agent.skills[skill_name]
+        timeout = skill.timeout if skill.timeout is not None else agent.skill_timeout
+        async with agent.semaphore:
+            return await asyncio.wait_for(skill.execute(input_data), timeout)
+
+    async def iter_plan(self, agent: "Agent", query: str, plan: Union[Plan, List[str]]) -> AsyncIterator[Tuple[str, str]]:
+        """Run the plan and yield ``(skill, result line)`` as each step finishes.
+
+        Steps whose dependencies are met run concurrently, bounded by the agent's
+        concurrency cap. A step with dependencies receives their outputs instead of
+        the query. A failed or timed-out step cancels every step still pending.
+        """
+        if not isinstance(plan, Plan):
+            plan = Plan.from_list(plan)
+        waiting = dict(plan.steps)
+        outputs: Dict[str, str] = {}
+        running: Dict[asyncio.Task, str] = {}
+        finished: List[Tuple[str, str]] = []
+
+        def start_ready():
+            for name, deps in list(waiting.items()):
+                if all(dep in outputs or dep not in plan.steps for dep in deps):
+                    del waiting[name]
+                    if name not in agent.skills:
+                        outputs[name] = ""
+                        finished.append((name, f"Skill {name} not found"))
+                        continue
+                    inputs = [outputs[dep] for dep in deps if dep in outputs]
+                    task = asyncio.create_task(self._run_step(agent, name, "\n".join(inputs) if inputs else query))
+                    running[task] = name
+
         try:
-            plan = await self.llm.generate(prompt)
-            # Parse plan into a list (simplified)
-            return [skill.strip() for skill in plan.split(",") if skill.strip() in available_skills]
-        except Exception as e:
-            return ["local_search"]  # Fallback to a default skill
-
-    async def execute_plan(self, agent: "Agent", query: str, plan: List[str]) -> str:
-        """Execute the plan step-by-step."""
-        results = []
-        for skill_name in plan:
-            if skill_name in agent.skills:
-                result = await agent.skills[skill_name].execute(query)
-                results.append(f"Skill {skill_name}: {result}")
-            else:
-                results.append(f"Skill {skill_name} not found")
-        return "\n".join(results)
\ No newline at end of file
+            start_ready()
+            while finished or running:
+                while finished:
+                    name, line = finished.pop(0)
+                    yield name, line
+                    start_ready()
+                if not running:
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                failed = False
+                for task in done:
+                    name = running.pop(task)
+                    try:
+                        outputs[name] = task.result()
+                        finished.append((name, f"Skill {name}: {outputs[name]}"))
+                    except asyncio.TimeoutError:
+                        failed = True
+                        finished.append((name, f"Skill {name} timed out"))
+                    except Exception as e:
+                        failed = True
+                        finished.append((name, f"Skill {name} failed: {str(e)}"))
+                if failed:
+                    for task, name in running.items():
+                        task.cancel()
+                        finished.append((name, f"Skill {name} cancelled"))
+                    finished.extend((name, f"Skill {name} cancelled") for name in waiting)
+                    running.clear()
+                    waiting.clear()
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def execute_plan(self, agent: "Agent", query: str, plan: Union[Plan, List[str]]) -> str:
+        """Execute the plan, running independent steps concurrently."""
+        if not isinstance(plan, Plan):
+            plan = Plan.from_list(plan)
+        results = {}
+        async for skill_name, line in self.iter_plan(agent, query, plan):
+            results[skill_name] = line
+        return "\n".join(results[skill_name] for skill_name in plan if skill_name in results)
@@ -0,0 +1,153 @@
+import asyncio
+import re
+from typing import Dict, List, Optional
+
+DEFAULT_CONTEXT = 2048  # Ollama's num_ctx when a request does not set one
+CONTEXT_LIMITS = {
+    "llama2": 4096,
+    "llama3": 8192,
+    "llama3.1": 131072,
+    "llama3.2": 131072,
+    "mistral": 32768,
+    "mixtral": 32768,
+    "phi3": 4096,
+    "gemma": 8192,
+    "gemma2": 8192,
+    "qwen2": 32768,
+    "qwen2.5": 32768,
+    "codellama": 16384,
+}
+TRUNCATED = " ...[truncated]"
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+def count_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` without a tokenizer.
+
+    BPE vocabularies average about four characters per token on English and
+    code, but punctuation-heavy text splits finer, so the estimate is the larger
+    of the two counts. It errs high, which is the safe side for budgeting, and
+    the count of joined texts never exceeds the sum of their counts.
+    """
+    return max(-(-len(text) // 4), len(_PIECES.findall(text)))
+
+def context_limit(model: str) -> int:
+    """Context window for ``model`` (``"llama3"``, ``"llama3:8b"``, ...), or ``DEFAULT_CONTEXT`` if unknown."""
+    name = model.split(":")[0].lower()
+    if name in CONTEXT_LIMITS:
+        return CONTEXT_LIMITS[name]
+    family = re.sub(r"[-_.]?\d+(\.\d+)?[bm]?$", "", name)
+    return CONTEXT_LIMITS.get(family, DEFAULT_CONTEXT)
+
+def _fit_end(text: str, tokens: int) -> int:
+    end = min(len(text), tokens * 4)
+    while end > 0 and count_tokens(text[:end]) > tokens:
+        end = int(end * 0.9)
+    return end
+
+def truncate_tokens(text: str, tokens: int) -> str:
+    """Cut ``text`` so its estimate fits in ``tokens``, marking the cut."""
+    if count_tokens(text) <= tokens:
+        return text
+    return text[:_fit_end(text, max(0, tokens - count_tokens(TRUNCATED)))].rstrip() + TRUNCATED
+
+def split_tokens(text: str, tokens: int) -> List[str]:
+    """Split ``text`` into chunks of at most ``tokens``, preferring line boundaries."""
+    chunks, current, size = [], [], 0
+    for line in text.splitlines(keepends=True):
+        line_tokens = count_tokens(line)
+        while line_tokens > tokens:  # A single line longer than a chunk is hard-split
+            if current:
+                chunks.append("".join(current))
+                current, size = [], 0
+            end = max(1, _fit_end(line, tokens))
+            chunks.append(line[:end])
+            line = line[end:]
+            line_tokens = count_tokens(line)
+        if size + line_tokens > tokens and current:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += line_tokens
+    if current:
+        chunks.append("".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+def context_window(prompt: str, num_predict: int, model: str) -> Optional[int]:
+    """``num_ctx`` to request so ``prompt`` plus the answer fit, or None when the server default suffices."""
+    needed = count_tokens(prompt) + num_predict
+    if needed <= DEFAULT_CONTEXT:
+        return None
+    size = DEFAULT_CONTEXT
+    while size < needed:
+        size *= 2
+    return min(size, context_limit(model))
+
+class PromptBuilder:
+    """Fits prompts into a model's context window.
+
+    The budget is the model's context minus the ``num_predict`` tokens reserved
+    for the answer and a small safety margin. ``render`` fills a template and,
+    when the fields do not fit, truncates the largest ones first so short
+    fields such as a query survive intact.
+    """
+
+    def __init__(self, model: str = "llama3", num_predict: int = 100, context: Optional[int] = None, reserve: int = 32):
+        self.model = model
+        self.num_predict = num_predict
+        self.context = context or context_limit(model)
+        self.reserve = reserve
+
+    @property
+    def budget(self) -> int:
+        return max(0, self.context - self.num_predict - self.reserve)
+
+    def fits(self, prompt: str) -> bool:
+        return count_tokens(prompt) <= self.budget
+
+    def render(self, template: str, **fields: str) -> str:
+        """Format ``template`` with ``fields``, truncating the largest fields until it fits."""
+        fields = {name: str(value) for name, value in fields.items()}
+        prompt = template.format(**fields)
+        if self.fits(prompt):
+            return prompt
+        available = self.budget - count_tokens(template.format(**{name: "" for name in fields}))
+        sizes = {name: count_tokens(value) for name, value in fields.items()}
+        shares: Dict[str, int] = {}
+        left = len(fields)
+        for name in sorted(fields, key=sizes.get):  # Water-fill: small fields keep everything
+            shares[name] = min(sizes[name], max(0, available) // left)
+            available -= shares[name]
+            left -= 1
+        return template.format(**{name: truncate_tokens(value, shares[name]) for name, value in fields.items()})
+
+async def summarize_text(
+    llm,
+    content: str,
+    instruction: str = "Summarize the following:",
+    num_predict: int = 200,
+    concurrency: int = 4,
+    max_rounds: int = 4
+) -> str:
+    """Summarize ``content`` with ``llm``, map-reducing over chunks when it does not fit the context.
+
+    Chunks are summarized concurrently (at most ``concurrency`` at a time), the
+    partial summaries are joined and summarized again, and so on until the
+    text fits one prompt or ``max_rounds`` is reached, after which it is
+    truncated.
+    """
+    builder = PromptBuilder(llm.model, num_predict=num_predict)
+    template = instruction + "\n\n{content}"
+    semaphore = asyncio.Semaphore(concurrency)
+    chunk_tokens = builder.budget - count_tokens(instruction) - 8
+
+    async def summarize_chunk(chunk: str) -> str:
+        async with semaphore:
+            return (await llm.generate(template.format(content=chunk), num_predict=num_predict)).strip()
+
+    for _ in range(max_rounds):
+        if builder.fits(template.format(content=content)) or chunk_tokens <= 0:
+            break
+        chunks = split_tokens(content, chunk_tokens)
+        content = "\n".join(await asyncio.gather(*(summarize_chunk(chunk) for chunk in chunks)))
+    return (await llm.generate(builder.render(template, content=content), num_predict=num_predict)).strip()
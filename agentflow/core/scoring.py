@@ -0,0 +1,191 @@
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from agentflow.core.tracing import Histogram
+
+ALL = "*"  # Query class holding every sample of an agent
+
+def query_class(query: str) -> str:
+    """Cheap default query class: the size of the query in words."""
+    words = len(query.split())
+    if words <= 8:
+        return "short"
+    return "medium" if words <= 64 else "long"
+
+class LatencyWindow:
+    """Latency histogram and success rate over the last ``size`` queries.
+
+    Only successful queries enter the histogram and the mean; a fast failure
+    says nothing about how fast an agent answers.
+    """
+
+    def __init__(self, size: int = 200):
+        self.size = size
+        self.samples: "deque[Tuple[float, bool]]" = deque()
+        self.histogram = Histogram()
+        self.failures = 0
+
+    def observe(self, latency: float, ok: bool = True):
+        if len(self.samples) >= self.size:
+            old_latency, old_ok = self.samples.popleft()
+            if old_ok:
+                self.histogram.remove(old_latency)
+            self.failures -= not old_ok
+        self.samples.append((latency, ok))
+        if ok:
+            self.histogram.observe(latency)
+        self.failures += not ok
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    @property
+    def mean(self) -> float:
+        """Mean latency of the successful queries in the window."""
+        return self.histogram.sum / self.histogram.count if self.histogram.count else 0.0
+
+    @property
+    def success_rate(self) -> float:
+        return 1.0 - self.failures / self.count if self.count else 1.0
+
+    def quantile(self, q: float) -> float:
+        return self.histogram.quantile(q)
+
+class AgentStatistics:
+    """Sliding-window latency and success statistics per agent and query class.
+
+    Everything lives in memory. The windows (histograms, percentiles, success
+    rates) are what ``summary`` reports. ``choose`` is a discounted UCB1
+    bandit: every pick multiplies all earlier samples' weight by
+    ``discount``, so an agent that has not been measured for a while loses
+    confidence, its exploration bonus grows until it is tried again, and
+    fresh samples outweigh old ones once it is. The reward is an agent's
+    discounted success rate, squared, times a speed score between 0.5 and 1
+    from how close its discounted mean latency (successes only) is to the
+    fastest candidate's. Per-class estimates are
+    used once a class has ``min_samples`` samples in its window, the agent's
+    overall statistics before that. ``snapshot``/``restore`` turn an agent's
+    windows into JSON-ready data for periodic persistence.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        exploration: float = 0.5,
+        discount: float = 0.99,
+        min_samples: int = 5,
+        snapshot_interval: float = 30.0,
+        classify: Callable[[str], str] = query_class
+    ):
+        self.window = window
+        self.exploration = exploration
+        self.discount = discount
+        self.min_samples = min_samples
+        self.snapshot_interval = snapshot_interval
+        self.classify = classify
+        self.windows: Dict[str, Dict[str, LatencyWindow]] = {}
+        self.picks = 0
+        # (agent, class) -> [count, successes, latency sum of successes, pick they were last decayed to]
+        self._discounted: Dict[Tuple[str, str], List[float]] = {}
+        self.last_snapshot = time.monotonic()
+
+    def _window(self, agent: str, query_class: str) -> LatencyWindow:
+        classes = self.windows.setdefault(agent, {})
+        window = classes.get(query_class)
+        if window is None:
+            window = classes[query_class] = LatencyWindow(self.window)
+        return window
+
+    def _record(self, agent: str, query_class: str, latency: float, ok: bool):
+        entry = self._discounted.get((agent, query_class))
+        if entry is None:
+            entry = self._discounted[(agent, query_class)] = [0.0, 0.0, 0.0, self.picks]
+        factor = self.discount ** (self.picks - entry[3])
+        entry[0] = entry[0] * factor + 1
+        entry[1] = entry[1] * factor + ok
+        entry[2] = entry[2] * factor + (latency if ok else 0.0)
+        entry[3] = self.picks
+
+    def observe(self, agent: str, query_class: str, latency: float, ok: bool = True):
+        for name in (query_class, ALL) if query_class != ALL else (ALL,):
+            self._window(agent, name).observe(latency, ok)
+            self._record(agent, name, latency, ok)
+
+    def estimate(self, agent: str, query_class: str) -> Optional[Tuple[float, float, float]]:
+        """Discounted ``(count, success rate, mean latency)`` routing should trust, or None when unmeasured.
+
+        The mean latency is infinite for an agent whose counted samples all failed.
+        """
+        window = self.windows.get(agent, {}).get(query_class)
+        entry = self._discounted.get((agent, query_class if window is not None and window.count >= self.min_samples else ALL))
+        if entry is None:
+            return None
+        factor = self.discount ** (self.picks - entry[3])
+        count, successes, latency = entry[0] * factor, entry[1] * factor, entry[2] * factor
+        return count, successes / count, latency / successes if successes else math.inf
+
+    def choose(self, candidates: Iterable[str], query_class: str = ALL) -> str:
+        """Pick the candidate with the highest upper confidence bound; unmeasured agents go first."""
+        self.picks += 1
+        candidates = list(candidates)
+        estimates = {}
+        for agent in candidates:
+            estimate = self.estimate(agent, query_class)
+            if estimate is None:
+                return agent
+            estimates[agent] = estimate
+        fastest = min(mean for _, _, mean in estimates.values())
+        total = sum(count for count, _, _ in estimates.values())
+
+        def bound(agent: str) -> float:
+            count, success_rate, mean = estimates[agent]
+            speed = 1.0 if mean <= fastest else fastest / mean
+            # A healthy agent scores between 0.5 and 1 by speed; failures cost quadratically, so no speed makes up for them
+            reward = success_rate ** 2 * (1.0 + speed) / 2
+            return reward + self.exploration * math.sqrt(math.log(total + 1) / count)
+
+        return max(candidates, key=bound)
+
+    def summary(self, agent: str) -> Dict[str, Any]:
+        window = self.windows.get(agent, {}).get(ALL)
+        if window is None:
+            return {"samples": 0, "success_rate": 1.0, "mean": 0.0, "p50": 0.0, "p99": 0.0}
+        return {
+            "samples": window.count,
+            "success_rate": window.success_rate,
+            "mean": window.mean,
+            "p50": window.quantile(0.5),
+            "p99": window.quantile(0.99),
+        }
+
+    def due(self) -> bool:
+        """Whether ``snapshot_interval`` has passed since the last snapshot."""
+        return time.monotonic() - self.last_snapshot >= self.snapshot_interval
+
+    def snapshot(self, agent: str) -> Dict[str, List[List[Any]]]:
+        """Per-class ``[latency, ok]`` samples of ``agent`` (the overall window is rebuilt on restore)."""
+        return {
+            query_class: [[latency, ok] for latency, ok in window.samples]
+            for query_class, window in self.windows.get(agent, {}).items()
+            if query_class != ALL
+        }
+
+    def restore(self, agent: str, data: Dict[str, List[List[Any]]]):
+        """Rebuild ``agent``'s statistics from a snapshot, the newest samples counting as the latest picks."""
+        self.windows.pop(agent, None)
+        for key in [key for key in self._discounted if key[0] == agent]:
+            del self._discounted[key]
+        now = self.picks
+        samples = sorted(
+            (position - len(class_samples), query_class, float(latency), bool(ok))
+            for query_class, class_samples in data.items()
+            for position, (latency, ok) in enumerate(class_samples)
+        )
+        try:
+            for age, query_class, latency, ok in samples:  # Oldest first; ages run up to -1
+                self.picks = now + age + 1
+                self.observe(agent, query_class, latency, ok)
+        finally:
+            self.picks = now
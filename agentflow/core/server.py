@@ -0,0 +1,280 @@
+import asyncio
+import hmac
+import os
+import secrets
+import signal
+import time
+from typing import Any, Dict, List, Optional
+import aiohttp
+from aiohttp import web
+from agentflow.core.deploy import _swarms, get_swarm
+from agentflow.core.tracing import get_tracer, render_prometheus
+from agentflow.memory import Memory
+from agentflow.skills.registry import get_registry
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~/.agentflow"), "agentflow.sock")
+DEFAULT_TOKEN = os.path.join(os.path.expanduser("~/.agentflow"), "serve.token")
+
+def socket_path() -> str:
+    """Socket the daemon listens on; ``AGENTFLOW_SOCKET`` overrides the default."""
+    return os.environ.get("AGENTFLOW_SOCKET") or DEFAULT_SOCKET
+
+def write_token(path: str) -> str:
+    """Create a fresh bearer token readable only by the current user and return it."""
+    token = secrets.token_urlsafe(32)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+    return token
+
+class AgentServer:
+    """Long-lived daemon that runs deploy requests on warm swarms.
+
+    Swarms (with their loaded skills), the HTTP pool, the LLM response cache
+    and a batched Memory live for the whole process. At most
+    ``max_concurrency`` requests run at once and up to ``max_queue`` more
+    wait; beyond that requests get 503 with ``Retry-After``. On SIGTERM,
+    SIGINT or ``POST /shutdown`` it stops accepting work, lets in-flight
+    requests finish for up to ``grace`` seconds, flushes Memory and removes
+    its socket.
+
+    The Unix socket is only accessible to the owning user. The optional TCP
+    listener is reachable by anyone on the machine, so every request on it
+    must send ``Authorization: Bearer <token>``; unless ``token`` is given a
+    new one is written to ``token_path`` (mode 0600) on start. Deploys may
+    only name skills known to the skill registry, never files to load.
+    """
+
+    def __init__(
+        self,
+        memory: Optional[Memory] = None,
+        path: Optional[str] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        max_concurrency: int = 8,
+        max_queue: int = 64,
+        grace: float = 30.0,
+        token: Optional[str] = None,
+        token_path: Optional[str] = None
+    ):
+        self.memory = memory if memory is not None else Memory(batched=True)
+        self.path = path or socket_path()
+        self.host = host
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.grace = grace
+        self.token = token
+        self.token_path = token_path or DEFAULT_TOKEN
+        self.started = time.time()
+        self.in_flight = 0
+        self.waiting = 0
+        self.served = 0
+        self.rejected = 0
+        self.accepting = True
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._runners: List[web.AppRunner] = []
+
+    def swarm(self, swarm_name: str, skills: Optional[List[str]] = None):
+        return get_swarm(swarm_name, self.memory, skills)
+
+    def app(self, require_token: bool = False) -> web.Application:
+        app = web.Application(middlewares=[self._authorize] if require_token else [])
+        app.router.add_post("/deploy", self.handle_deploy)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_post("/shutdown", self.handle_shutdown)
+        return app
+
+    @web.middleware
+    async def _authorize(self, request: web.Request, handler):
+        expected = f"Bearer {self.token}"
+        if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode()):
+            return web.json_response({"error": "Unauthorized"}, status=401)
+        return await handler(request)
+
+    def _busy(self, reason: str) -> web.Response:
+        self.rejected += 1
+        return web.json_response({"error": reason}, status=503, headers={"Retry-After": "1"})
+
+    async def handle_deploy(self, request: web.Request) -> web.Response:
+        if not self.accepting:
+            return self._busy("Server shutting down")
+        if self.waiting >= self.max_queue and self._slots.locked():
+            return self._busy("Server busy")
+        try:
+            body = await request.json()
+            swarm_name, task = body["swarm"], body["task"]
+            skills = body.get("skills")
+        except (ValueError, KeyError, TypeError):
+            return web.json_response({"error": "Expected JSON with 'swarm' and 'task'"}, status=400)
+        unknown = [name for name in skills or [] if not isinstance(name, str) or get_registry().get(name) is None]
+        if unknown:
+            return web.json_response({"error": f"Unknown skills: {', '.join(map(str, unknown))}"}, status=400)
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            swarm = self.swarm(swarm_name, skills)
+            result = await swarm.run(task)
+        except Exception as e:
+            return web.json_response({"error": f"Deploy failed: {e}"}, status=500)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+        self.served += 1
+        return web.json_response({"result": result})
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.health())
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=render_prometheus(get_tracer().metrics), content_type="text/plain")
+
+    async def handle_shutdown(self, request: web.Request) -> web.Response:
+        self.stop()
+        return web.json_response({"stopping": True})
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started,
+            "accepting": self.accepting,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "served": self.served,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "swarms": sorted({name for name, _, _ in _swarms}),
+        }
+
+    async def start(self):
+        """Bind the socket (and TCP port, if configured) and start serving."""
+        if os.path.exists(self.path):
+            if await ping(self.path) is not None:
+                raise RuntimeError(f"A server is already listening on {self.path}")
+            os.unlink(self.path)  # Stale socket from a crashed daemon
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._stopping = asyncio.Event()
+        runner = web.AppRunner(self.app(), handle_signals=False)
+        await runner.setup()
+        self._runners.append(runner)
+        umask = os.umask(0o177)  # Owner read/write only, from the moment the socket exists
+        try:
+            await web.UnixSite(runner, self.path).start()
+        finally:
+            os.umask(umask)
+        if self.port is not None:
+            if self.token is None:
+                self.token = write_token(self.token_path)
+            tcp = web.AppRunner(self.app(require_token=True), handle_signals=False)
+            await tcp.setup()
+            self._runners.append(tcp)
+            await web.TCPSite(tcp, self.host or "127.0.0.1", self.port).start()
+
+    def stop(self):
+        """Begin a graceful shutdown (safe to call from signal handlers and request handlers)."""
+        self.accepting = False
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def shutdown(self):
+        self.accepting = False
+        deadline = time.monotonic() + self.grace
+        while (self.in_flight or self.waiting) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        while self._runners:
+            await self._runners.pop().cleanup()
+        from agentflow.core import http
+        await http.close()
+        for swarm in list(_swarms.values()):
+            await swarm.save()
+        self.memory.flush()
+        get_tracer().flush()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def serve_forever(self):
+        await self.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):  # Not on the main thread / not supported
+                pass
+        print(f"[AgentFlow] Serving on {self.path}")
+        if self.port is not None:
+            print(f"[AgentFlow] HTTP on http://{self.host or '127.0.0.1'}:{self.port} (bearer token required)")
+        try:
+            await self._stopping.wait()
+        finally:
+            await self.shutdown()
+            print("[AgentFlow] Server stopped.")
+
+def _session(path: str, timeout: Optional[float]) -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(
+        connector=aiohttp.UnixConnector(path=path),
+        timeout=aiohttp.ClientTimeout(total=timeout)
+    )
+
+async def ping(path: Optional[str] = None, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+    """Health of the daemon on ``path``, or None when nothing is listening."""
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        async with _session(path, timeout) as session:
+            async with session.get("http://agentflow/health") as resp:
+                return await resp.json() if resp.status == 200 else None
+    except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+        return None
+
+async def send_deploy(
+    swarm_name: str,
+    task: str,
+    skills: Optional[List[str]] = None,
+    path: Optional[str] = None,
+    timeout: Optional[float] = None,
+    retries: int = 5
+) -> Optional[str]:
+    """Run a deploy on the daemon; None means no daemon is listening and the caller should run it itself.
+
+    A busy daemon (503) is retried after its ``Retry-After`` delay up to
+    ``retries`` times before giving up with an error string.
+    """
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return None
+    payload = {"swarm": swarm_name, "task": task, "skills": skills}
+    try:
+        async with _session(path, timeout) as session:
+            for attempt in range(retries + 1):
+                async with session.post("http://agentflow/deploy", json=payload) as resp:
+                    data = await resp.json()
+                    if resp.status != 503:
+                        return data["result"] if resp.status == 200 else f"Server error: {data.get('error')}"
+                    if attempt < retries:
+                        await asyncio.sleep(float(resp.headers.get("Retry-After", 1)))
+            return f"Server busy: {data.get('error')}"
+    except (aiohttp.ClientConnectionError, FileNotFoundError, ConnectionRefusedError):
+        return None  # Stale socket; run in-process instead
+    except asyncio.TimeoutError:
+        return "Server request timed out."
+
+async def request_shutdown(path: Optional[str] = None) -> bool:
+    """Ask the daemon to shut down gracefully; False when none is running."""
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return False
+    try:
+        async with _session(path, 5.0) as session:
+            async with session.post("http://agentflow/shutdown") as resp:
+                return resp.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+        return False
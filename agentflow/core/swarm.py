@@ -1,63 +1,289 @@
 import asyncio
-from typing import List, Dict
+import json
+import math
+import time
+from collections import deque
+from typing import Dict, List, Optional
 from agentflow.core.agent import Agent
+from agentflow.core.scoring import ALL, AgentStatistics
+from agentflow.knowledge_graph import KnowledgeGraph
 from agentflow.memory import Memory
 
 class Fabric:
-    def __init__(self, agents: List[Agent], memory: Memory):
+    """Agents collaborating through a shared knowledge graph.
+
+    The graph is loaded once, on the first run. Each run records weighted
+    ``lead -> collaborator`` interactions in memory, and the graph writes them
+    behind to SQLite. The lead is picked with UCB1 over each agent's mean
+    reward per interaction it led: agents that never led go first, and the
+    exploration bonus keeps giving the others a turn, so an early lead cannot
+    keep the role just by accumulating weight.
+    """
+
+    def __init__(self, agents: List[Agent], memory: Memory, graph: Optional[KnowledgeGraph] = None, exploration: float = 0.5):
         self.agents = {agent.name: agent for agent in agents}
         self.memory = memory
-        self.knowledge_graph = {}  # In-memory graph for agent interactions
+        self.exploration = exploration
+        self._graph = graph
+        self._initialized = False
+
+    @property
+    def knowledge_graph(self) -> KnowledgeGraph:
+        if self._graph is None:
+            self._graph = KnowledgeGraph(self.memory.db_path)
+        return self._graph
 
     async def initialize(self):
-        """Initialize the fabric by loading agent connections."""
-        for agent_name in self.agents:
-            connections = self.memory.retrieve(f"fabric_connections_{agent_name}")
-            if connections:
-                self.knowledge_graph[agent_name] = connections.split(",")
+        """Load the graph once, importing connections stored in the old string format."""
+        if self._initialized:
+            return
+        graph = self.knowledge_graph
+        await asyncio.get_running_loop().run_in_executor(None, graph.migrate_connections, self.memory, list(self.agents))
+        self._initialized = True
+
+    def lead(self) -> Agent:
+        """The agent with the highest upper confidence bound on its mean reward as lead."""
+        stats = {name: self.knowledge_graph.mean_weight(name) for name in self.agents}
+        for name, (_, count) in stats.items():
+            if not count:
+                return self.agents[name]
+        total = sum(count for _, count in stats.values())
+
+        def bound(name: str) -> float:
+            mean, count = stats[name]
+            return mean + self.exploration * math.sqrt(math.log(total) / count)
+
+        return self.agents[max(self.agents, key=bound)]
 
     async def run(self, query: str) -> str:
         """Run the fabric, allowing agents to collaborate dynamically."""
         await self.initialize()
-        lead_agent = list(self.agents.values())[0]  # Simplified: pick first agent
+        lead_agent = self.lead()
+        start_time = asyncio.get_running_loop().time()
         result = await lead_agent.run(query)
+        reward = 1.0 / (asyncio.get_running_loop().time() - start_time + 1)
 
-        # Update knowledge graph with new interactions
-        for agent_name in self.agents:
-            if agent_name != lead_agent.name:
-                self.knowledge_graph.setdefault(lead_agent.name, []).append(agent_name)
-                self.memory.store(f"fabric_connections_{lead_agent.name}", ",".join(self.knowledge_graph[lead_agent.name]))
-
+        # Update knowledge graph with new interactions (in memory; persisted write-behind)
+        self.knowledge_graph.record_many(
+            (lead_agent.name, agent_name, reward) for agent_name in self.agents if agent_name != lead_agent.name
+        )
         return result
 
 class Swarm:
-    def __init__(self, agents: List[Agent], memory: Memory):
+    """Routes queries across agents.
+
+    Each agent runs at most ``max_concurrency_per_agent`` queries at once.
+    ``routing`` picks among agents with a free slot: ``"adaptive"`` (the
+    default; discounted UCB over per-query-class latency and success, see
+    ``AgentStatistics``), ``"least_loaded"`` (fewest in-flight queries),
+    ``"latency"`` (lowest observed latency times queue depth) or ``"score"``
+    (highest EWMA reward, the original policy). With ``hedge`` a query is also sent to a second idle agent and the
+    first answer wins.
+
+    Statistics are kept in memory for every policy. They are loaded from
+    ``swarm_stats_<agent>`` keys on the first run and written back at most
+    every ``snapshot_interval`` seconds (and on ``save``), never per query.
+    """
+
+    def __init__(
+        self,
+        agents: List[Agent],
+        memory: Memory,
+        max_concurrency_per_agent: int = 4,
+        routing: str = "adaptive",
+        hedge: bool = False,
+        statistics: Optional[AgentStatistics] = None
+    ):
+        if routing not in ("least_loaded", "latency", "adaptive", "score"):
+            raise ValueError(f"Unknown routing policy: {routing}")
         self.agents = {agent.name: agent for agent in agents}
         self.memory = memory
+        self.max_concurrency_per_agent = max_concurrency_per_agent
+        self.routing = routing
+        self.hedge = hedge
         self.performance_scores = {name: 1.0 for name in self.agents}
+        self.inflight = {name: 0 for name in self.agents}
+        self.latency = {name: 0.0 for name in self.agents}  # EWMA seconds per query
+        self.completed = {name: 0 for name in self.agents}
+        self.queue_times = deque(maxlen=10000)  # Seconds each query waited for a free agent
+        self.last_batch: Dict[str, float] = {}
+        self.statistics = statistics if statistics is not None else AgentStatistics()
+        self._capacity: Optional[asyncio.Condition] = None
+        self._loading: Optional[asyncio.Task] = None
 
-    async def run(self, query: str) -> str:
-        """Run a swarm to process the query, optimizing task allocation."""
-        for agent_name in self.agents:
-            score = self.memory.retrieve(f"swarm_score_{agent_name}")
-            if score:
-                self.performance_scores[agent_name] = float(score)
+    async def _load(self):
+        """Read persisted statistics once; concurrent first runs wait for the same read."""
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._read_state())
+        await self._loading
+
+    async def _read_state(self):
+        """Restore ``swarm_stats_*`` snapshots, falling back to legacy ``swarm_score_*`` scores."""
+        names = list(self.agents)
+        stored = await self.memory.aretrieve_many(
+            [f"swarm_stats_{name}" for name in names] + [f"swarm_score_{name}" for name in names]
+        )
+        for name in names:
+            snapshot = stored[f"swarm_stats_{name}"]
+            if snapshot:
+                data = json.loads(snapshot)
+                self.performance_scores[name] = data["score"]
+                self.statistics.restore(name, data["windows"])
+            elif stored[f"swarm_score_{name}"]:
+                self.performance_scores[name] = float(stored[f"swarm_score_{name}"])
+
+    async def save(self):
+        """Persist a snapshot of every agent's statistics."""
+        self.statistics.last_snapshot = time.monotonic()  # Before awaiting, so concurrent queries don't also save
+        await self.memory.astore_many({
+            f"swarm_stats_{name}": json.dumps({"score": self.performance_scores[name], "windows": self.statistics.snapshot(name)})
+            for name in self.agents
+        })
+
+    def _pick(self, exclude=(), query_class: str = ALL) -> Optional[str]:
+        free = [name for name in self.agents if name not in exclude and self.inflight[name] < self.max_concurrency_per_agent]
+        if not free:
+            return None
+        if self.routing == "adaptive":
+            return self.statistics.choose(free, query_class)
+        if self.routing == "score":
+            return max(free, key=self.performance_scores.get)
+        if self.routing == "latency":
+            return min(free, key=lambda name: (self.latency[name] * (self.inflight[name] + 1), self.inflight[name]))
+        return min(free, key=lambda name: (self.inflight[name], -self.performance_scores[name]))
+
+    async def _acquire(self, enqueued: float, exclude=(), wait: bool = True, query_class: str = ALL) -> Optional[str]:
+        """Reserve a slot on the best agent with spare capacity, waiting for one if needed."""
+        if self._capacity is None:
+            self._capacity = asyncio.Condition()
+        async with self._capacity:
+            while True:
+                name = self._pick(exclude, query_class)
+                if name is not None:
+                    self.inflight[name] += 1
+                    self.queue_times.append(asyncio.get_event_loop().time() - enqueued)
+                    return name
+                if not wait:
+                    return None
+                await self._capacity.wait()
 
-        best_agent_name = max(self.performance_scores, key=self.performance_scores.get)
-        best_agent = self.agents[best_agent_name]
+    async def _release(self, name: str):
+        async with self._capacity:
+            self.inflight[name] -= 1
+            self._capacity.notify_all()
 
+    async def _execute(self, name: str, query: str, query_class: str = ALL) -> str:
         start_time = asyncio.get_event_loop().time()
-        result = await best_agent.run(query)
-        execution_time = asyncio.get_event_loop().time() - start_time
+        try:
+            result = await self.agents[name].run(query)
+            execution_time = asyncio.get_event_loop().time() - start_time
+        except Exception:
+            self.statistics.observe(name, query_class, asyncio.get_event_loop().time() - start_time, ok=False)
+            raise
+        finally:
+            await self._release(name)
 
+        self.latency[name] = execution_time if not self.completed[name] else 0.8 * self.latency[name] + 0.2 * execution_time
+        self.completed[name] += 1
         reward = 1.0 / (execution_time + 1)
-        self.performance_scores[best_agent_name] = (
-            0.9 * self.performance_scores[best_agent_name] + 0.1 * reward
+        self.performance_scores[name] = (
+            0.9 * self.performance_scores[name] + 0.1 * reward
         )
-        self.memory.store(f"swarm_score_{best_agent_name}", str(self.performance_scores[best_agent_name]))
-
+        self.statistics.observe(name, query_class, execution_time)
+        if self.statistics.due():
+            await self.save()
         return result
 
+    async def _run_one(self, query: str, enqueued: float, hedge: bool) -> str:
+        query_class = self.statistics.classify(query)
+        first = await self._acquire(enqueued, query_class=query_class)
+        second = await self._acquire(enqueued, exclude={first}, wait=False, query_class=query_class) if hedge else None
+        if second is None:
+            return await self._execute(first, query, query_class)
+        pending = {
+            asyncio.ensure_future(self._execute(first, query, query_class)),
+            asyncio.ensure_future(self._execute(second, query, query_class))
+        }
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def run(self, query: str) -> str:
+        """Run a swarm to process the query, optimizing task allocation."""
+        await self._load()
+        return await self._run_one(query, asyncio.get_event_loop().time(), self.hedge)
+
+    async def run_many(self, queries: List[str]) -> List[str]:
+        """Process many queries concurrently across all agents; results keep the input order.
+
+        A query that raises yields ``"Swarm error: ..."`` in its slot instead of
+        failing the batch; cancelling the call cancels the queries still running.
+        """
+        await self._load()
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        queue: asyncio.Queue = asyncio.Queue()
+        for i, query in enumerate(queries):
+            queue.put_nowait((i, query, start))
+        results: List[Optional[str]] = [None] * len(queries)
+
+        async def worker():
+            while True:
+                try:
+                    i, query, enqueued = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[i] = await self._run_one(query, enqueued, self.hedge)
+                except Exception as e:
+                    results[i] = f"Swarm error: {str(e)}"
+
+        slots = self.max_concurrency_per_agent * len(self.agents)
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(slots, len(queries)))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        elapsed = loop.time() - start
+        self.last_batch = {
+            "queries": len(queries),
+            "seconds": elapsed,
+            "throughput": len(queries) / elapsed if elapsed else 0.0,
+        }
+        return results
+
+    def stats(self) -> Dict[str, object]:
+        """Throughput of the last batch, queue-time percentiles and per-agent counters and windowed latency."""
+        waits = sorted(self.queue_times)
+        def percentile(p):
+            return waits[min(len(waits) - 1, int(p * len(waits)))] if waits else 0.0
+        return {
+            "last_batch": dict(self.last_batch),
+            "queue_time": {"p50": percentile(0.5), "p99": percentile(0.99), "max": waits[-1] if waits else 0.0},
+            "agents": {
+                name: dict(
+                    self.statistics.summary(name),
+                    inflight=self.inflight[name], completed=self.completed[name], latency=self.latency[name]
+                )
+                for name in self.agents
+            },
+        }
+
     def add_agent(self, agent: Agent):
         self.agents[agent.name] = agent
-        self.performance_scores[agent.name] = 1.0
\ No newline at end of file
+        self.performance_scores[agent.name] = 1.0
+        self.inflight[agent.name] = 0
+        self.latency[agent.name] = 0.0
+        self.completed[agent.name] = 0
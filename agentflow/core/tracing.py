@@ -0,0 +1,355 @@
+import atexit
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_TRACE_PATH = os.path.join(os.path.expanduser("~/.agentflow"), "trace.jsonl")
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_current: contextvars.ContextVar = contextvars.ContextVar("agentflow_span", default=None)
+
+class Histogram:
+    """Cumulative-bucket latency histogram in seconds, as Prometheus expects."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def remove(self, value: float):
+        """Undo an earlier ``observe(value)``, for histograms over a sliding window."""
+        self.counts[bisect.bisect_left(self.buckets, value)] -= 1
+        self.sum -= value
+        self.count -= 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside the bucket that holds it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+class Metrics:
+    """Thread-safe counters and histograms keyed by metric name and labels."""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any):
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any):
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def record(self, span: Dict[str, Any]):
+        """Fold a finished span record into the span metrics."""
+        labels = dict(span["labels"], span=span["name"])
+        self.inc("agentflow_spans_total", status=span["status"], **labels)
+        self.observe("agentflow_span_seconds", span["duration"], **labels)
+        for phase, seconds in span.get("phases", {}).items():
+            self.observe("agentflow_span_phase_seconds", seconds, phase=phase, **labels)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per span name: count, errors, mean/p50/p95 seconds and mean phase times."""
+        rows: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (name, labels), histogram in self.histograms.items():
+                labels = dict(labels)
+                span = labels.get("span")
+                if span is None:
+                    continue
+                row = rows.setdefault(span, {"span": span, "count": 0, "errors": 0, "total": 0.0, "histogram": Histogram(), "phases": {}})
+                if name == "agentflow_span_seconds":
+                    row["count"] += histogram.count
+                    row["total"] += histogram.sum
+                    merged = row["histogram"]
+                    merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                    merged.count += histogram.count
+                    merged.sum += histogram.sum
+                elif name == "agentflow_span_phase_seconds":
+                    total, count = row["phases"].get(labels["phase"], (0.0, 0))
+                    row["phases"][labels["phase"]] = (total + histogram.sum, count + histogram.count)
+            for (name, labels), value in self.counters.items():
+                labels = dict(labels)
+                if name == "agentflow_spans_total" and labels.get("status") == "error" and labels["span"] in rows:
+                    rows[labels["span"]]["errors"] += int(value)
+        result = []
+        for row in sorted(rows.values(), key=lambda r: -r["total"]):
+            histogram = row.pop("histogram")
+            row["mean"] = row["total"] / row["count"] if row["count"] else 0.0
+            row["p50"] = histogram.quantile(0.5)
+            row["p95"] = histogram.quantile(0.95)
+            row["phases"] = {phase: total / count for phase, (total, count) in row["phases"].items() if count}
+            result.append(row)
+        return result
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}" if labels else ""
+
+def render_prometheus(metrics: Metrics) -> str:
+    """Render counters and histograms in the Prometheus text exposition format."""
+    lines = []
+    with metrics._lock:
+        counters = sorted(metrics.counters.items())
+        histograms = sorted(metrics.histograms.items(), key=lambda item: item[0])
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+    for (name, labels), histogram in histograms:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(list(histogram.buckets) + [float("inf")], histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+class MemorySink:
+    """Keeps the most recent ``capacity`` span records in memory."""
+
+    def __init__(self, capacity: int = 1000):
+        self.spans = deque(maxlen=capacity)
+
+    def emit(self, span: Dict[str, Any]):
+        self.spans.append(span)
+
+    def flush(self, metrics: Metrics):
+        pass
+
+class JSONLSink:
+    """Appends span records to a JSON-lines file, buffered and rotated at ``max_bytes``."""
+
+    def __init__(self, path: str = DEFAULT_TRACE_PATH, buffer: int = 64, max_bytes: int = 16 * 1024 * 1024):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.buffer = buffer
+        self.max_bytes = max_bytes
+        self._lines: List[str] = []
+        self._lock = threading.Lock()
+
+    def emit(self, span: Dict[str, Any]):
+        with self._lock:
+            self._lines.append(json.dumps(span, separators=(",", ":")) + "\n")
+            if len(self._lines) < self.buffer:
+                return
+            lines, self._lines = self._lines, []
+        self._write(lines)
+
+    def _write(self, lines: List[str]):
+        if not lines:
+            return
+        try:
+            if os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+        except OSError:
+            pass
+        # One O_APPEND write per buffer keeps lines from several processes intact
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, "".join(lines).encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def flush(self, metrics: Metrics):
+        with self._lock:
+            lines, self._lines = self._lines, []
+        self._write(lines)
+
+class PrometheusSink:
+    """Writes the current metrics to a Prometheus text file (e.g. for node_exporter's textfile collector) on flush."""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+
+    def emit(self, span: Dict[str, Any]):
+        pass
+
+    def flush(self, metrics: Metrics):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(render_prometheus(metrics))
+        os.replace(tmp, self.path)
+
+def _status(exc_type) -> str:
+    if exc_type is None or exc_type is GeneratorExit:
+        return "ok"
+    return "cancelled" if exc_type.__name__ == "CancelledError" else "error"
+
+class Span:
+    """A timed operation. Use as a (sync) context manager; it also works inside coroutines."""
+
+    __slots__ = ("tracer", "name", "labels", "phases", "span_id", "trace_id", "parent_id", "start", "_wall", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, labels: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.labels = labels
+        self.phases: Dict[str, float] = {}
+
+    def phase(self, name: str, seconds: float):
+        """Attribute part of this span's time to a named phase (queue, connect, generation...)."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def __enter__(self) -> "Span":
+        parent = _current.get()
+        self.span_id = os.urandom(8).hex()
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self._token = _current.set(self)
+        self._wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        try:
+            _current.reset(self._token)
+        except ValueError:  # Exited in a different context (e.g. an async generator finalised elsewhere)
+            pass
+        record = {
+            "name": self.name,
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "labels": {k: str(v) for k, v in self.labels.items()},
+            "start": self._wall,
+            "duration": duration,
+            "status": _status(exc_type),
+        }
+        if self.phases:
+            record["phases"] = self.phases
+        if exc is not None and exc_type is not GeneratorExit:
+            record["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer.finish(record)
+        return False
+
+class _NoopSpan:
+    def phase(self, name: str, seconds: float):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP = _NoopSpan()
+
+class Tracer:
+    """Creates spans, aggregates them into ``metrics`` and forwards each record to the sinks."""
+
+    def __init__(self, sinks: Optional[List[Any]] = None, enabled: bool = True):
+        self.sinks = list(sinks or [])
+        self.enabled = enabled
+        self.metrics = Metrics()
+
+    def span(self, name: str, **labels: Any):
+        return Span(self, name, labels) if self.enabled else _NOOP
+
+    def current(self):
+        """The innermost open span in this context, or a no-op span."""
+        return _current.get() or _NOOP
+
+    def finish(self, record: Dict[str, Any]):
+        self.metrics.record(record)
+        for sink in self.sinks:
+            try:
+                sink.emit(record)
+            except Exception as e:
+                print(f"[AgentFlow] Trace sink {type(sink).__name__} failed: {e}")
+
+    def flush(self):
+        for sink in self.sinks:
+            try:
+                sink.flush(self.metrics)
+            except Exception as e:
+                print(f"[AgentFlow] Trace sink {type(sink).__name__} failed: {e}")
+
+def load_jsonl(path: str = DEFAULT_TRACE_PATH) -> Metrics:
+    """Rebuild metrics from a JSONL trace file (and its rotated predecessor)."""
+    metrics = Metrics()
+    path = os.path.expanduser(path)
+    for candidate in (path + ".1", path):
+        try:
+            with open(candidate, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        metrics.record(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue
+        except OSError:
+            continue
+    return metrics
+
+def _from_env() -> Tracer:
+    """``AGENTFLOW_TRACE`` selects the default sinks: a JSONL path, or ``off`` to disable tracing."""
+    setting = os.environ.get("AGENTFLOW_TRACE", "")
+    if setting.lower() in ("off", "0", "false"):
+        return Tracer(enabled=False)
+    return Tracer(sinks=[JSONLSink(setting)] if setting else [])
+
+_tracer: Optional[Tracer] = None
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    global _tracer
+    if _tracer is None:
+        _tracer = _from_env()
+    return _tracer
+
+def configure(sinks: Optional[List[Any]] = None, enabled: bool = True) -> Tracer:
+    """Replace the process-wide tracer (flushing the old one)."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.flush()
+    _tracer = Tracer(sinks=sinks, enabled=enabled)
+    return _tracer
+
+def span(name: str, **labels: Any):
+    """Open a span on the process-wide tracer."""
+    return get_tracer().span(name, **labels)
+
+atexit.register(lambda: _tracer is not None and _tracer.flush())
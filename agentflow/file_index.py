@@ -0,0 +1,205 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+IGNORED_DIRS = {".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv", ".mypy_cache", ".pytest_cache", ".tox", "build", "dist"}
+
+def default_index_path(root: str) -> str:
+    digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(os.path.expanduser("~/.agentflow/index"), f"{digest}.db")
+
+class FileIndex:
+    """Persistent index of the files under ``root``.
+
+    File names and (for small text files) contents go into an SQLite FTS5 table
+    with the trigram tokenizer, so substring queries on names and contents are
+    answered from the index and ranked with BM25. ``refresh`` only re-reads
+    files whose mtime or size changed; ``update_paths`` applies known changes
+    without walking the tree at all.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        db_path: Optional[str] = None,
+        index_content: bool = True,
+        max_file_size: int = 1024 * 1024
+    ):
+        self.root = os.path.abspath(root)
+        self.db_path = db_path or default_index_path(self.root)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.index_content = index_content
+        self.max_file_size = max_file_size
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, name TEXT, mtime REAL, size INTEGER)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        try:
+            self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS file_fts USING fts5(name, content, tokenize='trigram')")
+            self.fts = True
+        except sqlite3.OperationalError:  # SQLite built without FTS5 or older than 3.34: names only
+            self.fts = False
+        self.conn.commit()
+
+    @property
+    def last_refresh(self) -> float:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_refresh'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def _walk(self) -> Iterable[str]:
+        stack = [self.root]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False) and os.path.abspath(entry.path) != os.path.abspath(self.db_path):
+                    yield entry.path
+
+    def _read_content(self, path: str, size: int) -> str:
+        if not self.index_content or not self.fts or size > self.max_file_size:
+            return ""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return ""
+        if b"\0" in data[:8192]:  # Binary file
+            return ""
+        return data.decode("utf-8", errors="ignore")
+
+    def _upsert(self, rel: str, path: str, mtime: float, size: int):
+        name = os.path.basename(rel)
+        self.conn.execute(
+            "INSERT INTO files (path, name, mtime, size) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime, size = excluded.size",
+            (rel, name, mtime, size)
+        )
+        file_id = self.conn.execute("SELECT id FROM files WHERE path = ?", (rel,)).fetchone()[0]
+        if self.fts:
+            self.conn.execute("DELETE FROM file_fts WHERE rowid = ?", (file_id,))
+            self.conn.execute(
+                "INSERT INTO file_fts (rowid, name, content) VALUES (?, ?, ?)",
+                (file_id, rel, self._read_content(path, size))
+            )
+
+    def _delete(self, rels: List[str]):
+        for rel in rels:
+            row = self.conn.execute("SELECT id FROM files WHERE path = ?", (rel,)).fetchone()
+            if row:
+                if self.fts:
+                    self.conn.execute("DELETE FROM file_fts WHERE rowid = ?", (row[0],))
+                self.conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+
+    def _mark_refreshed(self):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_refresh', ?)", (str(time.time()),))
+
+    def refresh(self, batch_size: int = 500) -> Dict[str, int]:
+        """Walk the tree and re-index only new, changed and removed files."""
+        with self._lock:
+            known = {path: (mtime, size) for path, mtime, size in self.conn.execute("SELECT path, mtime, size FROM files")}
+        seen = set()
+        changed = []
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        for path in self._walk():
+            rel = os.path.relpath(path, self.root)
+            seen.add(rel)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if known.get(rel) != (st.st_mtime, st.st_size):
+                stats["updated" if rel in known else "added"] += 1
+                changed.append((rel, path, st.st_mtime, st.st_size))
+            if len(changed) >= batch_size:  # Commit in batches so searches are not locked out
+                self._write(changed, [])
+                changed = []
+        removed = [rel for rel in known if rel not in seen]
+        stats["removed"] = len(removed)
+        self._write(changed, removed, mark=True)
+        return stats
+
+    def _write(self, changed: List[Tuple[str, str, float, int]], removed: List[str], mark: bool = False):
+        with self._lock:
+            for rel, path, mtime, size in changed:
+                self._upsert(rel, path, mtime, size)
+            self._delete(removed)
+            if mark:
+                self._mark_refreshed()
+            self.conn.commit()
+
+    def update_paths(self, paths: Iterable[str]):
+        """Re-index the given paths, dropping those that no longer exist."""
+        changed, removed = [], []
+        for path in paths:
+            path = os.path.abspath(path)
+            rel = os.path.relpath(path, self.root)
+            if rel.startswith(".."):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                removed.append(rel)
+                continue
+            if os.path.isfile(path):
+                changed.append((rel, path, st.st_mtime, st.st_size))
+        self._write(changed, removed)
+
+    def known(self, paths: Iterable[str]) -> Set[str]:
+        """The subset of ``paths`` (absolute) that the index already holds."""
+        rels = {}
+        for path in paths:
+            rel = os.path.relpath(os.path.abspath(path), self.root)
+            if not rel.startswith(".."):
+                rels[rel] = path
+        found = set()
+        names = list(rels)
+        with self._lock:
+            for start in range(0, len(names), 500):  # Stay under SQLite's bound-parameter limit
+                chunk = names[start:start + 500]
+                rows = self.conn.execute(f"SELECT path FROM files WHERE path IN ({','.join('?' * len(chunk))})", chunk)
+                found.update(rels[rel] for (rel,) in rows)
+        return found
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Return ``(relative path, score)`` for files whose name or content contains the query, best first."""
+        query = query.strip()
+        if not query:
+            return []
+        with self._lock:
+            if self.fts and len(query) >= 3:
+                phrase = '"' + query.replace('"', '""') + '"'
+                rows = self.conn.execute(
+                    "SELECT f.path, bm25(file_fts, 10.0, 1.0) FROM file_fts JOIN files f ON f.id = file_fts.rowid "
+                    "WHERE file_fts MATCH ? ORDER BY bm25(file_fts, 10.0, 1.0) LIMIT ?",
+                    (phrase, limit)
+                ).fetchall()
+                return [(path, -score) for path, score in rows]
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = self.conn.execute(
+                "SELECT path FROM files WHERE name LIKE ? ESCAPE '\\' ORDER BY length(path) LIMIT ?", (pattern, limit)
+            ).fetchall()
+            return [(path, 1.0) for (path,) in rows]
+
+    def close(self):
+        self.conn.close()
+
+_indexes: Dict[str, FileIndex] = {}
+
+def get_index(root: str) -> FileIndex:
+    """Return the process-wide index for ``root``, opening its persistent database on first use."""
+    root = os.path.abspath(root)
+    if root not in _indexes:
+        _indexes[root] = FileIndex(root)
+    return _indexes[root]
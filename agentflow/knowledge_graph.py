@@ -0,0 +1,184 @@
+import atexit
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Graphs still open; flushed at exit without keeping them alive
+_open: "weakref.WeakSet[KnowledgeGraph]" = weakref.WeakSet()
+
+@atexit.register
+def _flush_open():
+    for graph in list(_open):
+        graph.flush()
+
+class KnowledgeGraph:
+    """Weighted directed graph of agent interactions.
+
+    The whole graph lives in memory as adjacency maps (``source -> target ->
+    [weight, count]``) and is loaded once. Updates only touch memory and mark
+    the edge dirty; dirty edges are written behind to SQLite, in one
+    transaction, once ``flush_threshold`` have accumulated or
+    ``flush_interval`` seconds after the first one. Storage is normalized:
+    node names are stored once in ``graph_nodes`` and edges reference them by
+    id in ``graph_edges``.
+    """
+
+    def __init__(self, db_path: str = "agentflow_memory.db", flush_interval: float = 1.0, flush_threshold: int = 256):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.RLock()
+        self._out: Dict[str, Dict[str, List[float]]] = {}
+        self._in: Dict[str, Set[str]] = {}
+        self._degree: Dict[str, float] = {}  # Weighted degree, kept current so ranking is O(nodes)
+        self._out_totals: Dict[str, List[float]] = {}  # Node -> [outgoing weight, outgoing count]
+        self._ids: Dict[str, int] = {}
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._timer: Optional[threading.Timer] = None
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS graph_nodes (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS graph_edges (source INTEGER, target INTEGER, weight REAL, count INTEGER, updated REAL, "
+            "PRIMARY KEY (source, target)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+        self._load()
+        _open.add(self)
+
+    def _load(self):
+        self._ids = {name: node_id for node_id, name in self.conn.execute("SELECT id, name FROM graph_nodes")}
+        names = {node_id: name for name, node_id in self._ids.items()}
+        for source, target, weight, count in self.conn.execute("SELECT source, target, weight, count FROM graph_edges"):
+            self._out.setdefault(names[source], {})[names[target]] = [weight, count]
+            self._in.setdefault(names[target], set()).add(names[source])
+            self._add_degree(names[source], names[target], weight)
+            self._add_out(names[source], weight, count)
+
+    def __len__(self) -> int:
+        """Number of edges."""
+        return sum(len(targets) for targets in self._out.values())
+
+    def record(self, source: str, target: str, weight: float = 1.0):
+        """Add ``weight`` to the ``source -> target`` edge and count one more interaction."""
+        self.record_many([(source, target, weight)])
+
+    def record_many(self, edges: Iterable[Tuple[str, str, float]]):
+        with self._lock:
+            for source, target, weight in edges:
+                edge = self._out.setdefault(source, {}).get(target)
+                if edge is None:
+                    self._out[source][target] = [weight, 1]
+                    self._in.setdefault(target, set()).add(source)
+                else:
+                    edge[0] += weight
+                    edge[1] += 1
+                self._add_degree(source, target, weight)
+                self._add_out(source, weight, 1)
+                self._dirty.add((source, target))
+            if len(self._dirty) >= self.flush_threshold:
+                self.flush()
+            elif self._dirty and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _add_degree(self, source: str, target: str, weight: float):
+        self._degree[source] = self._degree.get(source, 0.0) + weight
+        self._degree[target] = self._degree.get(target, 0.0) + weight
+
+    def _add_out(self, source: str, weight: float, count: int):
+        totals = self._out_totals.setdefault(source, [0.0, 0])
+        totals[0] += weight
+        totals[1] += count
+
+    def mean_weight(self, node: str) -> Tuple[float, int]:
+        """``(mean weight, count)`` over every interaction leaving ``node``; ``(0.0, 0)`` when there are none."""
+        weight, count = self._out_totals.get(node, (0.0, 0))
+        return (weight / count if count else 0.0, int(count))
+
+    def edge(self, source: str, target: str) -> Optional[Tuple[float, int]]:
+        """``(weight, count)`` of an edge, or None."""
+        edge = self._out.get(source, {}).get(target)
+        return (edge[0], int(edge[1])) if edge else None
+
+    def neighbors(self, node: str, limit: Optional[int] = None) -> List[Tuple[str, float, int]]:
+        """Outgoing ``(target, weight, count)`` edges of ``node``, heaviest first."""
+        with self._lock:
+            edges = [(target, weight, int(count)) for target, (weight, count) in self._out.get(node, {}).items()]
+        edges.sort(key=lambda e: (-e[1], e[0]))
+        return edges[:limit] if limit is not None else edges
+
+    def predecessors(self, node: str, limit: Optional[int] = None) -> List[Tuple[str, float, int]]:
+        """Incoming ``(source, weight, count)`` edges of ``node``, heaviest first."""
+        with self._lock:
+            edges = [(source, self._out[source][node][0], int(self._out[source][node][1])) for source in self._in.get(node, ())]
+        edges.sort(key=lambda e: (-e[1], e[0]))
+        return edges[:limit] if limit is not None else edges
+
+    def score(self, node: str) -> float:
+        """Weighted degree: total weight of edges leaving and entering ``node``."""
+        return self._degree.get(node, 0.0)
+
+    def rank(self, nodes: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """``(node, score)`` best first, over ``nodes`` or every node in the graph."""
+        if nodes is None:
+            with self._lock:
+                nodes = list(self._degree)
+        return sorted(((node, self.score(node)) for node in nodes), key=lambda item: (-item[1], item[0]))
+
+    def _node_id(self, name: str) -> int:
+        node_id = self._ids.get(name)
+        if node_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO graph_nodes (name) VALUES (?)", (name,))
+            node_id = self.conn.execute("SELECT id FROM graph_nodes WHERE name = ?", (name,)).fetchone()[0]
+            self._ids[name] = node_id
+        return node_id
+
+    def flush(self):
+        """Write every dirty edge in one transaction."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            now = time.time()
+            rows = []
+            for source, target in self._dirty:
+                weight, count = self._out[source][target]
+                rows.append((self._node_id(source), self._node_id(target), weight, int(count), now))
+            self.conn.executemany(
+                "INSERT INTO graph_edges (source, target, weight, count, updated) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(source, target) DO UPDATE SET weight = excluded.weight, count = excluded.count, updated = excluded.updated",
+                rows
+            )
+            self.conn.commit()
+            self._dirty.clear()
+
+    def migrate_connections(self, memory, names: Iterable[str]) -> int:
+        """Import legacy ``fabric_connections_<name>`` comma-joined lists from ``memory`` and delete them.
+
+        Each repeated neighbour in the old list becomes one counted interaction
+        of weight 1. Returns the number of interactions imported.
+        """
+        names = list(names)
+        keys = [f"fabric_connections_{name}" for name in names]
+        stored = memory.retrieve_many(keys)
+        edges = []
+        for name, key in zip(names, keys):
+            if stored[key]:
+                edges.extend((name, target, 1.0) for target in stored[key].split(",") if target)
+        if edges:
+            self.record_many(edges)
+            self.flush()
+        found = [key for key in keys if stored[key] is not None]
+        if found:
+            memory.delete_many(found)
+        return len(edges)
+
+    def close(self):
+        self.flush()
+        _open.discard(self)
+        self.conn.close()
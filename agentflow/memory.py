@@ -1,22 +1,140 @@
+import asyncio
+import atexit
 import sqlite3
-from typing import Optional
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 import json
+from agentflow.core.tracing import get_tracer
+
+# Batched memories still open; flushed at exit without keeping them alive
+_open: "weakref.WeakSet[Memory]" = weakref.WeakSet()
+
+@atexit.register
+def _flush_open():
+    for memory in list(_open):
+        memory.flush()
+
+def _like_prefix(prefix: str) -> str:
+    """LIKE pattern matching keys that start with ``prefix`` literally."""
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
 
 class Memory:
-    def __init__(self, db_path: str = "agentflow_memory.db"):
-        self.conn = sqlite3.connect(db_path)
+    """SQLite key/value memory.
+
+    With ``batched=True`` the database runs in WAL mode and writes are buffered
+    and group-committed once ``batch_size`` writes are pending or
+    ``flush_interval`` seconds have passed. Reads always see pending writes.
+    The ``a*`` methods run SQLite work on a dedicated thread so async callers
+    never block the event loop.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "agentflow_memory.db",
+        batched: bool = False,
+        batch_size: int = 256,
+        flush_interval: float = 0.5
+    ):
+        self.db_path = db_path
+        self.batched = batched
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.cursor = self.conn.cursor()
+        self._lock = threading.RLock()
+        self._pending: Dict[str, str] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if batched:
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            self.cursor.execute("PRAGMA synchronous=NORMAL")
+            _open.add(self)
         self.cursor.execute("CREATE TABLE IF NOT EXISTS memory (key TEXT PRIMARY KEY, value TEXT)")
         self.conn.commit()
 
     def store(self, key: str, value: str):
-        self.cursor.execute("INSERT OR REPLACE INTO memory (key, value) VALUES (?, ?)", (key, value))
-        self.conn.commit()
+        self.store_many([(key, value)])
+
+    def store_many(self, items: Union[Dict[str, str], Iterable[Tuple[str, str]]]):
+        """Store several key/value pairs in a single transaction."""
+        items = list(items.items()) if isinstance(items, dict) else list(items)
+        with get_tracer().span("memory.store_many", batched=self.batched), self._lock:
+            if not self.batched:
+                self.cursor.executemany("INSERT OR REPLACE INTO memory (key, value) VALUES (?, ?)", items)
+                self.conn.commit()
+                return
+            self._pending.update(items)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Group-commit every pending write."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            with get_tracer().span("memory.flush"):
+                self.cursor.executemany(
+                    "INSERT OR REPLACE INTO memory (key, value) VALUES (?, ?)", list(self._pending.items())
+                )
+                self.conn.commit()
+            self._pending.clear()
 
     def retrieve(self, key: str) -> Optional[str]:
-        self.cursor.execute("SELECT value FROM memory WHERE key = ?", (key,))
-        result = self.cursor.fetchone()
-        return result[0] if result else None
+        with get_tracer().span("memory.retrieve"), self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            self.cursor.execute("SELECT value FROM memory WHERE key = ?", (key,))
+            result = self.cursor.fetchone()
+            return result[0] if result else None
+
+    def retrieve_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Retrieve several keys at once; missing keys map to None."""
+        keys = list(keys)
+        found: Dict[str, Optional[str]] = {}
+        with get_tracer().span("memory.retrieve_many"), self._lock:
+            missing = [key for key in keys if key not in self._pending]
+            for start in range(0, len(missing), 500):  # Stay under SQLite's bound-parameter limit
+                chunk = missing[start:start + 500]
+                self.cursor.execute(
+                    f"SELECT key, value FROM memory WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                )
+                found.update(self.cursor.fetchall())
+            return {key: self._pending[key] if key in self._pending else found.get(key) for key in keys}
+
+    def items(self, prefix: str) -> List[Tuple[str, str]]:
+        """Every ``(key, value)`` whose key starts with ``prefix``, pending writes included."""
+        with get_tracer().span("memory.items"), self._lock:
+            self.flush()
+            self.cursor.execute("SELECT key, value FROM memory WHERE key LIKE ? ESCAPE '\\'", (_like_prefix(prefix),))
+            return self.cursor.fetchall()
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Delete every key starting with ``prefix`` in one statement; returns how many were removed."""
+        with get_tracer().span("memory.delete_prefix"), self._lock:
+            self.flush()
+            self.cursor.execute("DELETE FROM memory WHERE key LIKE ? ESCAPE '\\'", (_like_prefix(prefix),))
+            self.conn.commit()
+            return self.cursor.rowcount
+
+    def delete_many(self, keys: Iterable[str]):
+        """Delete several keys in one transaction (pending batched writes are flushed first)."""
+        keys = list(keys)
+        with get_tracer().span("memory.delete_many"), self._lock:
+            self.flush()
+            self.cursor.executemany("DELETE FROM memory WHERE key = ?", [(key,) for key in keys])
+            self.conn.commit()
+
+    def delete(self, key: str):
+        self.delete_many([key])
 
     def store_json(self, key: str, value: dict):
         """Store a dictionary as JSON."""
@@ -25,4 +143,33 @@ class Memory:
     def retrieve_json(self, key: str) -> Optional[dict]:
         """Retrieve and parse JSON data."""
         value = self.retrieve(key)
-        return json.loads(value) if value else None
\ No newline at end of file
+        return json.loads(value) if value else None
+
+    def close(self):
+        """Flush pending writes and close the connection."""
+        self.flush()
+        _open.discard(self)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.conn.close()
+
+    async def _run(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agentflow-memory")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def astore(self, key: str, value: str):
+        await self._run(self.store, key, value)
+
+    async def astore_many(self, items: Union[Dict[str, str], Iterable[Tuple[str, str]]]):
+        await self._run(self.store_many, list(items.items()) if isinstance(items, dict) else list(items))
+
+    async def aretrieve(self, key: str) -> Optional[str]:
+        return await self._run(self.retrieve, key)
+
+    async def aretrieve_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        return await self._run(self.retrieve_many, list(keys))
+
+    async def aflush(self):
+        await self._run(self.flush)
@@ -1,6 +1,35 @@
-from .base import skill, Skill
-from .load import load_skill
-from .local_search import local_search
-from .web_scrape import web_scrape
-from .codegen import codegen
-from .summarize import summarize
\ No newline at end of file
+import importlib
+import sys
+import types
+
+# Public name -> submodule. Nothing is imported until first use, so importing a
+# single skill (or the CLI) does not pay for aiohttp, BeautifulSoup and friends.
+_EXPORTS = {
+    "skill": ".base",
+    "Skill": ".base",
+    "load_skill": ".load",
+    "local_search": ".local_search",
+    "web_scrape": ".web_scrape",
+    "codegen": ".codegen",
+    "summarize": ".summarize",
+}
+
+class _SkillsPackage(types.ModuleType):
+    def __getattr__(self, name):
+        if name not in _EXPORTS:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        setattr(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        # Importing a skill submodule binds the module on this package; keep
+        # exposing the Skill object instead, as the old eager imports did.
+        if isinstance(value, types.ModuleType) and _EXPORTS.get(name) == "." + name:
+            value = getattr(value, name, value)
+        super().__setattr__(name, value)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_EXPORTS))
+
+sys.modules[__name__].__class__ = _SkillsPackage
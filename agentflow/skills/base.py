@@ -1,18 +1,54 @@
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 from functools import wraps
 import asyncio
+import pickle
+from agentflow.core.tracing import get_tracer
+from . import executors
 
 class Skill:
-    def __init__(self, name: str, func: Callable):
+    """A named callable run by agents.
+
+    ``executor`` says where it runs: ``"async"`` on the event loop (sync
+    functions are called inline), ``"thread"`` in the shared thread pool, or
+    ``"process"`` in the shared process pool for CPU-bound work. Process skills
+    must be module-level functions with picklable input; anything else falls
+    back to the thread pool.
+    """
+
+    def __init__(self, name: str, func: Callable, timeout: Optional[float] = None, executor: str = "async", target: Optional[Callable] = None):
+        if executor not in executors.EXECUTORS:
+            raise ValueError(f"Unknown executor {executor!r}; expected one of {executors.EXECUTORS}")
         self.name = name
         self.func = func
+        self.timeout = timeout  # Overrides the agent's per-skill timeout when set
+        self.executor = executor
+        self.target = target or func  # Undecorated function, looked up by worker processes
     
+    def _picklable(self, input_data: Any) -> bool:
+        if not executors.importable(self.target):
+            return False
+        try:
+            pickle.dumps(input_data)
+        except Exception:
+            return False
+        return True
+
     async def execute(self, input_data: Any) -> Any:
-        if asyncio.iscoroutinefunction(self.func):
-            return await self.func(input_data)
-        return self.func(input_data)
+        with get_tracer().span("skill.execute", skill=self.name, executor=self.executor):
+            if self.executor == "process" and self._picklable(input_data):
+                return await executors.run_in_process(
+                    executors._invoke_skill, self.target.__module__, self.target.__name__, input_data
+                )
+            if asyncio.iscoroutinefunction(self.func):
+                return await self.func(input_data)
+            if self.executor in ("thread", "process"):
+                return await executors.run_in_thread(self.func, input_data)
+            return self.func(input_data)
 
-def skill(func: Callable) -> Skill:
+def skill(func: Optional[Callable] = None, *, executor: str = "async", timeout: Optional[float] = None):
+    """Turn a function into a Skill; use ``@skill(executor="process")`` for CPU-bound work."""
+    if func is None:
+        return lambda f: skill(f, executor=executor, timeout=timeout)
     if asyncio.iscoroutinefunction(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -21,4 +57,4 @@ def skill(func: Callable) -> Skill:
         @wraps(func)
         def wrapper(*args, **kwargs):
             return func(*args, **kwargs)
-    return Skill(name=func.__name__, func=wrapper)
\ No newline at end of file
+    return Skill(name=func.__name__, func=wrapper, timeout=timeout, executor=executor, target=func)
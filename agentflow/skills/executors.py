@@ -0,0 +1,56 @@
+import asyncio
+import importlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+EXECUTORS = ("async", "thread", "process")
+
+THREAD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+PROCESS_WORKERS = os.cpu_count() or 1
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=THREAD_WORKERS, thread_name_prefix="agentflow-skill")
+    return _thread_pool
+
+def process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # spawn: forking a process that already runs an event loop and threads is unsafe
+        _process_pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+def shutdown():
+    """Shut down both pools; they are recreated on next use."""
+    global _thread_pool, _process_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=True)
+        _thread_pool = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True)
+        _process_pool = None
+
+def importable(func: Callable) -> bool:
+    """Whether a worker process can find ``func`` again by module and name."""
+    return func.__module__ not in ("__main__", "skill_module") and "<locals>" not in func.__qualname__
+
+def _invoke_skill(module: str, name: str, input_data: Any) -> Any:
+    """Worker-process entry point: look the skill up by reference and run its plain function."""
+    target = getattr(importlib.import_module(module), name)
+    func = getattr(target, "target", target)
+    if asyncio.iscoroutinefunction(func):
+        return asyncio.run(func(input_data))
+    return func(input_data)
+
+async def run_in_thread(func: Callable, *args) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(thread_pool(), func, *args)
+
+async def run_in_process(func: Callable, *args) -> Any:
+    """Run a module-level function with picklable arguments in the process pool."""
+    return await asyncio.get_running_loop().run_in_executor(process_pool(), func, *args)
@@ -1,20 +1,12 @@
-import importlib.util
 import os
 from .base import Skill
+from .registry import get_registry
 
 def load_skill(skill_name: str) -> Skill:
+    """Load a skill by name or from a ``.py`` file; modules are loaded once and reused."""
     try:
         if os.path.isfile(skill_name):
-            spec = importlib.util.spec_from_file_location("skill_module", skill_name)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            for attr in dir(module):
-                skill = getattr(module, attr)
-                if isinstance(skill, Skill):
-                    return skill
-        else:
-            module = importlib.import_module(f"agentflow.skills.{skill_name}")
-            skill = getattr(module, skill_name)
-            return skill
+            return get_registry().load_file(skill_name)
+        return get_registry().load(skill_name)
     except Exception as e:
-        raise ValueError(f"Failed to load skill {skill_name}: {str(e)}")
\ No newline at end of file
+        raise ValueError(f"Failed to load skill {skill_name}: {str(e)}")
@@ -1,18 +1,34 @@
 from agentflow.skills import skill
+from agentflow.file_index import get_index
+import asyncio
 import os
-import glob
+import time
+
+REFRESH_INTERVAL = 300  # Seconds before a search triggers a background re-scan
+_refreshing = {}  # Root -> the one running refresh task (also keeps it referenced)
+
+def _refresh(index) -> asyncio.Task:
+    """The running refresh of ``index``, started if there is none; concurrent callers share it."""
+    loop = asyncio.get_running_loop()
+    task = _refreshing.get(index.root)
+    if task is None or task.done() or task.get_loop() is not loop:
+        task = loop.create_task(asyncio.to_thread(index.refresh))
+        _refreshing[index.root] = task
+        task.add_done_callback(lambda t: _refreshing.pop(index.root, None) if _refreshing.get(index.root) is t else None)
+    return task
 
 @skill
 async def local_search(query: str) -> str:
-    """Search for files locally matching the query."""
+    """Search file names and contents under the current directory via the persistent file index."""
     try:
-        # Simple file search in current directory
-        search_path = os.getcwd()
-        matches = []
-        for file in glob.glob(os.path.join(search_path, f"*{query}*")):
-            matches.append(os.path.basename(file))
+        index = get_index(os.getcwd())
+        if not index.last_refresh:
+            await asyncio.shield(_refresh(index))  # First use builds the index, once for all callers
+        elif time.time() - index.last_refresh > REFRESH_INTERVAL:
+            _refresh(index)  # Serve from the index while it catches up
+        matches = [path for path, _ in index.search(query)]
         if matches:
             return f"Found files: {', '.join(matches)}"
         return "No matching files found."
     except Exception as e:
-        return f"Local search error: {str(e)}"
\ No newline at end of file
+        return f"Local search error: {str(e)}"
@@ -1,25 +1,68 @@
 import os
 import shutil
-from typing import Optional
+import time
+from typing import Any, Dict, Optional
 from agentflow.memory import Memory
+from agentflow.skills.registry import MARKETPLACE_DIR, file_sha256, read_manifest, scan_file, write_manifest
 
 class SkillMarketplace:
-    def __init__(self, memory: Memory, marketplace_dir: str = "~/.agentflow/marketplace"):
+    """Local skill marketplace: ``.py`` files plus a ``manifest.json`` describing each skill.
+
+    The manifest lets the registry list and find marketplace skills without
+    parsing or importing their files; a marketplace without one (from before
+    manifests existed) gets one built on first use.
+    """
+
+    def __init__(self, memory: Memory, marketplace_dir: str = MARKETPLACE_DIR):
         self.memory = memory
         self.marketplace_dir = os.path.expanduser(marketplace_dir)
         os.makedirs(self.marketplace_dir, exist_ok=True)
 
+    def _manifest(self) -> Dict[str, Dict[str, Any]]:
+        manifest = read_manifest(self.marketplace_dir)
+        if manifest is None:
+            manifest = {}
+            for entry in sorted(os.listdir(self.marketplace_dir)):
+                if entry.endswith(".py") and not entry.startswith("_"):
+                    try:
+                        manifest.update(self._entries(os.path.join(self.marketplace_dir, entry)))
+                    except (OSError, SyntaxError):
+                        continue
+            write_manifest(self.marketplace_dir, manifest)
+        return manifest
+
+    def _entries(self, path: str) -> Dict[str, Dict[str, Any]]:
+        digest = file_sha256(path)
+        file_name = os.path.basename(path)
+        return {
+            meta["name"]: {
+                "file": file_name,
+                "sha256": digest,
+                "description": meta["description"],
+                "executor": meta["executor"],
+                "updated": time.time(),
+            }
+            for meta in scan_file(path)
+        }
+
+    def list_skills(self) -> Dict[str, Dict[str, Any]]:
+        """Map skill name to manifest metadata for everything in the marketplace."""
+        return self._manifest()
+
     def pull(self, skill_name: str) -> Optional[str]:
         """Pull a skill from the local marketplace to the project's skills directory."""
-        skill_path = os.path.join(self.marketplace_dir, f"{skill_name}.py")
+        entry = self._manifest().get(skill_name)
+        skill_path = os.path.join(self.marketplace_dir, entry["file"] if entry else f"{skill_name}.py")
         if not os.path.exists(skill_path):
             return f"Skill {skill_name} not found in marketplace"
-        
+        if entry and file_sha256(skill_path) != entry["sha256"]:
+            return f"Skill {skill_name} does not match the marketplace manifest"
+
         project_skills_dir = os.path.join(os.getcwd(), "agentflow", "skills")
         os.makedirs(project_skills_dir, exist_ok=True)
-        dest_path = os.path.join(project_skills_dir, f"{skill_name}.py")
+        dest_path = os.path.join(project_skills_dir, os.path.basename(skill_path))
         shutil.copy(skill_path, dest_path)
-        
+
         self.memory.store(f"skill_pulled_{skill_name}", dest_path)
         return f"Pulled skill {skill_name} to {dest_path}"
 
@@ -28,9 +71,16 @@ class SkillMarketplace:
         project_skill_path = os.path.join(os.getcwd(), "agentflow", "skills", f"{skill_name}.py")
         if not os.path.exists(project_skill_path):
             return f"Skill {skill_name} not found in project"
-        
+
         dest_path = os.path.join(self.marketplace_dir, f"{skill_name}.py")
         shutil.copy(project_skill_path, dest_path)
-        
+        manifest = {name: meta for name, meta in self._manifest().items() if meta["file"] != f"{skill_name}.py"}
+        try:
+            manifest.update(self._entries(dest_path))
+        except SyntaxError as e:
+            os.remove(dest_path)
+            return f"Skill {skill_name} could not be parsed: {e}"
+        write_manifest(self.marketplace_dir, manifest)
+
         self.memory.store(f"skill_pushed_{skill_name}", dest_path)
-        return f"Pushed skill {skill_name} to marketplace"
\ No newline at end of file
+        return f"Pushed skill {skill_name} to marketplace"
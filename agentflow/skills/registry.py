@@ -0,0 +1,235 @@
+import ast
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+SKILLS_DIR = os.path.dirname(os.path.abspath(__file__))
+MARKETPLACE_DIR = os.path.expanduser("~/.agentflow/marketplace")
+MANIFEST = "manifest.json"
+CACHE_KEY = "skill_registry_cache"
+
+def _is_skill_decorator(node: ast.expr) -> bool:
+    if isinstance(node, ast.Call):
+        node = node.func
+    return (isinstance(node, ast.Name) and node.id == "skill") or (isinstance(node, ast.Attribute) and node.attr == "skill")
+
+def _literal_kwarg(node: ast.expr, name: str) -> Optional[object]:
+    if isinstance(node, ast.Call):
+        for keyword in node.keywords:
+            if keyword.arg == name and isinstance(keyword.value, ast.Constant):
+                return keyword.value.value
+    return None
+
+def scan_file(path: str) -> List[Dict[str, object]]:
+    """Find ``@skill``-decorated top-level functions in a file by parsing it, without executing it."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    skills = []
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        decorators = [d for d in node.decorator_list if _is_skill_decorator(d)]
+        if not decorators:
+            continue
+        doc = ast.get_docstring(node) or ""
+        skills.append({
+            "name": node.name,
+            "path": path,
+            "description": doc.strip().splitlines()[0] if doc.strip() else "",
+            "executor": _literal_kwarg(decorators[0], "executor") or "async",
+        })
+    return skills
+
+def discover(directory: str = SKILLS_DIR) -> Dict[str, Dict[str, object]]:
+    """Map skill name to metadata for every skill defined in ``directory``'s ``.py`` files."""
+    found = {}
+    for entry in sorted(os.listdir(directory)):
+        if entry.endswith(".py") and not entry.startswith("_"):
+            try:
+                for meta in scan_file(os.path.join(directory, entry)):
+                    found.setdefault(meta["name"], meta)
+            except (OSError, SyntaxError):
+                continue
+    return found
+
+def builtin_skills() -> Dict[str, Dict[str, object]]:
+    """Skills shipped in ``agentflow.skills``, with the module that defines each one."""
+    skills = discover(SKILLS_DIR)
+    for meta in skills.values():
+        meta["module"] = "agentflow.skills." + os.path.splitext(os.path.basename(meta["path"]))[0]
+    return skills
+
+def file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def read_manifest(directory: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Return the ``skills`` section of ``directory``'s manifest, or None when there is none."""
+    try:
+        with open(os.path.join(directory, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f).get("skills", {})
+    except (OSError, ValueError):
+        return None
+
+def write_manifest(directory: str, skills: Dict[str, Dict[str, Any]]):
+    """Atomically replace ``directory``'s manifest."""
+    path = os.path.join(directory, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "skills": skills}, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def default_cache_path() -> str:
+    return os.path.join(os.path.expanduser("~/.agentflow"), "skill_cache.db")
+
+class SkillRegistry:
+    """Name -> metadata lookup over the built-in skills and the marketplace.
+
+    Listing never imports skill code: directories with a manifest are read from
+    it, other files are parsed with ``scan_file`` and the result is cached in
+    Memory keyed by path, mtime and size (with a content hash so a touched but
+    unchanged file is not re-parsed). Loaded modules are memoized per file, so
+    loading the same skill again costs a dictionary lookup until the file
+    changes.
+    """
+
+    def __init__(self, directories: Optional[List[str]] = None, memory=None):
+        self.directories = [os.path.abspath(d) for d in (directories or [SKILLS_DIR, MARKETPLACE_DIR])]
+        self._memory = memory
+        self._file_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._skills: Optional[Dict[str, Dict[str, Any]]] = None
+        self._stamp: Optional[Tuple] = None
+        self._modules: Dict[str, Tuple[Tuple[float, int], Any]] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def memory(self):
+        if self._memory is None:
+            from agentflow.memory import Memory
+            os.makedirs(os.path.dirname(default_cache_path()), exist_ok=True)
+            self._memory = Memory(default_cache_path())
+        return self._memory
+
+    def _directory_stamp(self) -> Tuple:
+        """Cheap fingerprint of every directory's ``.py`` files and manifest (stat only, no reads)."""
+        stamp = []
+        for directory in self.directories:
+            try:
+                entries = sorted(
+                    (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                    for entry in os.scandir(directory)
+                    if entry.name.endswith(".py") or entry.name == MANIFEST
+                )
+            except OSError:
+                entries = []
+            stamp.append((directory, tuple(entries)))
+        return tuple(stamp)
+
+    def _scan_cached(self, path: str) -> List[Dict[str, Any]]:
+        st = os.stat(path)
+        entry = self._file_cache.get(path)
+        if entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+            return entry["skills"]
+        digest = file_sha256(path)
+        if not entry or entry["sha256"] != digest:
+            entry = {"sha256": digest, "skills": scan_file(path)}
+        self._file_cache[path] = dict(entry, mtime=st.st_mtime, size=st.st_size)
+        self._cache_dirty = True
+        return entry["skills"]
+
+    def _scan_directory(self, directory: str) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        manifest = read_manifest(directory)
+        if manifest is not None:
+            for name, meta in manifest.items():
+                found[name] = dict(meta, name=name, path=os.path.join(directory, meta["file"]))
+            return found
+        try:
+            entries = sorted(os.listdir(directory))
+        except OSError:
+            return found
+        for entry in entries:
+            if entry.endswith(".py") and not entry.startswith("_"):
+                try:
+                    for meta in self._scan_cached(os.path.join(directory, entry)):
+                        found.setdefault(meta["name"], dict(meta))
+                except (OSError, SyntaxError):
+                    continue
+        if directory == SKILLS_DIR:
+            for meta in found.values():
+                meta["module"] = "agentflow.skills." + os.path.splitext(os.path.basename(meta["path"]))[0]
+        return found
+
+    def skills(self) -> Dict[str, Dict[str, Any]]:
+        """Map every known skill name to its metadata; earlier directories win on name clashes."""
+        with self._lock:
+            stamp = self._directory_stamp()
+            if self._skills is not None and stamp == self._stamp:
+                return self._skills
+            if self._file_cache is None:
+                self._file_cache = self.memory.retrieve_json(CACHE_KEY) or {}
+            self._cache_dirty = False
+            skills: Dict[str, Dict[str, Any]] = {}
+            for directory in self.directories:
+                for name, meta in self._scan_directory(directory).items():
+                    skills.setdefault(name, meta)
+            if self._cache_dirty:
+                self.memory.store_json(CACHE_KEY, self._file_cache)
+            self._skills, self._stamp = skills, stamp
+            return skills
+
+    def list(self) -> List[str]:
+        return sorted(self.skills())
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.skills().get(name)
+
+    def _module_for_file(self, path: str):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        version = (st.st_mtime, st.st_size)
+        with self._lock:
+            cached = self._modules.get(path)
+            if cached and cached[0] == version:
+                return cached[1]
+            spec = importlib.util.spec_from_file_location("skill_module", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self._modules[path] = (version, module)
+            return module
+
+    def load_file(self, path: str, name: Optional[str] = None):
+        """Load the skill ``name`` (or the first skill) defined in ``path``."""
+        from .base import Skill
+        module = self._module_for_file(path)
+        if name is not None:
+            found = getattr(module, name, None)
+            if isinstance(found, Skill):
+                return found
+        for attr in dir(module):
+            found = getattr(module, attr)
+            if isinstance(found, Skill):
+                return found
+        raise LookupError(f"no skill defined in {path}")
+
+    def load(self, name: str):
+        """Load a skill by name, importing only the module that defines it."""
+        meta = self.get(name)
+        if meta is None:
+            raise LookupError(f"unknown skill {name!r}")
+        if "module" in meta:
+            return getattr(importlib.import_module(meta["module"]), name)
+        return self.load_file(meta["path"], name)
+
+_registry: Optional[SkillRegistry] = None
+
+def get_registry() -> SkillRegistry:
+    """Return the process-wide registry over the built-in skills and the marketplace."""
+    global _registry
+    if _registry is None:
+        _registry = SkillRegistry()
+    return _registry
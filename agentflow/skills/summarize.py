@@ -1,12 +1,51 @@
 from agentflow.skills import skill
+from agentflow.core.cache import get_cache
 from agentflow.core.llm import LLM
+from agentflow.core.prompt import summarize_text
+from agentflow.memory import Memory
+from typing import Optional
+import os
+
+_llm = LLM(provider="ollama", cache=get_cache())
+_memory: Optional[Memory] = None
+LLM_FAILURES = ("LLM ", "No LLM configured")  # Prefixes of LLM error strings, which are never cached
+
+def _summaries() -> Memory:
+    global _memory
+    if _memory is None:
+        _memory = Memory(batched=True)
+    return _memory
+
+def summary_key(path: str) -> str:
+    """Memory key of a file's cached summary; the watcher pipeline deletes it when the file changes."""
+    return f"file_summary_{os.path.abspath(path)}"
+
+def _is_file(content: str) -> bool:
+    return len(content) < 4096 and "\n" not in content and os.path.isfile(content)
+
+async def summarize_file(path: str, memory: Optional[Memory] = None) -> str:
+    """Summarize a file, reusing its cached summary until the file changes."""
+    memory = memory if memory is not None else _summaries()
+    key = summary_key(path)
+    cached = await memory.aretrieve(key)
+    if cached is not None:
+        return cached
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        summary = await summarize_text(_llm, f.read())
+    if not summary.startswith(LLM_FAILURES):
+        await memory.astore(key, summary)
+    return summary
 
 @skill
 async def summarize(content: str) -> str:
-    llm = LLM(provider="ollama")
-    prompt = f"Summarize the following: {content}"
+    """Summarize content of any size; inputs beyond the model's context are map-reduced in chunks.
+
+    A path to an existing file summarizes that file, cached per path.
+    """
     try:
-        response = await llm.generate(prompt)
-        return response.strip()
+        path = content.strip()
+        if _is_file(path):
+            return await summarize_file(path)
+        return await summarize_text(_llm, content)
     except Exception as e:
-        return f"Error generating summary: {str(e)}"
\ No newline at end of file
+        return f"Error generating summary: {str(e)}"
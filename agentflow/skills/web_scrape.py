@@ -1,19 +1,208 @@
 from agentflow.skills import skill
-import aiohttp
+from agentflow.core.http import get_client
+from agentflow.skills.executors import run_in_process
 from bs4 import BeautifulSoup
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlsplit
 import asyncio
+import codecs
+import re
+
+MAX_BYTES = 2 * 1024 * 1024
+SKIPPED_TAGS = {"script", "style", "noscript", "template"}
+
+def extract_text(html: str, limit: int = 1000) -> str:
+    """Parse HTML and return its visible text, truncated to ``limit`` characters."""
+    soup = BeautifulSoup(html, "html.parser")
+    text = soup.get_text(separator=" ", strip=True)
+    return text[:limit]  # Truncate for brevity
+
+class TextExtractor(HTMLParser):
+    """Incremental visible-text extractor that builds no tree and stops caring after ``limit`` characters."""
+
+    def __init__(self, limit: int = 1000):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.parts: List[str] = []
+        self.length = 0
+        self._current: List[str] = []
+        self._skipping = 0
+
+    @property
+    def done(self) -> bool:
+        return self.length >= self.limit
+
+    def _flush(self):
+        text = "".join(self._current).strip()
+        self._current = []
+        if text and not self.done:
+            self.parts.append(text)
+            self.length += len(text) + 1
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in SKIPPED_TAGS:
+            self._skipping += 1
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in SKIPPED_TAGS and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping and not self.done:
+            self._current.append(data)
+
+    def text(self) -> str:
+        self._flush()
+        return " ".join(self.parts)[:self.limit]
+
+class ConditionalCache:
+    """Remembers ETag/Last-Modified and extracted text so unchanged pages cost a 304.
+
+    Entries are keyed by URL and by the extraction settings (``limit`` and
+    ``streaming``) the text was produced with, so a 304 never returns text cut
+    to a different length.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Dict[str, str], str]]" = OrderedDict()
+
+    @staticmethod
+    def key(url: str, limit: int, streaming: bool) -> Hashable:
+        return (url, limit, streaming)
+
+    def headers(self, key: Hashable) -> Dict[str, str]:
+        entry = self._entries.get(key)
+        return dict(entry[0]) if entry else {}
+
+    def text(self, key: Hashable) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def store(self, key: Hashable, resp_headers, text: str):
+        validators = {}
+        if "ETag" in resp_headers:
+            validators["If-None-Match"] = resp_headers["ETag"]
+        if "Last-Modified" in resp_headers:
+            validators["If-Modified-Since"] = resp_headers["Last-Modified"]
+        if not validators:
+            return
+        self._entries[key] = (validators, text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class HostLimiter:
+    """Caps concurrent requests per host and spaces them at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, per_host: int = 2, rate: Optional[float] = None):
+        self.per_host = per_host
+        self.interval = 1.0 / rate if rate else 0.0
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+
+    async def __call__(self, host: str):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        await semaphore.acquire()
+        if self.interval:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+            try:
+                await asyncio.sleep(slot - now)
+            except BaseException:  # Cancelled while spacing requests: give the slot back
+                semaphore.release()
+                raise
+        return semaphore
+
+_conditional_cache = ConditionalCache()
+
+async def scrape(
+    url: str,
+    limit: int = 1000,
+    max_bytes: int = MAX_BYTES,
+    streaming: bool = True,
+    cache: Optional[ConditionalCache] = None
+) -> str:
+    """Fetch ``url`` and return up to ``limit`` characters of visible text.
+
+    Streaming mode decodes and parses the body chunk by chunk and stops reading
+    as soon as enough text is collected or ``max_bytes`` have arrived. The
+    non-streaming mode reads the page (still capped at ``max_bytes``) and parses
+    it with BeautifulSoup in the process pool.
+    """
+    cache = cache if cache is not None else _conditional_cache
+    key = cache.key(url, limit, streaming)
+    async with get_client().request("GET", url, headers=cache.headers(key)) as resp:
+        if resp.status == 304 and cache.text(key) is not None:
+            return cache.text(key)
+        if resp.status != 200:
+            return f"Scrape error: HTTP {resp.status}"
+        try:
+            decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        received = 0
+        if streaming:
+            parser = TextExtractor(limit)
+            async for chunk in resp.content.iter_chunked(16384):
+                chunk = chunk[:max_bytes - received]
+                received += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if parser.done or received >= max_bytes:
+                    break
+            text = parser.text()
+        else:
+            chunks = []
+            async for chunk in resp.content.iter_chunked(65536):
+                chunks.append(chunk[:max_bytes - received])
+                received += len(chunks[-1])
+                if received >= max_bytes:
+                    break
+            # Parsing is CPU-bound; keep it off the event loop
+            text = await run_in_process(extract_text, decoder.decode(b"".join(chunks), final=True), limit)
+        cache.store(key, resp.headers, text)
+        return text
+
+async def scrape_many(
+    urls: List[str],
+    concurrency: int = 8,
+    per_host: int = 2,
+    rate: Optional[float] = None,
+    **options
+) -> List[str]:
+    """Scrape a batch of URLs concurrently with per-host limits; results keep the input order."""
+    limiter = HostLimiter(per_host, rate)
+    overall = asyncio.Semaphore(concurrency)
+
+    async def one(url: str) -> str:
+        async with overall:
+            semaphore = await limiter(urlsplit(url).netloc)
+            try:
+                return await scrape(url, **options)
+            except Exception as e:
+                return f"Scrape error: {str(e)}"
+            finally:
+                semaphore.release()
+
+    return await asyncio.gather(*(one(url) for url in urls))
 
 @skill
 async def web_scrape(query: str) -> str:
+    """Scrape one URL, or several whitespace-separated URLs as a batch."""
     try:
-        url = query.strip()
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status != 200:
-                    return f"Scrape error: HTTP {resp.status}"
-                html = await resp.text()
-                soup = BeautifulSoup(html, "html.parser")
-                text = soup.get_text(separator=" ", strip=True)
-                return text[:1000]  # Truncate for brevity
+        urls = re.split(r"\s+", query.strip())
+        if len(urls) == 1:
+            return await scrape(urls[0])
+        results = await scrape_many(urls)
+        return "\n".join(f"{url}: {text}" for url, text in zip(urls, results))
     except Exception as e:
-        return f"Scrape error: {str(e)}"
\ No newline at end of file
+        return f"Scrape error: {str(e)}"
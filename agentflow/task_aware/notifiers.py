@@ -0,0 +1,63 @@
+import abc
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+Action = Tuple[str, str]  # (agent name, description)
+
+class Notifier(abc.ABC):
+    """Presents a suggestion and returns the chosen agent name, or None to skip."""
+
+    @abc.abstractmethod
+    async def notify(self, message: str, actions: List[Action]) -> Optional[str]:
+        """Show ``message`` with ``actions`` and return the chosen agent name, or None."""
+
+class HeadlessNotifier(Notifier):
+    """Never prompts; optionally runs the ``auto_action``-th action (1-based) every time."""
+
+    def __init__(self, auto_action: Optional[int] = None):
+        self.auto_action = auto_action
+
+    async def notify(self, message: str, actions: List[Action]) -> Optional[str]:
+        if self.auto_action and 1 <= self.auto_action <= len(actions):
+            return actions[self.auto_action - 1][0]
+        return None
+
+class LogNotifier(Notifier):
+    """Prints suggestions without acting on them."""
+
+    async def notify(self, message: str, actions: List[Action]) -> Optional[str]:
+        print(f"[AgentFlow] {message}")
+        for i, (_, desc) in enumerate(actions, 1):
+            print(f"[AgentFlow]   {i}. {desc}")
+        return None
+
+class TkNotifier(Notifier):
+    """Asks with tkinter dialogs, all on one dedicated thread so the event loop never blocks."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agentflow-tk")
+        self._root = None
+
+    def _ask(self, message: str, actions: List[Action]) -> Optional[str]:
+        import tkinter as tk
+        from tkinter import messagebox, simpledialog
+        if self._root is None:
+            self._root = tk.Tk()
+            self._root.withdraw()  # Hide main window
+        response = messagebox.askyesno(
+            "AgentFlow Suggestion",
+            f"{message}\n\nProceed with one of these actions?\n" + "\n".join(f"{i}. {desc}" for i, (_, desc) in enumerate(actions, 1)),
+            parent=self._root
+        )
+        if not response:
+            return None
+        choice = simpledialog.askinteger("Select Action", f"Enter action number (1-{len(actions)}):", minvalue=1, maxvalue=len(actions), parent=self._root)
+        if choice and 1 <= choice <= len(actions):
+            return actions[choice - 1][0]
+        return None
+
+    async def notify(self, message: str, actions: List[Action]) -> Optional[str]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._ask, message, actions)
+
+NOTIFIERS = {"headless": HeadlessNotifier, "log": LogNotifier, "tk": TkNotifier}
@@ -0,0 +1,210 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from watchdog.events import FileSystemEventHandler
+from agentflow.file_index import IGNORED_DIRS, FileIndex
+from agentflow.memory import Memory
+from agentflow.skills.summarize import summary_key
+
+IGNORED_SUFFIXES = (".db", ".db-wal", ".db-shm", ".db-journal", ".swp", "~")
+
+Batch = Dict[str, str]  # Absolute path -> "created" | "modified" | "deleted"
+
+def coalesce(previous: Optional[str], kind: str) -> Optional[str]:
+    """Fold a new event into the pending one for the same path (None drops the path)."""
+    if previous == "created":
+        return None if kind == "deleted" else "created"
+    if previous == "deleted" and kind == "created":
+        return "modified"
+    return kind
+
+def file_type_census(root: str) -> Dict[str, int]:
+    """Count files under ``root`` by extension."""
+    file_types = {}
+    for dirpath, dirnames, files in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+        for file in files:
+            ext = os.path.splitext(file)[1]
+            file_types[ext] = file_types.get(ext, 0) + 1
+    return file_types
+
+class EventBatcher:
+    """Debounce file events and hand them to ``handler`` as coalesced batches.
+
+    A batch is flushed once no event has arrived for ``debounce`` seconds,
+    ``max_delay`` seconds after its first event, or when it holds ``max_batch``
+    paths, so a burst of thousands of events becomes a handful of batches.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Batch], None],
+        debounce: float = 0.5,
+        max_delay: float = 5.0,
+        max_batch: int = 10000
+    ):
+        self.handler = handler
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.stats = {"events": 0, "batches": 0, "paths": 0}
+        self._events: Batch = {}
+        self._first = 0.0
+        self._last = 0.0
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="agentflow-batcher", daemon=True)
+        self._thread.start()
+
+    def add(self, path: str, kind: str):
+        with self._cond:
+            now = time.monotonic()
+            if not self._events:
+                self._first = now
+            self._last = now
+            self.stats["events"] += 1
+            merged = coalesce(self._events.get(path), kind)
+            if merged is None:
+                self._events.pop(path, None)
+            else:
+                self._events[path] = merged
+            self._cond.notify()
+
+    def _next_batch(self) -> Optional[Batch]:
+        with self._cond:
+            while not self._events and not self._stopped:
+                self._cond.wait()
+            while self._events and not self._stopped and len(self._events) < self.max_batch:
+                deadline = min(self._last + self.debounce, self._first + self.max_delay)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if not self._events:
+                return None
+            batch, self._events = self._events, {}
+            return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                if self._stopped:
+                    return
+                continue
+            self.stats["batches"] += 1
+            self.stats["paths"] += len(batch)
+            try:
+                self.handler(batch)
+            except Exception as e:
+                print(f"[AgentFlow] Pipeline error: {e}")
+
+    def stop(self):
+        """Flush whatever is pending and stop the batching thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+
+class FileIndexStage:
+    """Re-index changed paths and drop deleted ones."""
+
+    def __init__(self, index: FileIndex):
+        self.index = index
+
+    def __call__(self, batch: Batch):
+        self.index.update_paths(batch)
+
+class CensusStage:
+    """Keep the ``init`` file-type census current by counting creations and deletions.
+
+    The file index tells real creations from rewrites of files it already
+    holds (editors that save by atomic rename report those as created), so it
+    must run before ``FileIndexStage`` records the batch.
+    """
+
+    def __init__(self, memory: Memory, root: str, index: FileIndex):
+        self.memory = memory
+        self.index = index
+        self.key = f"file_type_census_{os.path.abspath(root)}"
+
+    def __call__(self, batch: Batch):
+        census = self.memory.retrieve_json(self.key)
+        if census is None:  # Nothing built yet; init computes it from scratch
+            return
+        known = self.index.known(path for path, kind in batch.items() if kind != "modified")
+        for path, kind in batch.items():
+            if kind == "modified" or (kind == "created") == (path in known):
+                continue  # Rewrite of a known file, or deletion of one never counted
+            ext = os.path.splitext(path)[1]
+            census[ext] = census.get(ext, 0) + (1 if kind == "created" else -1)
+            if census[ext] <= 0:
+                del census[ext]
+        self.memory.store_json(self.key, census)
+
+class SummaryInvalidationStage:
+    """Drop cached per-file summaries (see ``summarize``) for every created, changed or deleted file."""
+
+    def __init__(self, memory: Memory):
+        self.memory = memory
+
+    def __call__(self, batch: Batch):
+        stale = [summary_key(path) for path in batch]
+        if stale:
+            self.memory.delete_many(stale)
+
+class Pipeline:
+    """Run every stage over each batch; a failing stage does not stop the others."""
+
+    def __init__(self, stages: Iterable[Callable[[Batch], None]]):
+        self.stages: List[Callable[[Batch], None]] = list(stages)
+
+    def __call__(self, batch: Batch):
+        for stage in self.stages:
+            try:
+                stage(batch)
+            except Exception as e:
+                print(f"[AgentFlow] {type(stage).__name__} failed: {e}")
+
+def default_pipeline(root: str, memory: Memory, index: Optional[FileIndex] = None) -> Pipeline:
+    """Census, index and summary stages, with the index brought up to date first."""
+    index = index if index is not None else FileIndex(root)
+    index.refresh()
+    return Pipeline([
+        CensusStage(memory, root, index),
+        FileIndexStage(index),
+        SummaryInvalidationStage(memory),
+    ])
+
+class BatchingHandler(FileSystemEventHandler):
+    """Watchdog handler that feeds file events into an ``EventBatcher``."""
+
+    def __init__(self, batcher: EventBatcher, root: str):
+        self.batcher = batcher
+        self.root = os.path.abspath(root)
+
+    def _ignored(self, path: str) -> bool:
+        parts = os.path.relpath(os.path.abspath(path), self.root).split(os.sep)
+        return path.endswith(IGNORED_SUFFIXES) or any(part in IGNORED_DIRS for part in parts)
+
+    def _add(self, path: str, kind: str):
+        if not self._ignored(path):
+            self.batcher.add(os.path.abspath(path), kind)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._add(event.src_path, "created")
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._add(event.src_path, "modified")
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self._add(event.src_path, "deleted")
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._add(event.src_path, "deleted")
+            self._add(event.dest_path, "created")
@@ -1,33 +1,116 @@
 import os
+import threading
 import time
-import tkinter as tk
-from tkinter import messagebox
+from typing import Optional
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from agentflow.memory import Memory
+from agentflow.core.cache import get_cache
+from agentflow.core.deploy import deploy
 from agentflow.core.llm import LLM
+from agentflow.core.prompt import PromptBuilder
+from agentflow.task_aware.notifiers import NOTIFIERS, Notifier, TkNotifier
+from agentflow.task_aware.pipeline import BatchingHandler, EventBatcher, default_pipeline
 import json
 import asyncio
 
+SUGGESTION_TOKENS = 60  # One or two sentences for the notifier
+
+SUGGESTIONS = {
+    ".py": [
+        ("optimize_agent", "Deploy code optimization agent"),
+        ("debug_agent", "Deploy debug agent")
+    ],
+    ".md": [
+        ("doc_agent", "Deploy documentation agent"),
+        ("summarize_agent", "Deploy summarization agent")
+    ],
+    ".txt": [
+        ("summarize_agent", "Deploy summarization agent")
+    ]
+}
+
 class AgentWatcher(FileSystemEventHandler):
-    def __init__(self, memory: Memory, timeout: float = float('inf')):
+    """Suggests and runs agents for modified files.
+
+    Watchdog callbacks only enqueue paths. One long-lived event loop on a
+    background thread drains a bounded queue with ``workers`` coroutines, which
+    ask the notifier and run deploys in-process; when the queue is full new
+    events are dropped rather than piling up.
+    """
+
+    def __init__(
+        self,
+        memory: Memory,
+        timeout: float = float('inf'),
+        notifier: Optional[Notifier] = None,
+        workers: int = 2,
+        queue_size: int = 64
+    ):
         self.memory = memory
         self.timeout = timeout
         self.start_time = time.time()
         self.last_suggestion = 0
+        self.last_action = 0
         self.cooldown = 5
         self.event_count = 0
+        self.dropped = 0
         self.action_times = []
-        self.llm = LLM(provider="ollama")
-        self.root = tk.Tk()
-        self.root.withdraw()  # Hide main window
+        self.llm = LLM(provider="ollama", cache=get_cache())
+        self.notifier = notifier or TkNotifier()
+        self.workers = workers
+        self.queue_size = queue_size
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._tasks = []
+        self._history_lock: Optional[asyncio.Lock] = None
+
+    def start(self):
+        """Start the event loop thread and its workers."""
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._history_lock = asyncio.Lock()
+            self._tasks = [self.loop.create_task(self._worker()) for _ in range(self.workers)]
+            ready.set()
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="agentflow-watcher", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self, drain: bool = True):
+        """Optionally finish queued work, then stop the loop and its thread."""
+        if self.loop is None:
+            return
+        if drain:
+            asyncio.run_coroutine_threadsafe(self._queue.join(), self.loop).result()
+
+        async def shutdown():
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+        self.loop = None
 
     async def reason_suggestion(self, file_path: str) -> str:
         """Generate natural language suggestion using LLM."""
         file_type = os.path.splitext(file_path)[1]
-        prompt = f"A developer modified a {file_type} file at {file_path}. Suggest an action in natural language, considering file type and context."
+        prompt = PromptBuilder(self.llm.model, num_predict=SUGGESTION_TOKENS).render(
+            "A developer modified a {file_type} file at {file_path}. Suggest an action in natural language, considering file type and context.",
+            file_type=file_type,
+            file_path=file_path
+        )
         try:
-            return await self.llm.generate(prompt)
+            return await self.llm.generate(prompt, num_predict=SUGGESTION_TOKENS)
         except Exception as e:
             return f"Based on the {file_type} file, consider optimizing or debugging."
 
@@ -44,60 +127,74 @@ class AgentWatcher(FileSystemEventHandler):
         return f"Timeout in {int(remaining)} seconds" if remaining != float('inf') else "No timeout set"
 
     def on_modified(self, event):
-        if time.time() - self.last_suggestion < self.cooldown or not event.src_path.endswith((".py", ".md", ".txt")):
+        if time.time() - self.last_suggestion < self.cooldown or not event.src_path.endswith(tuple(SUGGESTIONS)):
             return
-        
-        self.event_count += 1
-        file_type = os.path.splitext(event.src_path)[1]
-        suggestions = {
-            ".py": [
-                ("optimize_agent", "Deploy code optimization agent"),
-                ("debug_agent", "Deploy debug agent")
-            ],
-            ".md": [
-                ("doc_agent", "Deploy documentation agent"),
-                ("summarize_agent", "Deploy summarization agent")
-            ],
-            ".txt": [
-                ("summarize_agent", "Deploy summarization agent")
-            ]
-        }.get(file_type, [])
+        if self.loop is None:
+            self.start()
+        self.last_suggestion = time.time()
+        self.loop.call_soon_threadsafe(self._enqueue, event.src_path)
+
+    def _enqueue(self, path: str):
+        try:
+            self._queue.put_nowait(path)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _worker(self):
+        while True:
+            path = await self._queue.get()
+            try:
+                await self.handle(path)
+            except Exception as e:
+                print(f"[AgentFlow] Watcher error for {path}: {e}")
+            finally:
+                self._queue.task_done()
 
+    async def handle(self, path: str):
+        """Suggest actions for ``path`` and run the one the notifier picks."""
+        self.event_count += 1
+        suggestions = SUGGESTIONS.get(os.path.splitext(path)[1], [])
         if not suggestions:
             return
 
         # Generate natural language suggestion
-        suggestion_text = asyncio.run(self.reason_suggestion(event.src_path))
-        response = messagebox.askyesno(
-            "AgentFlow Suggestion",
-            f"{suggestion_text}\n\nProceed with one of these actions?\n" + "\n".join(f"{i}. {desc}" for i, (_, desc) in enumerate(suggestions, 1)),
-            parent=self.root
-        )
+        suggestion_text = await self.reason_suggestion(path)
+        agent_name = await self.notifier.notify(suggestion_text, suggestions)
+        if not agent_name:
+            return
 
-        if response:
-            choice = messagebox.askinteger("Select Action", f"Enter action number (1-{len(suggestions)}):", minvalue=1, maxvalue=len(suggestions))
-            if choice and 1 <= choice <= len(suggestions):
-                agent_name, _ = suggestions[choice - 1]
-                start_action = time.time()
-                os.system(f"python -m agentflow.cli deploy {agent_name} {event.src_path}")
-                action_time = time.time() - start_action
-                self.action_times.append(action_time)
-                self.memory.store(f"last_task_{event.src_path}", agent_name)
-
-                # Update watch history
-                history = self.memory.retrieve_json("watch_history") or {"intervals": [], "events": 0}
-                history["intervals"].append(time.time() - self.last_suggestion)
-                history["events"] += 1
-                self.memory.store_json("watch_history", history)
-        
-        self.last_suggestion = time.time()
+        start_action = time.time()
+        await deploy(agent_name, path, self.memory)
+        action_time = time.time() - start_action
+        self.action_times.append(action_time)
+        await self.memory.astore(f"last_task_{path}", agent_name)
+
+        # Update watch history (workers run concurrently, so serialise the read-modify-write)
+        async with self._history_lock:
+            history = await self.memory.aretrieve("watch_history")
+            history = json.loads(history) if history else {"intervals": [], "events": 0}
+            history["intervals"].append(start_action - self.last_action)
+            self.last_action = start_action
+            history["events"] += 1
+            await self.memory.astore("watch_history", json.dumps(history))
+
+def run_watcher(directory: str, timeout: float, headless: bool = False, notifier: str = "tk"):
+    """Run the watcher in a separate process.
 
-def run_watcher(directory: str, timeout: float):
-    """Run the watcher in a separate process."""
+    File events always flow through a debounced batch pipeline that keeps the
+    file index, file-type census and summary cache current. ``headless`` skips
+    the interactive suggestions entirely; otherwise they go to ``notifier``
+    (``"tk"``, ``"log"`` or ``"headless"``).
+    """
     memory = Memory()
-    watcher = AgentWatcher(memory, timeout)
+    batcher = EventBatcher(default_pipeline(directory, memory))
     observer = Observer()
-    observer.schedule(watcher, directory, recursive=True)
+    observer.schedule(BatchingHandler(batcher, directory), directory, recursive=True)
+    watcher = None
+    if not headless:
+        watcher = AgentWatcher(memory, timeout, notifier=NOTIFIERS[notifier]())
+        watcher.start()
+        observer.schedule(watcher, directory, recursive=True)
     observer.start()
     print("[AgentFlow] Watching your workflow in background...")
     try:
@@ -105,6 +202,10 @@ def run_watcher(directory: str, timeout: float):
         while time.time() - start_time < timeout:
             time.sleep(1)
     except KeyboardInterrupt:
-        observer.stop()
+        pass
+    observer.stop()
     observer.join()
-    print("[AgentFlow] Background watcher stopped.")
\ No newline at end of file
+    batcher.stop()
+    if watcher is not None:
+        watcher.stop(drain=False)
+    print("[AgentFlow] Background watcher stopped.")
@@ -0,0 +1,191 @@
+import asyncio
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from agentflow.core.llm import LLM
+
+class IVFIndex:
+    """Inverted-file index: vectors are bucketed by their nearest k-means centroid
+    and a search only scans the ``nprobe`` buckets closest to the query."""
+
+    def __init__(self, nlist: int, nprobe: int = 8, iterations: int = 10, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self.order = np.empty(0, dtype=np.int64)   # Positions sorted by bucket
+        self.offsets = np.zeros(nlist + 1, dtype=np.int64)
+        self.size = 0  # Number of positions covered by the buckets
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), 65536):
+            labels[start:start + 65536] = np.argmax(vectors[start:start + 65536] @ self.centroids.T, axis=1)
+        return labels
+
+    def train(self, vectors: np.ndarray):
+        """Run spherical k-means on a sample, then bucket every vector."""
+        sample_size = min(len(vectors), self.nlist * 40)
+        sample = vectors[self.rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[self.rng.choice(sample_size, self.nlist, replace=False)].copy()
+        for _ in range(self.iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(self.nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+        self.centroids = centroids
+        labels = self._assign(vectors)
+        self.order = np.argsort(labels, kind="stable")
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=self.nlist))])
+        self.size = len(vectors)
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        probe = np.argsort(self.centroids @ query)[-self.nprobe:]
+        return np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+
+class SemanticMemory:
+    """Embedding store with top-k cosine search.
+
+    Vectors are normalised float32 rows kept in one NumPy matrix and persisted as
+    blobs in SQLite. Search is an exact vectorised scan until the store grows
+    past ``ann_threshold`` entries, after which an IVF index narrows the scan;
+    entries added or updated since the index was trained are scanned exactly
+    until it is retrained.
+    """
+
+    def __init__(
+        self,
+        llm: Optional[LLM] = None,
+        db_path: str = "agentflow_memory.db",
+        ann_threshold: int = 50000,
+        nprobe: int = 8
+    ):
+        self.llm = llm or LLM(provider="local")
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_memory (id INTEGER PRIMARY KEY, key TEXT UNIQUE, text TEXT, vector BLOB)"
+        )
+        self.conn.commit()
+        self._keys: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._count = 0
+        self._index: Optional[IVFIndex] = None
+        self._dirty: List[int] = []  # Positions added or updated since the index was trained
+        self._load()
+
+    def _load(self):
+        rows = self.conn.execute("SELECT key, vector FROM semantic_memory ORDER BY id").fetchall()
+        if not rows:
+            return
+        self._keys = [key for key, _ in rows]
+        self._positions = {key: i for i, key in enumerate(self._keys)}
+        self._matrix = np.frombuffer(b"".join(vector for _, vector in rows), dtype=np.float32).reshape(len(rows), -1).copy()
+        self._count = len(rows)
+        self._maybe_reindex()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    def _append(self, vectors: np.ndarray) -> int:
+        if self._matrix is None:
+            self._matrix = np.empty((max(1024, len(vectors)), vectors.shape[1]), dtype=np.float32)
+        elif vectors.shape[1] != self._matrix.shape[1]:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {self._matrix.shape[1]}")
+        needed = self._count + len(vectors)
+        if needed > len(self._matrix):  # Grow geometrically so appends stay amortised O(1)
+            grown = np.empty((max(needed, 2 * len(self._matrix)), self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._count] = self._matrix[:self._count]
+            self._matrix = grown
+        start = self._count
+        self._matrix[start:needed] = vectors
+        self._count = needed
+        return start
+
+    def add_vectors(self, items: Dict[str, Tuple[str, List[float]]]):
+        """Insert or replace ``key -> (text, vector)`` entries."""
+        if not items:
+            return
+        vectors = np.asarray([vector for _, vector in items.values()], dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        new_keys, new_rows = [], []
+        for (key, _), vector in zip(items.items(), vectors):
+            if key in self._positions:
+                self._matrix[self._positions[key]] = vector
+                self._dirty.append(self._positions[key])
+            else:
+                new_keys.append(key)
+                new_rows.append(vector)
+        if new_rows:
+            start = self._append(np.asarray(new_rows))
+            for offset, key in enumerate(new_keys):
+                self._positions[key] = start + offset
+                self._keys.append(key)
+                self._dirty.append(start + offset)
+        self.conn.executemany(
+            "INSERT INTO semantic_memory (key, text, vector) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET text = excluded.text, vector = excluded.vector",
+            [(key, text, vector.tobytes()) for (key, (text, _)), vector in zip(items.items(), vectors)]
+        )
+        self.conn.commit()
+        self._maybe_reindex()
+
+    def _maybe_reindex(self):
+        if self._count < self.ann_threshold:
+            self._index = None
+            self._dirty = []
+            return
+        if self._index is None or len(self._dirty) > self._index.size // 10:
+            self._index = IVFIndex(nlist=max(16, int(np.sqrt(self._count))), nprobe=self.nprobe)
+            self._index.train(self._matrix[:self._count])
+            self._dirty = []
+
+    async def add(self, key: str, text: str):
+        await self.add_many({key: text})
+
+    async def add_many(self, texts: Dict[str, str]):
+        vectors = await asyncio.gather(*(self.llm.embed(text) for text in texts.values()))
+        self.add_vectors({key: (text, vector) for (key, text), vector in zip(texts.items(), vectors)})
+
+    def search_vector(self, vector: List[float], k: int = 5) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(key, cosine similarity)`` pairs, best first."""
+        if not self._count:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) + 1e-12
+        if self._index is None:
+            positions = None
+            scores = self._matrix[:self._count] @ query
+        else:
+            positions = self._index.candidates(query)
+            if self._dirty:
+                positions = np.unique(np.concatenate([positions, np.asarray(self._dirty, dtype=np.int64)]))
+            scores = self._matrix[positions] @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        hits = top if positions is None else positions[top]
+        return [(self._keys[i], float(scores[j])) for i, j in zip(hits, top)]
+
+    async def search(self, query: str, k: int = 5) -> List[Tuple[str, str, float]]:
+        """Return up to ``k`` ``(key, text, score)`` entries most similar to the query."""
+        hits = self.search_vector(await self.llm.embed(query), k)
+        if not hits:
+            return []
+        keys = [key for key, _ in hits]
+        texts = dict(self.conn.execute(
+            f"SELECT key, text FROM semantic_memory WHERE key IN ({','.join('?' * len(keys))})", keys
+        ).fetchall())
+        return [(key, texts.get(key, ""), score) for key, score in hits]
+
+    def close(self):
+        self.conn.close()
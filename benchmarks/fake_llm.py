@@ -0,0 +1,168 @@
+"""In-process stand-in for an Ollama or llama.cpp server.
+
+    python -m benchmarks.fake_llm [--port 11434] [--latency 0.05] [--error-rate 0.01]
+
+Serves ``/api/generate`` (Ollama JSON, or NDJSON when streaming),
+``/completion`` (llama.cpp JSON, or SSE when streaming) and
+``/api/embeddings`` with configurable latency, per-token streaming delay and
+error rate, so agents can be exercised and benchmarked without a model.
+"""
+import argparse
+import asyncio
+import json
+import random
+from typing import Callable, Optional, Union
+from aiohttp import web
+from agentflow.core.llm import hash_embedding
+
+class FakeLLMServer:
+    """Fake model server; use ``async with FakeLLMServer(...) as server`` and point an LLM at ``server.url``.
+
+    ``latency`` (plus up to ``jitter``) is the time to first token, each
+    streamed token takes ``token_delay``, and ``error_rate`` of requests fail
+    with ``error_status``. ``response`` is a string or a function of the
+    prompt; by default plan prompts get the first skill they list and other
+    prompts get a short canned answer.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        token_delay: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        response: Union[str, Callable[[str], str], None] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.response = response
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.active = 0
+        self.peak_active = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def answer(self, prompt: str) -> str:
+        if callable(self.response):
+            return self.response(prompt)
+        if self.response is not None:
+            return self.response
+        if "available skills [" in prompt:
+            skills = prompt.split("available skills [", 1)[1].split("]", 1)[0]
+            return skills.split(",")[0].strip(" '\"")
+        return "This is a fake completion for benchmarking."
+
+    async def _begin(self) -> bool:
+        """Count the request, wait out its latency and decide whether it fails."""
+        self.requests += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        await asyncio.sleep(self.latency + self.rng.random() * self.jitter)
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            return False
+        return True
+
+    async def _stream(self, request: web.Request, tokens, frame: Callable[[str, bool], bytes], content_type: str) -> web.StreamResponse:
+        resp = web.StreamResponse(headers={"Content-Type": content_type})
+        await resp.prepare(request)
+        for token in tokens:
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            await resp.write(frame(token, False))
+        await resp.write(frame("", True))
+        await resp.write_eof()
+        return resp
+
+    async def generate(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        try:
+            if not await self._begin():
+                return web.json_response({"error": "fake failure"}, status=self.error_status)
+            text = self.answer(body.get("prompt", ""))
+            limit = body.get("options", {}).get("num_predict") or body.get("n_predict")
+            tokens = [word + " " for word in text.split()][:limit] if limit else [word + " " for word in text.split()]
+            llama = request.path == "/completion"
+            if body.get("stream"):
+                if llama:
+                    return await self._stream(
+                        request, tokens,
+                        lambda token, done: b"data: " + json.dumps({"content": token, "stop": done}).encode() + b"\n\n",
+                        "text/event-stream"
+                    )
+                return await self._stream(
+                    request, tokens,
+                    lambda token, done: json.dumps({"response": token, "done": done}).encode() + b"\n",
+                    "application/x-ndjson"
+                )
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay * len(tokens))
+            text = "".join(tokens).strip()
+            return web.json_response({"content": text, "stop": True} if llama else {"response": text, "done": True})
+        finally:
+            self.active -= 1
+
+    async def embeddings(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        try:
+            if not await self._begin():
+                return web.json_response({"error": "fake failure"}, status=self.error_status)
+            return web.json_response({"embedding": hash_embedding(body.get("prompt", ""))})
+        finally:
+            self.active -= 1
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/generate", self.generate)
+        app.router.add_post("/completion", self.generate)
+        app.router.add_post("/api/embeddings", self.embeddings)
+        return app
+
+    async def start(self) -> "FakeLLMServer":
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeLLMServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeLLMServer(args.latency, args.jitter, args.token_delay, args.error_rate, host=args.host, port=args.port)
+    print(f"[AgentFlow] Fake LLM server on http://{args.host}:{args.port}")
+    web.run_app(server.app(), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
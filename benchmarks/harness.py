@@ -0,0 +1,127 @@
+"""Timing helpers and the JSON results format shared by the benchmark suites."""
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+RESULTS_VERSION = 1
+# Metrics where a larger value is better; every other timing metric regresses upwards
+HIGHER_IS_BETTER = {"throughput"}
+COMPARED = ("throughput", "p50_ms", "p99_ms")
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0, **params: Any) -> Dict[str, Any]:
+    """Standard result row: operation count, throughput (ops/s) and latency percentiles in ms."""
+    return {
+        "ops": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "params": params,
+    }
+
+async def run_concurrent(
+    operation: Callable[[int], Awaitable[Any]],
+    count: int,
+    concurrency: int,
+    failed: Callable[[Any], bool] = lambda result: False,
+    **params: Any
+) -> Dict[str, Any]:
+    """Run ``operation(i)`` for ``i`` in ``range(count)`` with at most ``concurrency`` in flight."""
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if failed(await operation(i)):
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return summarize(latencies, time.perf_counter() - start, errors, concurrency=concurrency, **params)
+
+def run_sync(operation: Callable[[int], Any], count: int, **params: Any) -> Dict[str, Any]:
+    """Time ``operation(i)`` for ``i`` in ``range(count)`` one after another."""
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for i in range(count):
+        op_start = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - op_start)
+    return summarize(latencies, time.perf_counter() - start, **params)
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def results_document(benchmarks: Dict[str, Dict[str, Any]], scale: str) -> Dict[str, Any]:
+    return {
+        "version": RESULTS_VERSION,
+        "timestamp": time.time(),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "scale": scale,
+        "benchmarks": benchmarks,
+    }
+
+def save(document: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {document.get('version')}")
+    return document
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Compare two results documents metric by metric.
+
+    Returns one row per benchmark and metric present in both, with the relative
+    change (positive = worse) and whether it exceeds ``threshold``.
+    """
+    rows = []
+    for name, now in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        for metric in COMPARED:
+            old, new = before.get(metric), now.get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if metric in HIGHER_IS_BETTER else (new - old) / old
+            rows.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": change,
+                "regression": change > threshold,
+            })
+    return rows
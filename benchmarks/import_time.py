@@ -0,0 +1,62 @@
+"""Measure cold-start import time of the CLI (or any module) in fresh interpreters.
+
+    python -m benchmarks.import_time [--module agentflow.cli] [--runs 20] [--max-ms 100]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ("aiohttp", "bs4", "rich", "yaml", "watchdog", "tkinter", "numpy", "sqlite3")
+
+def measure(module: str, runs: int):
+    baseline, timings = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        baseline.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+        timings.append(time.perf_counter() - start)
+    return baseline, timings
+
+def top_imports(module: str, count: int = 10):
+    """The slowest imports by cumulative time, from ``python -X importtime``."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines()[1:]:  # "import time: self | cumulative | name"
+        _, cumulative, name = line.split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+def loaded_heavy_modules(module: str):
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="agentflow.cli")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the median import cost exceeds this")
+    args = parser.parse_args()
+
+    baseline, timings = measure(args.module, args.runs)
+    result = {
+        "module": args.module,
+        "runs": args.runs,
+        "interpreter_ms": statistics.median(baseline) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+        "import_cost_ms": (statistics.median(timings) - statistics.median(baseline)) * 1000,
+        "heavy_modules_loaded": loaded_heavy_modules(args.module),
+        "slowest_imports_us": top_imports(args.module),
+    }
+    print(json.dumps(result, indent=2))
+    if args.max_ms is not None and result["import_cost_ms"] > args.max_ms:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
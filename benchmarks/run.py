@@ -0,0 +1,208 @@
+"""Run the AgentFlow benchmark suites against a fake model server and write JSON results.
+
+    python -m benchmarks.run [--scale small|full] [--only agent,memory] [--out results.json]
+                             [--compare baseline.json] [--threshold 0.10]
+
+With ``--compare`` the run fails (exit 1) when throughput, p50 or p99 of any
+benchmark is worse than the baseline by more than ``--threshold``.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.harness import compare, load, results_document, run_concurrent, run_sync, save, summarize
+
+SCALES = {
+    "small": {"queries": 50, "concurrency": 8, "agents": 4, "memory_ops": 2000, "files": 500, "searches": 100, "events": 2000, "latency": 0.005},
+    "full": {"queries": 1000, "concurrency": 64, "agents": 8, "memory_ops": 50000, "files": 20000, "searches": 1000, "events": 50000, "latency": 0.05},
+}
+
+def _failed(result: Any) -> bool:
+    text = str(result).lower()
+    return "error" in text or "unreachable" in text or "timed out" in text
+
+def _bench_skills():
+    from agentflow.skills import skill
+
+    @skill
+    async def bench_echo(query: str) -> str:
+        return f"echo: {query}"
+
+    return [bench_echo]
+
+def _agent(name: str, url: str):
+    from agentflow.core.agent import Agent
+    agent = Agent(skills=_bench_skills(), name=name)
+    agent.llm.base_url = url
+    agent.llm.cache = None  # Measure the model path, not cache hits
+    return agent
+
+async def bench_agent(scale: Dict[str, Any], workdir: str) -> Dict[str, Dict[str, Any]]:
+    async with FakeLLMServer(latency=scale["latency"]) as server:
+        agent = _agent("bench_agent", server.url)
+        row = await run_concurrent(
+            lambda i: agent.run(f"benchmark query {i}"), scale["queries"], scale["concurrency"],
+            failed=_failed, llm_latency=scale["latency"]
+        )
+        row["params"]["server_peak_concurrency"] = server.peak_active
+        return {"agent.run": row}
+
+async def bench_llm_stream(scale: Dict[str, Any], workdir: str) -> Dict[str, Dict[str, Any]]:
+    from agentflow.core.llm import LLM
+    async with FakeLLMServer(latency=scale["latency"], token_delay=0.001) as server:
+        llm = LLM()
+        llm.base_url = server.url
+        first_tokens = []
+
+        async def stream(i: int) -> str:
+            start = time.perf_counter()
+            tokens = []
+            async for token in llm.stream(f"stream {i}"):
+                if not tokens:
+                    first_tokens.append(time.perf_counter() - start)
+                tokens.append(token)
+            return "".join(tokens)
+
+        row = await run_concurrent(stream, scale["queries"], scale["concurrency"], failed=_failed)
+        ttft = summarize(first_tokens, row["seconds"])
+        return {"llm.stream": row, "llm.stream.first_token": ttft}
+
+async def bench_swarm(scale: Dict[str, Any], workdir: str) -> Dict[str, Dict[str, Any]]:
+    from agentflow.core.swarm import Swarm
+    from agentflow.memory import Memory
+    memory = Memory(os.path.join(workdir, "swarm.db"), batched=True)
+    async with FakeLLMServer(latency=scale["latency"], jitter=scale["latency"]) as server:
+        swarm = Swarm([_agent(f"bench_agent_{i}", server.url) for i in range(scale["agents"])], memory)
+        row = await run_concurrent(
+            lambda i: swarm.run(f"swarm query {i}"), scale["queries"], scale["concurrency"],
+            failed=_failed, agents=scale["agents"]
+        )
+    memory.close()
+    return {"swarm.run": row}
+
+async def bench_memory(scale: Dict[str, Any], workdir: str) -> Dict[str, Dict[str, Any]]:
+    from agentflow.memory import Memory
+    results = {}
+    count = scale["memory_ops"]
+    for batched in (False, True):
+        memory = Memory(os.path.join(workdir, f"memory_{batched}.db"), batched=batched)
+        label = "batched" if batched else "unbatched"
+        # Unbatched writes commit (fsync) each time, so time fewer of them
+        writes = count if batched else max(1, count // 10)
+        results[f"memory.store.{label}"] = run_sync(lambda i: memory.store(f"key_{i}", f"value_{i}"), writes)
+        memory.flush()
+        results[f"memory.retrieve.{label}"] = run_sync(lambda i: memory.retrieve(f"key_{i % writes}"), count)
+        memory.close()
+    return results
+
+def _make_tree(root: str, files: int):
+    for i in range(files):
+        directory = os.path.join(root, f"pkg_{i % 50}", f"mod_{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file_{i}.py"), "w") as f:
+            f.write(f"def handler_{i}():\n    return 'payload {i} {i % 13}'\n")
+
+async def bench_local_search(scale: Dict[str, Any], workdir: str) -> Dict[str, Dict[str, Any]]:
+    from agentflow.file_index import FileIndex
+    root = os.path.join(workdir, "tree")
+    _make_tree(root, scale["files"])
+    index = FileIndex(root, db_path=os.path.join(workdir, "index.db"))
+    start = time.perf_counter()
+    index.refresh()
+    build = summarize([time.perf_counter() - start], time.perf_counter() - start, files=scale["files"])
+    queries = ["handler_1", "payload 7", "file_42", "mod_3", "zz", "nothing_matches_this"]
+    search = run_sync(lambda i: index.search(queries[i % len(queries)]), scale["searches"], files=scale["files"])
+    start = time.perf_counter()
+    index.refresh()
+    rescan = summarize([time.perf_counter() - start], time.perf_counter() - start, files=scale["files"])
+    index.close()
+    return {"local_search.build": build, "local_search.search": search, "local_search.refresh_unchanged": rescan}
+
+async def bench_watcher_pipeline(scale: Dict[str, Any], workdir: str) -> Dict[str, Dict[str, Any]]:
+    from agentflow.file_index import FileIndex
+    from agentflow.memory import Memory
+    from agentflow.task_aware.pipeline import EventBatcher, default_pipeline
+    root = os.path.join(workdir, "watched")
+    _make_tree(root, scale["events"])
+    memory = Memory(os.path.join(workdir, "watch.db"), batched=True)
+    index = FileIndex(root, db_path=os.path.join(workdir, "watch_index.db"))
+    pipeline = default_pipeline(root, memory, index)
+    batch_times = []
+
+    def handler(batch):
+        start = time.perf_counter()
+        pipeline(batch)
+        batch_times.append(time.perf_counter() - start)
+
+    batcher = EventBatcher(handler, debounce=0.05, max_delay=0.5)
+    paths = [os.path.join(dirpath, name) for dirpath, _, names in os.walk(root) for name in names]
+    start = time.perf_counter()
+    for path in paths:
+        batcher.add(path, "created")
+        batcher.add(path, "modified")  # Coalesced into the creation
+    batcher.stop()
+    elapsed = time.perf_counter() - start
+    row = summarize(batch_times, elapsed, events=2 * len(paths), batches=batcher.stats["batches"])
+    row["throughput"] = 2 * len(paths) / elapsed  # Events per second, end to end
+    memory.close()
+    index.close()
+    return {"watcher.pipeline": row}
+
+SUITES = {
+    "agent": bench_agent,
+    "stream": bench_llm_stream,
+    "swarm": bench_swarm,
+    "memory": bench_memory,
+    "local_search": bench_local_search,
+    "watcher": bench_watcher_pipeline,
+}
+
+async def run_suites(names, scale_name: str) -> Dict[str, Any]:
+    from agentflow.core import http
+    scale = SCALES[scale_name]
+    benchmarks = {}
+    with tempfile.TemporaryDirectory(prefix="agentflow-bench-") as workdir:
+        for name in names:
+            suite_dir = os.path.join(workdir, name)
+            os.makedirs(suite_dir)
+            benchmarks.update(await SUITES[name](scale, suite_dir))
+    await http.close()
+    return results_document(benchmarks, scale_name)
+
+def print_results(document: Dict[str, Any]):
+    print(f"{'benchmark':34} {'ops':>8} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, row in document["benchmarks"].items():
+        print(f"{name:34} {row['ops']:>8} {row['throughput']:>10.1f} {row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['errors']:>7}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--only", default=",".join(SUITES), help=f"Comma-separated suites from: {', '.join(SUITES)}")
+    parser.add_argument("--out", default=None, help="Write JSON results here")
+    parser.add_argument("--compare", default=None, help="Baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change that counts as a regression")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+    document = asyncio.run(run_suites(names, args.scale))
+    print_results(document)
+    if args.out:
+        save(document, args.out)
+    if args.compare:
+        rows = compare(load(args.compare), document, args.threshold)
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['benchmark']:34} {row['metric']:10} {row['baseline']:>10.2f} -> {row['current']:>10.2f} ({row['change']:+.1%}) {flag}")
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,7 @@ setup(
              "pyyaml>=6.0.0",
              "beautifulsoup4>=4.12.0",
              "rich>=13.0.0",
+             "numpy>=1.24.0",
          ],
          entry_points={
              "console_scripts": [
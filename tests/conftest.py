@@ -0,0 +1,22 @@
+import pytest_asyncio
+from aiohttp import web
+
+@pytest_asyncio.fixture
+async def serve():
+    """Start a throwaway aiohttp server for ``handler`` on /api/generate and return its base URL."""
+    runners = []
+
+    async def start(handler, path="/api/generate"):
+        app = web.Application()
+        app.router.add_route("*", path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        runners.append(runner)
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    yield start
+    for runner in runners:
+        await runner.cleanup()
@@ -4,7 +4,9 @@ from agentflow.core.agent import Agent
 from agentflow.skills.local_search import local_search
 
 @pytest.mark.asyncio
-async def test_agent_run():
+async def test_agent_run(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))  # Keep the file index out of the real ~/.agentflow
+    monkeypatch.chdir(tmp_path)
     agent = Agent(skills=[local_search], llm="ollama")
     result = await agent.run("test")
     assert isinstance(result, str)
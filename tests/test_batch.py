@@ -0,0 +1,97 @@
+import asyncio
+import json
+import pytest
+from typer.testing import CliRunner
+from agentflow.cli import app
+from agentflow.core.agent import Agent
+from agentflow.memory import Memory
+from agentflow.skills import skill
+from benchmarks.fake_llm import FakeLLMServer
+
+calls = []
+
+@skill
+async def shout(query: str) -> str:
+    calls.append(query)
+    await asyncio.sleep(0.01 if query.endswith("0") else 0)
+    return query.upper()
+
+def make_agent(url):
+    agent = Agent(skills=[shout], name="batcher")
+    agent.llm.base_url = url
+    agent.llm.cache = None
+    return agent
+
+@pytest.mark.asyncio
+async def test_run_batch_orders_shares_plans_and_resumes(tmp_path):
+    memory = Memory(str(tmp_path / "m.db"), batched=True)
+    queries = [(str(i), f"q{i % 5}") for i in range(40)]
+    async with FakeLLMServer(latency=0.001, response="shout") as server:
+        agent = make_agent(server.url)
+        results = []
+        async for item in agent.run_batch(queries, concurrency=4, memory=memory, job="j"):
+            results.append(item)
+            if len(results) == 25:
+                break  # Simulate an interrupted run
+        assert [r[0] for r in results] == [str(i) for i in range(25)]
+        assert results[3] == ("3", "q3", "Skill shout: Q3")
+        assert server.requests == 5  # One plan per distinct query
+
+        rest = [item async for item in agent.run_batch(queries, concurrency=4, ordered=False, memory=memory, job="j")]
+        # The last item handed out before the break was never acknowledged, so it is redone
+        assert sorted(int(r[0]) for r in rest) == list(range(24, 40))
+        assert memory.items("batch_j") == []  # A clean, complete run forgets the job
+        again = [item async for item in agent.run_batch(queries, memory=memory, job="j", restart=True)]
+        assert len(again) == 40
+
+@pytest.mark.asyncio
+async def test_restart_deletes_earlier_checkpoints(tmp_path):
+    memory = Memory(str(tmp_path / "m.db"))
+    async with FakeLLMServer(latency=0, response="shout") as server:
+        agent = make_agent(server.url)
+        for restart in (False, True):
+            async for item in agent.run_batch([f"q{i}" for i in range(10)], concurrency=1, memory=memory, job="r", restart=restart):
+                if item[0] == "5":
+                    break
+        assert memory.items("batch_r_0_") == []
+        assert sorted(key for key, _ in memory.items("batch_r_1_")) == [f"batch_r_1_{i}" for i in range(5)]
+
+@pytest.mark.asyncio
+async def test_failed_plans_are_retried_and_not_checkpointed(tmp_path):
+    memory = Memory(str(tmp_path / "m.db"))
+    async with FakeLLMServer(latency=0, response="shout") as server:
+        agent = make_agent(server.url)
+        generate_plan = agent.planner.generate_plan
+        failures = [1]
+
+        async def flaky(query, skills):
+            if failures:
+                failures.pop()
+                raise RuntimeError("planner down")
+            return await generate_plan(query, skills)
+
+        agent.planner.generate_plan = flaky
+        first = [item async for item in agent.run_batch(["same"] * 3, concurrency=1, memory=memory, job="f")]
+        assert first[0][2] == "Batch error: planner down"
+        assert [result for _, _, result in first[1:]] == ["Skill shout: SAME"] * 2  # Later duplicates plan again
+        assert memory.items("batch_f_") != []  # Kept while an item is still failing
+        retried = [item async for item in agent.run_batch(["same"] * 3, memory=memory, job="f")]
+        assert retried == [("0", "same", "Skill shout: SAME")]
+        assert memory.items("batch_f") == []
+
+def test_batch_cli_writes_jsonl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AGENTFLOW_TRACE", "off")
+    with open("in.jsonl", "w") as f:
+        for i in range(3):
+            f.write(json.dumps({"request_id": f"r{i}", "body": f"task {i}"}) + "\n")
+
+    async def fake_run_batch(self, queries, **options):
+        for item_id, query in queries:
+            yield item_id, query, query[::-1]
+
+    monkeypatch.setattr(Agent, "run_batch", fake_run_batch)
+    result = CliRunner().invoke(app, ["batch", "in.jsonl", "--out", "out.jsonl", "--field", "body", "--id-field", "request_id"])
+    assert result.exit_code == 0, result.output
+    rows = [json.loads(line) for line in open("out.jsonl")]
+    assert rows[1] == {"id": "r1", "query": "task 1", "result": "1 ksat"}
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from aiohttp import web
+from agentflow.core.agent import Agent
+from agentflow.core.llm import LLM, MicroBatcher, configure_batching
+
+@pytest.mark.asyncio
+async def test_batcher_limits_in_flight_and_deduplicates(serve):
+    active, peak, prompts = [0], [0], []
+
+    async def handler(request):
+        prompts.append((await request.json())["prompt"])
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.02)
+        active[0] -= 1
+        return web.json_response({"response": "ok"})
+
+    llm = LLM()
+    llm.base_url = await serve(handler)
+    llm.batcher = MicroBatcher(window=0.01, max_in_flight=3, max_pending=4)
+    results = await asyncio.gather(*(llm.generate(f"p{i % 6}") for i in range(24)))
+    assert results == ["ok"] * 24
+    assert peak[0] <= 3
+    stats = llm.batcher.stats()
+    assert len(prompts) + stats["deduplicated"] == 24 and len(prompts) < 24
+    assert stats["backpressured"] > 0
+    assert stats["in_flight"] == 0
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_a_cancelled_caller(serve):
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return web.json_response({"response": "shared"})
+
+    llm = LLM()
+    llm.base_url = await serve(handler)
+    llm.batcher = MicroBatcher(window=0.001)
+    first = asyncio.ensure_future(llm.generate("same"))
+    second = asyncio.ensure_future(llm.generate("same"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "shared"
+    assert len(calls) == 1
+
+def test_batching_is_opt_in(monkeypatch):
+    from agentflow.core import llm as llm_module
+    monkeypatch.setattr(llm_module, "_batcher_options", {})
+    monkeypatch.setattr(llm_module, "_batchers", {})
+    assert Agent(skills=[]).llm.batcher is None
+    assert LLM(batching=True).batcher is not None
+    monkeypatch.setattr(llm_module, "_batching_enabled", False)
+    configure_batching(max_in_flight=16)
+    assert Agent(skills=[]).llm.batcher.max_in_flight == 16
+    assert Agent(skills=[], batching=False).llm.batcher is None
+
+def test_configure_batching_reaches_existing_llms(monkeypatch):
+    from agentflow.core import llm as llm_module
+    monkeypatch.setattr(llm_module, "_batcher_options", {})
+    monkeypatch.setattr(llm_module, "_batchers", {})
+    monkeypatch.setattr(llm_module, "_batching_enabled", False)
+    llm, opted_out = LLM(), LLM(batching=False)
+    configure_batching(max_in_flight=2)
+    assert llm.batcher.max_in_flight == 2
+    assert opted_out.batcher is None
+    configure_batching(False)
+    assert llm.batcher is None
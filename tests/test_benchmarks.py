@@ -0,0 +1,33 @@
+import pytest
+from agentflow.core.llm import LLM
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.harness import compare, load, percentile, save
+from benchmarks.run import main
+
+@pytest.mark.asyncio
+async def test_fake_server_streams_and_fails_on_demand():
+    async with FakeLLMServer(latency=0, response="one two three") as server:
+        llm = LLM()
+        llm.base_url = server.url
+        assert "".join([token async for token in llm.stream("hi", num_predict=2)]).strip() == "one two"
+        assert await llm.generate("available skills ['local_search', 'summarize']") == "one two three"
+    async with FakeLLMServer(latency=0, error_rate=1.0, error_status=400) as server:
+        llm = LLM()
+        llm.base_url = server.url
+        assert await llm.generate("hi") == "LLM error: HTTP 400"
+        assert server.errors == 1
+
+def test_run_writes_results_and_flags_regressions(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    out = str(tmp_path / "results.json")
+    assert main(["--only", "memory,agent", "--out", out]) == 0
+    document = load(out)
+    assert {"agent.run", "memory.store.batched"} <= set(document["benchmarks"])
+    assert document["benchmarks"]["agent.run"]["errors"] == 0
+
+    document["benchmarks"]["agent.run"]["p99_ms"] /= 10  # Pretend the baseline was much faster
+    baseline = str(tmp_path / "baseline.json")
+    save(document, baseline)
+    rows = compare(load(baseline), load(out))
+    assert any(row["regression"] and row["metric"] == "p99_ms" for row in rows)
+    assert percentile([1, 2, 3, 4], 0.5) == 2
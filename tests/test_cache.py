@@ -0,0 +1,87 @@
+import time
+import pytest
+from aiohttp import web
+from agentflow.core import tracing
+from agentflow.core.cache import ResponseCache
+from agentflow.core.llm import LLM
+from agentflow.memory import Memory
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = ResponseCache(max_entries=2, ttl=10)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    now = time.time()
+    monkeypatch.setattr("agentflow.core.cache.time.time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+def test_persistent_tier_survives_new_cache(tmp_path):
+    memory = Memory(str(tmp_path / "cache.db"))
+    ResponseCache(memory=memory).set("k", "v")
+    cache = ResponseCache(memory=memory)
+    assert cache.get("k") == "v"
+    assert cache.stats()["persistent_hits"] == 1
+
+def test_persistent_tier_is_pruned(tmp_path, monkeypatch):
+    memory = Memory(str(tmp_path / "cache.db"))
+    cache = ResponseCache(memory=memory, ttl=10, max_persistent_entries=3, prune_every=1000)
+    for i in range(5):
+        cache.set(f"old{i}", "v")
+    clock = iter(range(int(time.time()) + 11, int(time.time()) + 100))
+    monkeypatch.setattr("agentflow.core.cache.time.time", lambda: next(clock))
+    for i in range(4):
+        cache.set(f"new{i}", "v")
+    cache.clear()
+    cache.get("new0")  # A persistent hit keeps the entry out of the least recently used surplus
+    assert cache.prune() == 6  # Five expired, then the least recently used surplus entry
+    assert sorted(key for key, in cache.conn.execute("SELECT key FROM llm_cache")) == ["new0", "new2", "new3"]
+
+def test_legacy_rows_are_dropped(tmp_path):
+    memory = Memory(str(tmp_path / "cache.db"))
+    memory.store_json("llm_cache_old", {"value": "v", "expires": None})
+    memory.store("other", "kept")
+    ResponseCache(memory=memory)
+    assert memory.retrieve("llm_cache_old") is None
+    assert memory.retrieve("other") == "kept"
+
+@pytest.mark.asyncio
+async def test_async_persistent_tier(tmp_path):
+    memory = Memory(str(tmp_path / "cache.db"))
+    await ResponseCache(memory=memory).aset("k", "v")
+    cache = ResponseCache(memory=memory)
+    assert await cache.aget("k") == "v"
+    assert await cache.aget("missing") is None
+    assert cache.stats()["persistent_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_llm_generate_hits_cache(serve):
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        return web.json_response({"response": "plan"})
+
+    cache = ResponseCache()
+    llm = LLM(cache=cache)
+    llm.base_url = await serve(handler)
+    assert await llm.generate("same") == "plan"
+    assert await llm.generate("same") == "plan"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_cache_hit_with_tracing_disabled(serve):
+    async def handler(request):
+        return web.json_response({"response": "plan"})
+
+    tracing.configure(enabled=False)
+    try:
+        llm = LLM(cache=ResponseCache())
+        llm.base_url = await serve(handler)
+        assert await llm.generate("same") == "plan"
+        assert await llm.generate("same") == "plan"
+    finally:
+        tracing.configure()
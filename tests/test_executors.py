@@ -0,0 +1,30 @@
+import os
+import pytest
+from agentflow.skills import skill
+from agentflow.skills.base import Skill
+
+@skill(executor="process")
+def worker_pid(query: str) -> int:
+    return os.getpid()
+
+@skill(executor="thread")
+def thread_skill(query: str) -> str:
+    return query * 2
+
+@pytest.mark.asyncio
+async def test_process_skill_runs_in_worker_process():
+    assert await worker_pid.execute("q") != os.getpid()
+
+@pytest.mark.asyncio
+async def test_thread_skill_and_unpicklable_fallback():
+    assert await thread_skill.execute("ab") == "abab"
+
+    @skill(executor="process")
+    def local_skill(query):  # Not importable by a worker, so it runs in the thread pool
+        return os.getpid()
+
+    assert await local_skill.execute("q") == os.getpid()
+
+def test_unknown_executor_rejected():
+    with pytest.raises(ValueError):
+        Skill("bad", print, executor="gpu")
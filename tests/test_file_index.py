@@ -0,0 +1,51 @@
+import asyncio
+import importlib
+import os
+import pytest
+from agentflow.file_index import FileIndex
+from agentflow.skills.local_search import local_search
+
+local_search_module = importlib.import_module("agentflow.skills.local_search")
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+def test_search_names_and_contents_with_incremental_updates(tmp_path):
+    root = tmp_path / "repo"
+    write(str(root / "src" / "planner.py"), "def generate_plan(): pass\n")
+    write(str(root / "docs" / "notes.md"), "the planner builds a graph\n")
+    index = FileIndex(str(root), db_path=str(tmp_path / "index.db"))
+    assert index.refresh() == {"added": 2, "updated": 0, "removed": 0}
+    assert index.refresh() == {"added": 0, "updated": 0, "removed": 0}
+
+    results = [path for path, _ in index.search("planner")]
+    assert results[0] == os.path.join("src", "planner.py")  # Name matches rank above content matches
+    assert os.path.join("docs", "notes.md") in results
+    assert [path for path, _ in index.search("generate_plan")] == [os.path.join("src", "planner.py")]
+
+    os.remove(str(root / "docs" / "notes.md"))
+    write(str(root / "src" / "swarm.py"), "class Swarm: pass\n")
+    index.update_paths([str(root / "docs" / "notes.md"), str(root / "src" / "swarm.py")])
+    assert [path for path, _ in index.search("Swarm")] == [os.path.join("src", "swarm.py")]
+    assert os.path.join("docs", "notes.md") not in [path for path, _ in index.search("planner")]
+    assert [path for path, _ in index.search("sw")] == [os.path.join("src", "swarm.py")]  # Short queries match names
+
+@pytest.mark.asyncio
+async def test_concurrent_first_searches_share_one_refresh(tmp_path, monkeypatch):
+    write(str(tmp_path / "repo" / "notes.md"), "hello\n")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(tmp_path / "repo")
+    refreshes = []
+    original = FileIndex.refresh
+
+    def counting(self, *args, **kwargs):
+        refreshes.append(1)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(FileIndex, "refresh", counting)
+    results = await asyncio.gather(*(local_search.execute("notes") for _ in range(5)))
+    assert results == ["Found files: notes.md"] * 5
+    assert refreshes == [1]
+    assert local_search_module._refreshing == {}
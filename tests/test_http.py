@@ -0,0 +1,60 @@
+import pytest
+from aiohttp import web
+from agentflow.core.http import HTTPClient
+from agentflow.core.llm import LLM
+
+@pytest.mark.asyncio
+async def test_llm_reuses_pooled_session(serve):
+    async def handler(request):
+        body = await request.json()
+        return web.json_response({"response": f" echo {body['prompt']} "})
+
+    client = HTTPClient()
+    llm = LLM(http=client)
+    llm.base_url = await serve(handler)
+    try:
+        assert await llm.generate("hi") == "echo hi"
+        session = client.session()
+        assert await llm.generate("again") == "echo again"
+        assert client.session() is session
+    finally:
+        await client.close()
+
+@pytest.mark.asyncio
+async def test_request_retries_on_503(serve):
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        if len(calls) < 3:
+            return web.Response(status=503)
+        return web.json_response({"response": "ok"})
+
+    base_url = await serve(handler)
+    client = HTTPClient(retries=2, backoff=0.001)
+    try:
+        async with client.request("POST", f"{base_url}/api/generate", json={}, idempotent=True) as resp:
+            assert resp.status == 200
+        assert len(calls) == 3
+    finally:
+        await client.close()
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_unless_idempotent(serve):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.method)
+        return web.Response(status=503)
+
+    base_url = await serve(handler)
+    client = HTTPClient(retries=2, backoff=0.001)
+    try:
+        async with client.request("POST", f"{base_url}/api/generate", json={}) as resp:
+            assert resp.status == 503
+        assert calls == ["POST"]
+        async with client.request("GET", f"{base_url}/api/generate") as resp:
+            assert resp.status == 503
+        assert calls == ["POST", "GET", "GET", "GET"]
+    finally:
+        await client.close()
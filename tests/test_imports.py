@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+def test_cli_import_does_not_load_command_dependencies():
+    code = (
+        "import sys, agentflow.cli; "
+        "print(','.join(m for m in ('aiohttp', 'bs4', 'rich', 'yaml', 'watchdog', 'tkinter', 'numpy', 'sqlite3') if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+    assert out == ""
+
+def test_lazy_skills_package_exposes_skill_objects():
+    from agentflow.skills import Skill, local_search
+    import agentflow.skills.codegen
+    from agentflow.skills import codegen
+    assert isinstance(local_search, Skill)
+    assert isinstance(codegen, Skill)
+
+def test_registry_finds_builtin_skills_without_importing():
+    from agentflow.skills.registry import builtin_skills
+    skills = builtin_skills()
+    assert {"codegen", "local_search", "summarize", "web_scrape"} <= set(skills)
+    assert skills["web_scrape"]["module"] == "agentflow.skills.web_scrape"
@@ -0,0 +1,46 @@
+import pytest
+from agentflow.core.swarm import Fabric
+from agentflow.knowledge_graph import KnowledgeGraph
+from agentflow.memory import Memory
+
+class StubAgent:
+    def __init__(self, name):
+        self.name = name
+        self.runs = 0
+
+    async def run(self, query):
+        self.runs += 1
+        return f"{self.name}: {query}"
+
+def test_edges_accumulate_and_flush_incrementally(tmp_path):
+    db = str(tmp_path / "graph.db")
+    graph = KnowledgeGraph(db, flush_interval=60)
+    graph.record("a", "b", 2.0)
+    graph.record("a", "b", 1.0)
+    graph.record("a", "c")
+    graph.record("c", "b")
+    assert graph.edge("a", "b") == (3.0, 2)
+    assert graph.neighbors("a") == [("b", 3.0, 2), ("c", 1.0, 1)]
+    assert graph.predecessors("b", limit=1) == [("a", 3.0, 2)]
+    assert [node for node, _ in graph.rank()] == ["a", "b", "c"]
+    assert KnowledgeGraph(db).edge("a", "b") is None  # Nothing written yet
+    graph.flush()
+    graph.record("c", "b")
+    graph.flush()  # Only the one dirty edge is rewritten
+    reloaded = KnowledgeGraph(db)
+    assert reloaded.edge("c", "b") == (2.0, 2)
+    assert len(reloaded) == 3
+    assert reloaded.rank(["b", "c"]) == [("b", 5.0), ("c", 3.0)]
+
+@pytest.mark.asyncio
+async def test_fabric_migrates_strings_and_rotates_the_lead(tmp_path):
+    memory = Memory(str(tmp_path / "memory.db"))
+    memory.store("fabric_connections_beta", "alpha,gamma,alpha")
+    agents = [StubAgent("alpha"), StubAgent("beta"), StubAgent("gamma")]
+    fabric = Fabric(agents, memory)
+    assert await fabric.run("q") == "alpha: q"  # beta already led; agents that never led go first
+    assert memory.retrieve("fabric_connections_beta") is None
+    assert fabric.knowledge_graph.edge("beta", "alpha") == (2.0, 2)
+    for i in range(50):
+        await fabric.run(f"q{i}")
+    assert all(agent.runs >= 5 for agent in agents)  # No agent keeps the lead for good
@@ -0,0 +1,56 @@
+import gc
+import sqlite3
+import time
+import weakref
+import pytest
+from agentflow import memory as memory_module
+from agentflow.memory import Memory
+
+def count_rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+def test_batched_writes_group_commit_by_size(tmp_path):
+    path = str(tmp_path / "mem.db")
+    memory = Memory(path, batched=True, batch_size=3, flush_interval=60)
+    memory.store("a", "1")
+    memory.store("b", "2")
+    assert memory.retrieve("a") == "1"  # Pending writes are visible to readers
+    assert count_rows(path) == 0
+    memory.store("c", "3")
+    assert count_rows(path) == 3
+    memory.close()
+
+def test_batched_writes_flush_by_time(tmp_path):
+    path = str(tmp_path / "mem.db")
+    memory = Memory(path, batched=True, batch_size=100, flush_interval=0.05)
+    memory.store("a", "1")
+    time.sleep(0.2)
+    assert count_rows(path) == 1
+    memory.close()
+
+def test_store_many_and_retrieve_many(tmp_path):
+    memory = Memory(str(tmp_path / "mem.db"))
+    memory.store_many({f"k{i}": str(i) for i in range(1200)})
+    values = memory.retrieve_many(["k0", "k1199", "missing"])
+    assert values == {"k0": "0", "k1199": "1199", "missing": None}
+
+@pytest.mark.asyncio
+async def test_async_api(tmp_path):
+    memory = Memory(str(tmp_path / "mem.db"), batched=True)
+    await memory.astore("a", "1")
+    await memory.astore_many([("b", "2")])
+    assert await memory.aretrieve("a") == "1"
+    assert await memory.aretrieve_many(["a", "b"]) == {"a": "1", "b": "2"}
+    await memory.aflush()
+    memory.close()
+
+def test_batched_memory_is_not_kept_alive_for_exit_flush(tmp_path):
+    memory = Memory(str(tmp_path / "mem.db"), batched=True)
+    ref = weakref.ref(memory)
+    assert memory in memory_module._open
+    memory.close()
+    assert memory not in memory_module._open
+    del memory
+    gc.collect()
+    assert ref() is None
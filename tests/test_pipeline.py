@@ -0,0 +1,69 @@
+import importlib
+import time
+import pytest
+from agentflow.file_index import FileIndex
+from agentflow.memory import Memory
+from agentflow.skills.summarize import summary_key
+from agentflow.task_aware.pipeline import EventBatcher, SummaryInvalidationStage, coalesce, default_pipeline
+
+summarize_module = importlib.import_module("agentflow.skills.summarize")
+
+def test_coalesce_rules():
+    assert coalesce("created", "modified") == "created"
+    assert coalesce("created", "deleted") is None
+    assert coalesce("deleted", "created") == "modified"
+    assert coalesce("modified", "deleted") == "deleted"
+
+def test_burst_of_events_becomes_one_batch():
+    batches = []
+    batcher = EventBatcher(batches.append, debounce=0.05, max_delay=5)
+    for i in range(5000):
+        batcher.add(f"/tmp/file{i % 100}.py", "modified")
+    time.sleep(0.3)
+    batcher.stop()
+    assert len(batches) == 1
+    assert len(batches[0]) == 100
+    assert batcher.stats["events"] == 5000
+
+def test_pipeline_updates_index_census_and_summaries(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    memory = Memory(str(tmp_path / "mem.db"))
+    census_key = f"file_type_census_{root}"
+    (root / "old.py").write_text("old")
+    (root / "kept.py").write_text("kept")
+    memory.store_json(census_key, {".py": 2})
+    memory.store(summary_key(str(root / "old.py")), "stale summary")
+    memory.store(summary_key(str(root / "kept.py")), "stale summary")
+    index = FileIndex(str(root), db_path=str(tmp_path / "index.db"))
+    pipeline = default_pipeline(str(root), memory, index)
+
+    (root / "new.md").write_text("pipeline notes")
+    (root / "old.py").unlink()
+    (root / "kept.py").write_text("saved by atomic rename")
+    pipeline({str(root / "new.md"): "created", str(root / "old.py"): "deleted", str(root / "kept.py"): "created"})
+    pipeline({str(root / "kept.py"): "created"})  # Saved again
+
+    assert memory.retrieve_json(census_key) == {".md": 1, ".py": 1}
+    assert memory.retrieve(summary_key(str(root / "old.py"))) is None
+    assert memory.retrieve(summary_key(str(root / "kept.py"))) is None
+    assert [path for path, _ in index.search("notes")] == ["new.md"]
+
+@pytest.mark.asyncio
+async def test_file_summaries_are_cached_by_path(tmp_path, monkeypatch):
+    path = tmp_path / "notes.txt"
+    path.write_text("some notes")
+    memory = Memory(str(tmp_path / "mem.db"))
+    calls = []
+
+    async def fake_summarize_text(llm, content):
+        calls.append(content)
+        return f"summary of {content}"
+
+    monkeypatch.setattr(summarize_module, "summarize_text", fake_summarize_text)
+    assert await summarize_module.summarize_file(str(path), memory) == "summary of some notes"
+    assert await summarize_module.summarize_file(str(path), memory) == "summary of some notes"
+    assert len(calls) == 1
+    SummaryInvalidationStage(memory)({str(path): "modified"})
+    path.write_text("new notes")
+    assert await summarize_module.summarize_file(str(path), memory) == "summary of new notes"
@@ -0,0 +1,46 @@
+import asyncio
+import time
+import pytest
+from agentflow.core.agent import Agent
+from agentflow.core.planner import Plan
+from agentflow.skills import skill
+
+@skill
+async def slow_a(query: str) -> str:
+    await asyncio.sleep(0.2)
+    return f"a({query})"
+
+@skill
+async def slow_b(query: str) -> str:
+    await asyncio.sleep(0.2)
+    return f"b({query})"
+
+@skill
+async def join(query: str) -> str:
+    return query.replace("\n", "+")
+
+def test_plan_parse_builds_dependency_graph():
+    plan = Plan.parse("slow_a, slow_b -> join, unknown", ["slow_a", "slow_b", "join"])
+    assert plan.steps == {"slow_a": [], "slow_b": [], "join": ["slow_a", "slow_b"]}
+    assert list(plan)[-1] == "join"
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently():
+    agent = Agent(skills=[slow_a, slow_b, join])
+    plan = Plan.parse("slow_a, slow_b -> join", list(agent.skills))
+    start = time.perf_counter()
+    result = await agent.planner.execute_plan(agent, "q", plan)
+    assert time.perf_counter() - start < 0.35
+    assert result.splitlines() == ["Skill slow_a: a(q)", "Skill slow_b: b(q)", "Skill join: a(q)+b(q)"]
+
+@pytest.mark.asyncio
+async def test_timeout_cancels_pending_steps():
+    @skill
+    async def hang(query: str) -> str:
+        await asyncio.sleep(10)
+
+    hang.timeout = 0.05
+    agent = Agent(skills=[hang, slow_a, join])
+    plan = Plan({"hang": [], "slow_a": [], "join": ["slow_a"]})
+    result = await agent.planner.execute_plan(agent, "q", plan)
+    assert result.splitlines() == ["Skill hang timed out", "Skill slow_a cancelled", "Skill join cancelled"]
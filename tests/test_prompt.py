@@ -0,0 +1,63 @@
+import pytest
+from aiohttp import web
+from agentflow.core.llm import LLM
+from agentflow.core.prompt import (
+    PromptBuilder, context_limit, context_window, count_tokens, split_tokens, summarize_text
+)
+
+class RecordingLLM:
+    model = "llama3"
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt, num_predict=None):
+        self.prompts.append((prompt, num_predict))
+        return "summary"
+
+def test_context_limits_and_budget():
+    assert context_limit("llama3:8b") == 8192
+    assert context_limit("mistral-7b") == 32768
+    assert context_limit("unknown-model") == 2048
+    assert PromptBuilder("llama3", num_predict=100, reserve=0).budget == 8092
+
+def test_render_truncates_largest_field_only():
+    builder = PromptBuilder(context=200, num_predict=50)
+    prompt = builder.render("Query '{query}' over {content}", query="find the bug", content="word " * 1000)
+    assert "find the bug" in prompt
+    assert prompt.endswith("...[truncated]")
+    assert builder.fits(prompt)
+
+def test_split_respects_chunk_budget():
+    text = "\n".join(f"line {i} " + "x" * 40 for i in range(200)) + "\n" + "y" * 5000
+    chunks = split_tokens(text, 100)
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == text.replace("\n", "")
+
+@pytest.mark.asyncio
+async def test_summarize_map_reduces_oversized_input():
+    llm = RecordingLLM()
+    assert await summarize_text(llm, "short text") == "summary"
+    assert len(llm.prompts) == 1
+
+    llm = RecordingLLM()
+    await summarize_text(llm, "\n".join("sentence number %d." % i for i in range(20000)), num_predict=50)
+    assert len(llm.prompts) > 2  # Several map calls plus the final reduce
+    assert all(count_tokens(prompt) <= 8192 - 50 for prompt, _ in llm.prompts)
+    assert {n for _, n in llm.prompts} == {50}
+
+@pytest.mark.asyncio
+async def test_generate_sends_per_call_budget_and_window(serve):
+    options = []
+
+    async def handler(request):
+        options.append((await request.json())["options"])
+        return web.json_response({"response": "ok"})
+
+    llm = LLM()
+    llm.base_url = await serve(handler)
+    await llm.generate("hi", num_predict=7)
+    await llm.generate("word " * 3000)
+    assert options[0] == {"num_predict": 7}
+    assert options[1] == {"num_predict": 100, "num_ctx": context_window("word " * 3000, 100, "llama3")}
+    assert options[1]["num_ctx"] == 4096
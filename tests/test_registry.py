@@ -0,0 +1,50 @@
+import os
+from agentflow.memory import Memory
+from agentflow.skills.base import Skill
+from agentflow.skills.marketplace import SkillMarketplace
+from agentflow.skills.registry import CACHE_KEY, SKILLS_DIR, SkillRegistry
+
+SKILL_SOURCE = '''
+from agentflow.skills import skill
+
+LOADS = []
+LOADS.append(1)
+
+@skill
+def {name}(query: str) -> str:
+    """Echo the query."""
+    return "{name}:" + query
+'''
+
+def write_skill(directory, name):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{name}.py"), "w") as f:
+        f.write(SKILL_SOURCE.format(name=name))
+
+def test_marketplace_manifest_lists_and_loads_without_reexecuting(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    memory = Memory(str(tmp_path / "memory.db"))
+    write_skill(tmp_path / "agentflow" / "skills", "echo")
+    market = SkillMarketplace(memory, str(tmp_path / "market"))
+    assert market.push("echo") == "Pushed skill echo to marketplace"
+    assert market.list_skills()["echo"]["description"] == "Echo the query."
+
+    registry = SkillRegistry([SKILLS_DIR, str(tmp_path / "market")], memory=memory)
+    assert {"codegen", "echo"} <= set(registry.list())
+    first = registry.load("echo")
+    assert isinstance(first, Skill)
+    assert registry.load("echo") is first  # Module memoized, not executed again
+    assert registry.load("codegen").name == "codegen"
+
+def test_metadata_cache_persists_and_tracks_changes(tmp_path):
+    memory = Memory(str(tmp_path / "memory.db"))
+    skills_dir = tmp_path / "skills"
+    write_skill(skills_dir, "alpha")
+    assert SkillRegistry([str(skills_dir)], memory=memory).list() == ["alpha"]
+    assert str(skills_dir / "alpha.py") in memory.retrieve_json(CACHE_KEY)
+
+    write_skill(skills_dir, "beta")
+    registry = SkillRegistry([str(skills_dir)], memory=memory)
+    assert registry.list() == ["alpha", "beta"]
+    os.remove(skills_dir / "alpha.py")
+    assert registry.list() == ["beta"]
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import aiohttp
+import pytest
+from agentflow.core.deploy import deploy
+from agentflow.core.server import AgentServer, ping, send_deploy
+from agentflow.memory import Memory
+from agentflow.skills.registry import SkillRegistry
+from benchmarks.fake_llm import FakeLLMServer
+
+SKILL = '''
+import asyncio
+from agentflow.skills import skill
+
+@skill
+async def slow_echo(query: str) -> str:
+    await asyncio.sleep(0.1)
+    return "echo " + query
+'''
+
+@pytest.mark.asyncio
+async def test_daemon_serves_limits_and_shuts_down(tmp_path, monkeypatch):
+    (tmp_path / "skills").mkdir()
+    with open(str(tmp_path / "skills" / "slow_echo.py"), "w") as f:
+        f.write(SKILL)
+    registry = SkillRegistry([str(tmp_path / "skills")], memory=Memory(str(tmp_path / "registry.db")))
+    monkeypatch.setattr("agentflow.skills.registry._registry", registry)
+    sock = str(tmp_path / "run" / "af.sock")
+    monkeypatch.setenv("AGENTFLOW_SOCKET", sock)
+    memory = Memory(str(tmp_path / "memory.db"))
+    server = AgentServer(memory, max_concurrency=1, max_queue=0, grace=5)
+    async with FakeLLMServer(latency=0, response="slow_echo") as llm_server:
+        for agent in server.swarm("echoer", ["slow_echo"]).agents.values():
+            agent.llm.base_url = llm_server.url
+        umask = os.umask(0o022)
+        try:
+            await server.start()
+        finally:
+            assert os.umask(umask) == 0o022  # Restored after binding
+        assert oct(os.stat(str(tmp_path / "run")).st_mode & 0o777) == "0o700"
+        assert oct(os.stat(sock).st_mode & 0o777) == "0o600"
+        try:
+            first, second = await asyncio.gather(
+                send_deploy("echoer", "one", ["slow_echo"]),
+                send_deploy("echoer", "two", ["slow_echo"], retries=0),
+            )
+            assert "echo one" in first
+            assert second == "Server busy: Server busy"
+            assert "echo three" in await deploy("echoer", "three", memory, ["slow_echo"])  # Routed to the daemon
+            health = await ping()
+            assert health["served"] == 2 and health["rejected"] == 1 and health["swarms"] == ["echoer"]
+
+            pending = asyncio.ensure_future(send_deploy("echoer", "four", ["slow_echo"]))
+            await asyncio.sleep(0.05)
+            server.stop()
+            await server.shutdown()  # Waits for the in-flight request
+            assert "echo four" in await pending
+        finally:
+            await server.shutdown()
+    assert not os.path.exists(sock)
+    assert await send_deploy("echoer", "five") is None
+
+@pytest.mark.asyncio
+async def test_daemon_rejects_skill_files_and_requires_a_token_over_tcp(tmp_path, monkeypatch, unused_tcp_port):
+    skill_path = str(tmp_path / "evil.py")
+    with open(skill_path, "w") as f:
+        f.write(SKILL)
+    sock = str(tmp_path / "af.sock")
+    server = AgentServer(Memory(str(tmp_path / "memory.db")), path=sock, port=unused_tcp_port, token_path=str(tmp_path / "token"))
+    await server.start()
+    try:
+        assert "Unknown skills" in await send_deploy("x", "task", [skill_path], path=sock)
+        assert oct(os.stat(str(tmp_path / "token")).st_mode & 0o777) == "0o600"
+        url = f"http://127.0.0.1:{unused_tcp_port}"
+        async with aiohttp.ClientSession() as session:
+            async with session.post(f"{url}/shutdown") as resp:
+                assert resp.status == 401
+            headers = {"Authorization": f"Bearer {open(str(tmp_path / 'token')).read()}"}
+            async with session.get(f"{url}/health", headers=headers) as resp:
+                assert resp.status == 200
+        assert server.accepting
+    finally:
+        await server.shutdown()
@@ -0,0 +1,44 @@
+import json
+import pytest
+from aiohttp import web
+from agentflow.core.agent import Agent
+from agentflow.core.llm import LLM, parse_stream_line
+from agentflow.skills import skill
+
+def ndjson_handler(tokens):
+    async def handler(request):
+        resp = web.StreamResponse()
+        await resp.prepare(request)
+        for token in tokens:
+            await resp.write(json.dumps({"response": token, "done": False}).encode() + b"\n")
+        await resp.write(json.dumps({"response": "", "done": True}).encode() + b"\n")
+        return resp
+    return handler
+
+def test_parse_stream_line_formats():
+    assert parse_stream_line(b'{"response": "hi", "done": false}\n') == ("hi", False)
+    assert parse_stream_line(b'data: {"content": "yo", "stop": true}') == ("yo", True)
+    assert parse_stream_line(b"\n") == ("", False)
+
+@pytest.mark.asyncio
+async def test_llm_stream_yields_tokens(serve):
+    llm = LLM()
+    llm.base_url = await serve(ndjson_handler(["Hel", "lo", " world"]))
+    tokens = [token async for token in llm.stream("hi")]
+    assert tokens == ["Hel", "lo", " world"]
+
+@pytest.mark.asyncio
+async def test_agent_run_stream_yields_plan_then_results(serve):
+    @skill
+    def upper(query: str) -> str:
+        return query.upper()
+
+    @skill
+    def lower(query: str) -> str:
+        return query.lower()
+
+    agent = Agent(skills=[upper, lower])
+    agent.llm.base_url = await serve(ndjson_handler(["up", "per, lo", "wer"]))
+    events = [event async for event in agent.run_stream("MiXed")]
+    assert events[:2] == ["Plan: upper", "Plan: lower"]
+    assert sorted(events[2:]) == ["Skill lower: mixed", "Skill upper: MIXED"]
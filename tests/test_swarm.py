@@ -0,0 +1,160 @@
+import asyncio
+import time
+import pytest
+from agentflow.core.scoring import AgentStatistics, LatencyWindow
+from agentflow.core.swarm import Swarm
+from agentflow.memory import Memory
+
+class SleepyAgent:
+    def __init__(self, name, delay):
+        self.name = name
+        self.delay = delay
+        self.calls = 0
+
+    async def run(self, query):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"{self.name}:{query}"
+
+@pytest.mark.asyncio
+async def test_run_many_spreads_queries_across_agents(tmp_path):
+    agents = [SleepyAgent(f"a{i}", 0.1) for i in range(10)]
+    swarm = Swarm(agents, Memory(str(tmp_path / "mem.db"), batched=True), max_concurrency_per_agent=1, routing="least_loaded")
+    start = time.perf_counter()
+    results = await swarm.run_many([f"q{i}" for i in range(30)])
+    assert time.perf_counter() - start < 1.0  # 30 x 0.1s sequentially would be 3s
+    assert [r.split(":")[1] for r in results] == [f"q{i}" for i in range(30)]
+    assert all(agent.calls == 3 for agent in agents)
+    stats = swarm.stats()
+    assert stats["last_batch"]["queries"] == 30
+    assert stats["queue_time"]["max"] > 0
+
+@pytest.mark.asyncio
+async def test_hedged_request_returns_fastest_answer(tmp_path):
+    slow, fast = SleepyAgent("slow", 1.0), SleepyAgent("fast", 0.01)
+    swarm = Swarm([slow, fast], Memory(str(tmp_path / "mem.db")), hedge=True)
+    start = time.perf_counter()
+    assert await swarm.run("q") == "fast:q"
+    assert time.perf_counter() - start < 0.5
+    assert swarm.inflight == {"slow": 0, "fast": 0}
+
+def test_unknown_routing_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Swarm([], Memory(str(tmp_path / "mem.db")), routing="random")
+
+class FlakyAgent(SleepyAgent):
+    async def run(self, query):
+        await super().run(query)
+        raise RuntimeError("down")
+
+class PickyAgent(SleepyAgent):
+    async def run(self, query):
+        if query == "bad":
+            raise RuntimeError("down")
+        return await super().run(query)
+
+@pytest.mark.asyncio
+async def test_run_many_keeps_results_when_a_query_fails(tmp_path):
+    swarm = Swarm([PickyAgent("a", 0.01)], Memory(str(tmp_path / "mem.db")))
+    assert await swarm.run_many(["q0", "bad", "q1"]) == ["a:q0", "Swarm error: down", "a:q1"]
+
+@pytest.mark.asyncio
+async def test_cancelling_run_many_cancels_queries(tmp_path):
+    swarm = Swarm([SleepyAgent("a", 10)], Memory(str(tmp_path / "mem.db")), max_concurrency_per_agent=2)
+    task = asyncio.ensure_future(swarm.run_many(["q0", "q1"]))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert swarm.inflight == {"a": 0}
+
+def test_latency_window_slides():
+    window = LatencyWindow(size=3)
+    for latency, ok in [(1.0, False), (0.1, True), (0.2, True), (0.3, True)]:
+        window.observe(latency, ok)
+    assert window.count == 3
+    assert window.success_rate == 1.0
+    assert window.mean == pytest.approx(0.2)
+    assert window.histogram.count == 3
+    window.observe(0.001, ok=False)  # Failures count against success, not latency
+    assert window.success_rate == pytest.approx(2 / 3)
+    assert window.mean == pytest.approx(0.25)
+    assert window.histogram.count == 2
+
+def test_statistics_prefer_fast_agents_but_explore():
+    stats = AgentStatistics(exploration=0.5, min_samples=2)
+    assert stats.choose(["a", "b"], "short") == "a"  # Unmeasured agents are tried first
+    for _ in range(20):
+        stats.observe("a", "short", 0.1)
+        stats.observe("b", "short", 0.01)
+    assert stats.choose(["a", "b"], "short") == "b"
+    assert stats.choose(["a", "b", "c"], "short") == "c"
+    for _ in range(20):
+        stats.observe("b", "long", 1.0, ok=False)
+        stats.observe("a", "long", 0.5)
+    assert stats.choose(["a", "b"], "long") == "a"  # Per-class statistics win over the overall window
+
+def test_fast_failures_do_not_beat_a_healthy_agent():
+    stats = AgentStatistics()
+    for i in range(20):
+        stats.observe("good", "short", 1.0)
+        stats.observe("bad", "short", 0.001, ok=i % 2 == 0)
+    assert stats.choose(["good", "bad"], "short") == "good"
+
+def test_routing_follows_an_agent_that_becomes_fast():
+    stats = AgentStatistics()
+    latency = {"a": 0.01, "b": 0.02}
+    picks = []
+    for i in range(2000):
+        if i == 1000:
+            latency["b"] = 0.005  # b is now twice as fast as a
+        agent = stats.choose(["a", "b"], "short")
+        picks.append(agent)
+        stats.observe(agent, "short", latency[agent])
+    assert picks[:1000].count("a") > 800
+    assert picks[-500:].count("b") > 400
+
+def test_swarm_routes_adaptively_by_default(tmp_path):
+    assert Swarm([], Memory(str(tmp_path / "mem.db"))).routing == "adaptive"
+
+@pytest.mark.asyncio
+async def test_adaptive_routing_converges_on_fastest_agent(tmp_path):
+    fast, mid, slow = SleepyAgent("fast", 0.002), SleepyAgent("mid", 0.02), SleepyAgent("slow", 0.05)
+    swarm = Swarm([slow, mid, fast], Memory(str(tmp_path / "mem.db")), routing="adaptive")
+    for i in range(60):
+        await swarm.run(f"q{i}")
+    assert fast.calls > 45
+    assert slow.calls >= 1 and mid.calls >= 1  # Never starved
+    assert swarm.stats()["agents"]["fast"]["samples"] == fast.calls
+
+@pytest.mark.asyncio
+async def test_failures_lower_the_success_rate(tmp_path):
+    swarm = Swarm([FlakyAgent("flaky", 0)], Memory(str(tmp_path / "mem.db")), routing="adaptive")
+    with pytest.raises(RuntimeError):
+        await swarm.run("q")
+    assert swarm.stats()["agents"]["flaky"]["success_rate"] == 0.0
+    assert swarm.inflight == {"flaky": 0}
+
+@pytest.mark.asyncio
+async def test_statistics_are_loaded_once_and_snapshotted_periodically(tmp_path):
+    memory = Memory(str(tmp_path / "mem.db"))
+    memory.store("swarm_score_a", "0.5")
+    reads = []
+    retrieve_many = memory.aretrieve_many
+
+    async def counting(keys):
+        reads.append(1)
+        return await retrieve_many(keys)
+
+    memory.aretrieve_many = counting
+    swarm = Swarm([SleepyAgent("a", 0)], memory, statistics=AgentStatistics(snapshot_interval=3600))
+    for i in range(5):
+        await swarm.run(f"q{i}")
+    assert len(reads) == 1
+    assert swarm.performance_scores["a"] > 0.5  # Legacy score migrated, then updated
+    assert memory.retrieve("swarm_stats_a") is None  # Not written per query
+
+    await swarm.save()
+    restored = Swarm([SleepyAgent("a", 0)], Memory(str(tmp_path / "mem.db")))
+    await restored.run("q")
+    assert restored.stats()["agents"]["a"]["samples"] == 6
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import os
+import pytest
+from aiohttp import web
+from typer.testing import CliRunner
+from agentflow.cli import app
+from agentflow.core import tracing
+from agentflow.core.llm import LLM
+from agentflow.core.tracing import JSONLSink, MemorySink, render_prometheus
+from agentflow.memory import Memory
+from agentflow.skills import skill
+
+@skill
+async def echo(query: str) -> str:
+    return query
+
+@pytest.fixture
+def sink():
+    memory_sink = MemorySink()
+    tracing.configure(sinks=[memory_sink])
+    yield memory_sink
+    tracing.configure()
+
+@pytest.mark.asyncio
+async def test_spans_nest_and_llm_records_phases(serve, sink):
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        return web.json_response({"response": "ok"})
+
+    llm = LLM()
+    llm.base_url = await serve(handler)
+    with tracing.span("agent.run", agent="a") as root:
+        await llm.generate("hi")
+        await echo.execute("x")
+    spans = {span["name"]: span for span in sink.spans}
+    assert spans["llm.generate"]["parent"] == root.span_id
+    assert spans["skill.execute"]["labels"] == {"skill": "echo", "executor": "async"}
+    assert spans["llm.generate"]["phases"]["generation"] >= 0.01
+    assert "connect" in spans["llm.generate"]["phases"]
+
+def test_memory_spans_and_prometheus(tmp_path, sink):
+    memory = Memory(str(tmp_path / "m.db"))
+    memory.store("k", "v")
+    memory.retrieve("k")
+    text = render_prometheus(tracing.get_tracer().metrics)
+    assert 'agentflow_spans_total{span="memory.retrieve",status="ok"} 1' in text
+    assert 'agentflow_span_seconds_bucket{batched="False",span="memory.store_many",le="+Inf"} 1' in text
+
+def test_failed_span_counts_as_error_and_stats_reads_jsonl(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENTFLOW_TRACE", "off")
+    path = str(tmp_path / "trace.jsonl")
+    tracing.configure(sinks=[JSONLSink(path, buffer=1)])
+    try:
+        with pytest.raises(ValueError):
+            with tracing.span("skill.execute", skill="bad"):
+                raise ValueError("boom")
+    finally:
+        tracing.configure()
+    record = json.loads(open(path).read())
+    assert record["status"] == "error" and record["error"] == "ValueError: boom"
+    result = CliRunner().invoke(app, ["stats", "--file", path])
+    assert result.exit_code == 0
+    assert "skill.execute" in result.output
+    result = CliRunner().invoke(app, ["stats", "--file", path, "--prometheus"])
+    assert 'status="error"' in result.output
+
+def test_explicit_trace_flag_overrides_environment(tmp_path, monkeypatch):
+    path = tmp_path / "trace.jsonl"
+    path.write_text("")
+    monkeypatch.setenv("AGENTFLOW_TRACE", str(path))
+    CliRunner().invoke(app, ["--no-trace", "stats", "--file", str(path)])
+    assert os.environ["AGENTFLOW_TRACE"] == "off"
+    CliRunner().invoke(app, ["--trace", "stats", "--file", str(path)])
+    assert os.environ["AGENTFLOW_TRACE"] == tracing.DEFAULT_TRACE_PATH
+    monkeypatch.setenv("AGENTFLOW_TRACE", str(path))
+    CliRunner().invoke(app, ["stats", "--file", str(path)])
+    assert os.environ["AGENTFLOW_TRACE"] == str(path)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from agentflow.vector_memory import SemanticMemory
+
+@pytest.mark.asyncio
+async def test_search_finds_nearest_text(tmp_path):
+    store = SemanticMemory(db_path=str(tmp_path / "vec.db"))
+    await store.add_many({
+        "py": "python async event loop",
+        "sql": "sqlite write ahead log",
+        "web": "scrape html pages",
+    })
+    results = await store.search("sqlite log", k=2)
+    assert results[0][0] == "sql"
+    assert results[0][1] == "sqlite write ahead log"
+    store.close()
+    assert len(SemanticMemory(db_path=str(tmp_path / "vec.db"))) == 3
+
+def test_ivf_index_keeps_recall(tmp_path):
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(50, 32))
+    vectors = centers[rng.integers(0, 50, 5000)] + 0.1 * rng.normal(size=(5000, 32))
+    store = SemanticMemory(db_path=str(tmp_path / "vec.db"), ann_threshold=1000)
+    store.add_vectors({f"v{i}": ("", list(v)) for i, v in enumerate(vectors)})
+    assert store._index is not None
+    store.add_vectors({"late": ("", list(vectors[7]))})  # Not yet in the index, still found
+    found = {key for key, _ in store.search_vector(vectors[7], k=2)}
+    assert found == {"v7", "late"}
@@ -0,0 +1,45 @@
+import asyncio
+from types import SimpleNamespace
+from agentflow.memory import Memory
+from agentflow.task_aware.notifiers import HeadlessNotifier
+from agentflow.task_aware.watcher import AgentWatcher
+
+def test_events_are_queued_and_deployed_in_process(tmp_path, monkeypatch):
+    deployed = []
+
+    async def fake_deploy(agent_name, task, memory):
+        deployed.append((agent_name, task))
+        return "done"
+
+    async def fake_suggestion(path):
+        return f"look at {path}"
+
+    monkeypatch.setattr("agentflow.task_aware.watcher.deploy", fake_deploy)
+    watcher = AgentWatcher(Memory(str(tmp_path / "mem.db")), notifier=HeadlessNotifier(auto_action=1))
+    watcher.reason_suggestion = fake_suggestion
+    watcher.cooldown = 0
+    watcher.on_modified(SimpleNamespace(src_path="a.py"))
+    watcher.on_modified(SimpleNamespace(src_path="b.md"))
+    watcher.on_modified(SimpleNamespace(src_path="c.bin"))  # No suggestions for this type
+    watcher.stop()
+
+    assert sorted(deployed) == [("doc_agent", "b.md"), ("optimize_agent", "a.py")]
+    assert watcher.memory.retrieve("last_task_a.py") == "optimize_agent"
+    assert watcher.memory.retrieve_json("watch_history")["events"] == 2
+
+def test_full_queue_drops_events(tmp_path):
+    watcher = AgentWatcher(Memory(str(tmp_path / "mem.db")), notifier=HeadlessNotifier(), workers=1, queue_size=1)
+    release = asyncio.Event()
+
+    async def blocked(path):
+        await release.wait()
+
+    watcher.handle = blocked
+    watcher.cooldown = 0
+    watcher.start()
+    for i in range(5):
+        watcher.on_modified(SimpleNamespace(src_path=f"{i}.py"))
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), watcher.loop).result()
+    assert watcher.dropped >= 3
+    watcher.loop.call_soon_threadsafe(release.set)
+    watcher.stop()
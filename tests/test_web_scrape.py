@@ -0,0 +1,63 @@
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from agentflow.skills.web_scrape import ConditionalCache, HostLimiter, TextExtractor, scrape, scrape_many
+
+PAGE = "<html><head><title>T</title><style>p {}</style></head><body><p>Hello <b>world</b></p><script>x()</script></body></html>"
+
+def test_text_extractor_matches_full_parse():
+    parser = TextExtractor(limit=1000)
+    for i in range(0, len(PAGE), 7):  # Arbitrary chunk boundaries
+        parser.feed(PAGE[i:i + 7])
+    assert parser.text() == "T Hello world"
+
+@pytest.mark.asyncio
+async def test_streaming_scrape_stops_early_and_uses_conditional_get(serve):
+    requests = []
+
+    async def handler(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        resp = web.StreamResponse(headers={"ETag": '"v1"', "Content-Type": "text/html"})
+        await resp.prepare(request)
+        await resp.write(b"<p>" + b"word " * 2000 + b"</p>")
+        for _ in range(1000):  # A 10 MB tail the scraper should never read
+            await resp.write(b"x" * 10240)
+        return resp
+
+    url = await serve(handler, path="/page")
+    url += "/page"
+    cache = ConditionalCache()
+    start = time.perf_counter()
+    text = await scrape(url, limit=100, cache=cache)
+    assert len(text) == 100 and text.startswith("word word")
+    assert await scrape(url, limit=100, cache=cache) == text
+    assert requests[1]["If-None-Match"] == '"v1"'
+    assert time.perf_counter() - start < 2
+    longer = await scrape(url, limit=500, cache=cache)  # Different limit: no validators, full fetch
+    assert len(longer) == 500
+    assert "If-None-Match" not in requests[2]
+
+@pytest.mark.asyncio
+async def test_scrape_many_keeps_order_and_rate_limits(serve):
+    async def handler(request):
+        return web.Response(text=f"<p>{request.query['n']}</p>", content_type="text/html")
+
+    base = await serve(handler, path="/n")
+    start = time.perf_counter()
+    results = await scrape_many([f"{base}/n?n={i}" for i in range(4)], rate=20, cache=ConditionalCache())
+    assert results == ["0", "1", "2", "3"]
+    assert time.perf_counter() - start >= 0.14  # Same host, at most 20 requests per second
+
+@pytest.mark.asyncio
+async def test_host_limiter_releases_slot_when_cancelled():
+    limiter = HostLimiter(per_host=1, rate=1)
+    (await limiter("h")).release()
+    waiting = asyncio.ensure_future(limiter("h"))  # Sleeps about a second for its rate slot
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert not limiter._semaphores["h"].locked()